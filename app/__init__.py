@@ -1,35 +1,33 @@
 from flask import Flask
+import logging
 import os
 from flask_cors import CORS
 from app.config import Config
-from app.extensions import db, migrate, jwt, mail, socketio
-# from app.models import *  # import all models so Alembic sees them
-# In app/__init__.py, before the models import
-print("🔍 DEBUG: Starting model imports...")
-try:
-    from app.models import *
-
-    print("✅ DEBUG: All models imported successfully")
-except Exception as e:
-    print(f"❌ DEBUG: Error importing models: {e}")
-    import traceback
-
-    print(f"❌ DEBUG: Import traceback:\n{traceback.format_exc()}")
-from app.routes.auth.auth import auth_bp
-from app.routes.auth.google import google_bp
-from app.middlewares import register_middlewares
-from app.routes.profile.routes import profile_bp
-from app.routes.community.routes import community_bp
-from app.routes.badges.routes import badge_bp
-from app.routes.events.routes import events_bp
-from app.routes.feedback.routes import feedback_bp
-from flasgger import Swagger
-from app.routes.health import health_bp
+import click
+from app.extensions import db, migrate, jwt, mail, socketio, jobs
+from app.models import *  # import all models so Alembic sees them
+from app.utils.metrics import InstrumentedQueuePool
+from app.utils.swagger import CachedSwagger
+
+logger = logging.getLogger(__name__)
+
+
+def _configure_json(app):
+    if app.config.get("JSON_PROVIDER") == "orjson":
+        try:
+            from app.utils.json_provider import OrjsonProvider
+        except ImportError:
+            logger.warning("orjson is not installed, using the stdlib JSON encoder")
+        else:
+            app.json = OrjsonProvider(app)
+    app.json.compact = app.config.get("JSON_COMPACT", True)
+    app.json.sort_keys = app.config.get("JSON_SORT_KEYS", False)
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    _configure_json(app)
 
     CORS(
         app,
@@ -49,27 +47,42 @@ def create_app():
         "schemes": ["http", "https"],
     }
 
-    swagger = Swagger(app, template=swagger_template)
+    # the spec is built on the first /apidocs hit and cached after that
+    swagger = CachedSwagger(app, template=swagger_template)
+
+    # Time pool checkouts for /metrics (in-memory SQLite keeps its StaticPool,
+    # DB_PGBOUNCER keeps its NullPool)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options = dict(
+        app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    )
+    engine_options.setdefault("poolclass", InstrumentedQueuePool)
+    InstrumentedQueuePool.slow_wait_seconds = app.config.get("DB_POOL_SLOW_WAIT_SECONDS")
+    logger.info(f"DB pool settings: {engine_options}")
 
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
-    socketio.init_app(app)
+    socketio.init_app(app, message_queue=app.config.get("SOCKETIO_MESSAGE_QUEUE"))
     mail.init_app(app)
+    jobs.init_app(app)
 
-    # --- ADD THIS: Automatic database initialization ---
-    with app.app_context():
-        try:
-            print("🔄 Checking database tables...")
-            # Try to create all tables
-            db.create_all()
-            print("✅ Database tables created/verified successfully!")
-        except Exception as e:
-            print(f"❌ Error creating database tables: {e}")
-            import traceback
-
-            print(f"❌ TRACEBACK:\n{traceback.format_exc()}")
+    # Production workers skip this: reflecting the schema in every worker slows
+    # cold starts, and migrations / `flask init-db` own the schema there.
+    if app.config["AUTO_CREATE_TABLES"]:
+        with app.app_context():
+            try:
+                db.create_all(bind_key=None)  # primary only, never the replicas
+                logger.info("Database tables created/verified")
+            except Exception:
+                logger.exception("Error creating database tables")
+
+    @app.cli.command("init-db")
+    def init_db():
+        """Create missing tables (health checks no longer do this)"""
+        with app.app_context():
+            db.create_all(bind_key=None)
+            print("Database tables created/verified!")
 
     # --- SIMPLE MIGRATION COMMAND ---
     @app.cli.command("db-migrate")
@@ -81,7 +94,35 @@ def create_app():
             upgrade()
             print("Migrations applied via CLI!")
 
-    # Register blueprints
+    @app.cli.command("outbox-worker")
+    def outbox_worker():
+        """Deliver outbox events (socket.io, email, webhooks) until stopped"""
+        from app.utils.outbox import run_dispatcher
+
+        print("Outbox worker started")
+        run_dispatcher(app)
+
+    @app.cli.command("jobs-worker")
+    @click.option("--queue", "queues", multiple=True, help="Only run these queues (repeatable)")
+    def jobs_worker(queues):
+        """Run background and periodic jobs until stopped"""
+        print(f"Jobs worker started ({app.config['JOBS_BACKEND']} backend)")
+        jobs.run_worker(queues or None)
+
+    # Register blueprints (imported here so `import app` - alembic, scripts -
+    # does not pull in every route module)
+    from app.routes.auth.auth import auth_bp
+    from app.routes.auth.google import google_bp
+    from app.routes.profile.routes import profile_bp
+    from app.routes.community.routes import community_bp
+    from app.routes.badges.routes import badge_bp
+    from app.routes.events.routes import events_bp
+    from app.routes.feedback.routes import feedback_bp
+    from app.routes.health import health_bp
+    from app.routes.search.routes import search_bp
+    from app.routes.batch.routes import batch_bp
+    from app.middlewares import register_middlewares
+
     app.register_blueprint(auth_bp)
     app.register_blueprint(google_bp)
     app.register_blueprint(profile_bp)
@@ -90,6 +131,8 @@ def create_app():
     app.register_blueprint(events_bp)
     app.register_blueprint(feedback_bp)
     app.register_blueprint(health_bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(batch_bp)
 
     from app.routes import init_routes
 
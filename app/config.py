@@ -5,6 +5,10 @@ from pathlib import Path
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
 
+    # "production" switches the defaults below to fast worker startup
+    APP_ENV = os.getenv("APP_ENV", "development").lower()
+    IS_PRODUCTION = APP_ENV == "production"
+
     # === DATABASE CONFIG ===
     @staticmethod
     def get_database_uri():
@@ -34,7 +38,76 @@ class Config:
         return f"sqlite:///{sqlite_path}"
 
     SQLALCHEMY_DATABASE_URI = get_database_uri.__func__()  # call static method
+
+    @staticmethod
+    def get_engine_options(database_uri):
+        """
+        Pool settings sized from the gunicorn worker class and its concurrency
+        (same env vars as gunicorn.conf.py). Every DB_* var overrides the default.
+
+        - sync: one request at a time per worker, a couple of connections is enough
+        - gthread: one connection per thread
+        - eventlet/gevent: hundreds of green threads share the pool, so it is
+          bigger and checkouts time out sooner instead of piling up
+        - DB_PGBOUNCER: PgBouncer (transaction mode) does the pooling, so the
+          app opens a connection per checkout and returns it straight away
+        """
+
+        def env_int(name, default):
+            return int(os.getenv(name, default))
+
+        if database_uri.startswith("sqlite") and (
+            ":memory:" in database_uri or database_uri.rstrip("/") == "sqlite:"
+        ):
+            return {}  # Flask-SQLAlchemy uses a StaticPool here
+
+        if os.getenv("DB_PGBOUNCER", "False").lower() in ("true", "1", "t"):
+            from sqlalchemy.pool import NullPool
+
+            return {"poolclass": NullPool}
+
+        worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+        if worker_class in ("eventlet", "gevent"):
+            concurrency = env_int("GUNICORN_WORKER_CONNECTIONS", 1000)
+            pool_size, max_overflow, timeout = min(20, concurrency), 10, 10
+        elif worker_class == "gthread":
+            concurrency = env_int("GUNICORN_THREADS", 1)
+            pool_size, max_overflow, timeout = concurrency, max(2, concurrency // 2), 30
+        else:
+            pool_size, max_overflow, timeout = 2, 3, 30
+
+        return {
+            "pool_size": env_int("DB_POOL_SIZE", pool_size),
+            "max_overflow": env_int("DB_MAX_OVERFLOW", max_overflow),
+            "pool_timeout": env_int("DB_POOL_TIMEOUT", timeout),
+            # drop connections before the server / load balancer idles them out
+            "pool_recycle": env_int("DB_POOL_RECYCLE", 1800),
+            "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "True").lower()
+            in ("true", "1", "t"),
+        }
+
+    SQLALCHEMY_ENGINE_OPTIONS = get_engine_options.__func__(SQLALCHEMY_DATABASE_URI)
+    # === READ REPLICAS ===
+    # comma-separated replica URLs, registered as binds replica_0, replica_1, ...
+    # and used by handlers decorated with @read_replica (app/utils/replica.py)
+    DATABASE_REPLICA_URLS = os.getenv("DATABASE_REPLICA_URLS", "")
+    SQLALCHEMY_BINDS = {
+        f"replica_{i}": url.strip()
+        for i, url in enumerate(u for u in DATABASE_REPLICA_URLS.split(",") if u.strip())
+    }
+    # after a write, the user reads from the primary for this many seconds
+    DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv("DATABASE_REPLICA_STICKY_SECONDS", 5))
+    # optional: also share the sticky marker through Redis (clients that send
+    # neither the cookie nor the X-Primary-Sticky header)
+    DATABASE_REPLICA_STICKY_REDIS_URL = os.getenv("DATABASE_REPLICA_STICKY_REDIS_URL")
+
+    # log a warning when a request waits longer than this for a connection
+    DB_POOL_SLOW_WAIT_SECONDS = float(os.getenv("DB_POOL_SLOW_WAIT_SECONDS", 0.5))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # db.create_all() at boot; production relies on migrations / `flask init-db`
+    AUTO_CREATE_TABLES = os.getenv(
+        "AUTO_CREATE_TABLES", str(not IS_PRODUCTION)
+    ).lower() in ("true", "1", "t")
 
     # === MAIL CONFIG ===
     MAIL_SERVER = os.getenv("MAIL_SERVER", "localhost")
@@ -49,7 +122,129 @@ class Config:
 
     MAIL_BACKEND = os.getenv("MAIL_BACKEND", "smtp")
 
-    DEBUG = os.getenv("DEBUG", "True").lower() in ("true", "1", "t")
+    DEBUG = os.getenv("DEBUG", str(not IS_PRODUCTION)).lower() in ("true", "1", "t")
+
+    # === BATCH ENDPOINTS ===
+    # ids accepted by /community/posts/batch and /community/users/batch
+    BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", 100))
+    # sub-requests per POST /batch, and how many of them run at once with
+    # "parallel": true (each holds a DB connection while it runs)
+    BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", 10))
+    BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", 4))
+
+    # === OUTBOX (socket.io / email / webhook delivery) ===
+    # "thread": each web process delivers after its own commits;
+    # "worker": only `flask outbox-worker` delivers (needs SOCKETIO_MESSAGE_QUEUE)
+    OUTBOX_DISPATCH = os.getenv("OUTBOX_DISPATCH", "thread").lower()
+    OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 100))
+    OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", 5))
+    # a claimed batch not marked sent within this many seconds is redelivered
+    OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", 60))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+    OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", 5))
+    OUTBOX_RETENTION_HOURS = int(os.getenv("OUTBOX_RETENTION_HOURS", 72))
+    # comma-separated; OUTBOX_WEBHOOK_EVENTS="*" forwards every event
+    OUTBOX_WEBHOOK_URLS = os.getenv("OUTBOX_WEBHOOK_URLS", "")
+    OUTBOX_WEBHOOK_EVENTS = os.getenv("OUTBOX_WEBHOOK_EVENTS", "")
+    OUTBOX_WEBHOOK_SECRET = os.getenv("OUTBOX_WEBHOOK_SECRET")
+    OUTBOX_WEBHOOK_TIMEOUT = float(os.getenv("OUTBOX_WEBHOOK_TIMEOUT", 5))
+    # e.g. redis://... so processes other than the web workers can emit
+    SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE")
+
+    # === BACKGROUND JOBS ===
+    # "local": in-process thread pools (dev/tests); "db": the jobs table, run
+    # by `flask jobs-worker`. Periodic jobs only run in a jobs worker.
+    JOBS_BACKEND = os.getenv("JOBS_BACKEND", "local").lower()
+    # queue:max concurrent jobs per process; unlisted queues get JOBS_DEFAULT_CONCURRENCY
+    JOBS_QUEUES = os.getenv("JOBS_QUEUES", "default:4,maintenance:1")
+    JOBS_DEFAULT_CONCURRENCY = int(os.getenv("JOBS_DEFAULT_CONCURRENCY", 1))
+    JOBS_POLL_SECONDS = float(os.getenv("JOBS_POLL_SECONDS", 1))
+    # a claimed job not finished within this many seconds is run again
+    JOBS_LEASE_SECONDS = int(os.getenv("JOBS_LEASE_SECONDS", 300))
+    JOBS_RETENTION_HOURS = int(os.getenv("JOBS_RETENTION_HOURS", 72))
+    FEEDBACK_RECONCILE_INTERVAL_SECONDS = int(os.getenv("FEEDBACK_RECONCILE_INTERVAL_SECONDS", 3600))
+
+    # === DELTA SYNC ===
+    # changes per /community/sync response (clients page with has_more)
+    SYNC_MAX_CHANGES = int(os.getenv("SYNC_MAX_CHANGES", 500))
+    # databases other than PostgreSQL/SQLite: changes younger than this (by the
+    # database clock) are held back so transactions that commit out of id order
+    # are never skipped; keep it above the longest request (gunicorn timeout 30s)
+    SYNC_SETTLE_SECONDS = float(os.getenv("SYNC_SETTLE_SECONDS", 35))
+    # `flask community prune-changes` keeps this many days; older watermarks get 410
+    SYNC_RETENTION_DAYS = int(os.getenv("SYNC_RETENTION_DAYS", 30))
+
+    # === JSON ===
+    # "orjson" (fast, native datetimes) or "default" (Flask's stdlib encoder)
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson").lower()
+    # compact bodies in production; JSON_COMPACT=False pretty-prints them
+    JSON_COMPACT = os.getenv("JSON_COMPACT", str(IS_PRODUCTION)).lower() in ("true", "1", "t")
+    # clients must not rely on key order; sorting costs encoder time
+    JSON_SORT_KEYS = os.getenv("JSON_SORT_KEYS", "False").lower() in ("true", "1", "t")
+
+    # === HTTP CACHING / COMPRESSION ===
+    # turn off when a proxy in front of the app already compresses
+    COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "True").lower() in ("true", "1", "t")
+    # smaller bodies are not worth compressing
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+    COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+    # br is used only when the brotli package is installed
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 5))
+
+    # === QUERY INSTRUMENTATION ===
+    SQL_STATS_ENABLED = os.getenv("SQL_STATS_ENABLED", "True").lower() in ("true", "1", "t")
+    # warn when the same statement shape runs more than this many times in a request
+    SQL_REPEAT_WARN_THRESHOLD = int(os.getenv("SQL_REPEAT_WARN_THRESHOLD", 10))
+
+    # === CACHE CONFIG ===
+    # seconds before a worker reloads the in-memory badge catalog
+    BADGE_CATALOG_TTL = int(os.getenv("BADGE_CATALOG_TTL", 600))
+    # seconds a public profile card is served from memory
+    PUBLIC_PROFILE_TTL = int(os.getenv("PUBLIC_PROFILE_TTL", 60))
+    # most active users kept in each worker's @mention prefix trie, and how
+    # often the trie is rebuilt to pick up other workers' signups/renames
+    USER_SEARCH_TRIE_SIZE = int(os.getenv("USER_SEARCH_TRIE_SIZE", 5000))
+    USER_SEARCH_TRIE_TTL = int(os.getenv("USER_SEARCH_TRIE_TTL", 600))
+    # viewer-independent feed cards kept per worker; the TTL bounds how long
+    # an author's old name/avatar can show on their cached posts
+    POST_CARD_CACHE_SIZE = int(os.getenv("POST_CARD_CACHE_SIZE", 10000))
+    POST_CARD_TTL = int(os.getenv("POST_CARD_TTL", 300))
+    # seconds a viewer's reaction/bookmark/reshare flags are reused; the
+    # worker handling the click drops them at once, other workers lag by this
+    VIEWER_STATE_TTL = int(os.getenv("VIEWER_STATE_TTL", 10))
+
+    # === HOT RANKING ===
+    # score = engagement / (age_hours + 2) ** HOT_GRAVITY, for posts newer than HOT_WINDOW_DAYS
+    HOT_GRAVITY = float(os.getenv("HOT_GRAVITY", 1.5))
+    HOT_WINDOW_DAYS = int(os.getenv("HOT_WINDOW_DAYS", 7))
+    # the top HOT_THREAD_COUNT posts scoring at least HOT_THREAD_MIN_SCORE get hot_thread
+    HOT_THREAD_COUNT = int(os.getenv("HOT_THREAD_COUNT", 20))
+    HOT_THREAD_MIN_SCORE = float(os.getenv("HOT_THREAD_MIN_SCORE", 0.5))
+    # how often the jobs worker reruns the ranking
+    HOT_RANK_INTERVAL_SECONDS = int(os.getenv("HOT_RANK_INTERVAL_SECONDS", 300))
+
+    # === HOME TIMELINES ===
+    # post ids kept per user for /community/posts/my-communities
+    TIMELINE_MAX_LEN = int(os.getenv("TIMELINE_MAX_LEN", 500))
+    # eras with more members than this are merged at read time instead of
+    # being pushed to every member on each new post
+    TIMELINE_FANOUT_MAX_MEMBERS = int(os.getenv("TIMELINE_FANOUT_MAX_MEMBERS", 5000))
+    # share timelines between workers through Redis; without it each worker
+    # keeps its own and rebuilds them every TIMELINE_LOCAL_TTL seconds
+    TIMELINE_REDIS_URL = os.getenv("TIMELINE_REDIS_URL")
+    TIMELINE_LOCAL_TTL = int(os.getenv("TIMELINE_LOCAL_TTL", 30))
+
+    # === HEALTH CHECKS ===
+    # seconds a /readyz database ping result is reused
+    READINESS_CACHE_TTL = float(os.getenv("READINESS_CACHE_TTL", 2))
+    # probes arriving before the first ping finishes wait this long for it
+    READINESS_FIRST_PING_TIMEOUT = float(os.getenv("READINESS_FIRST_PING_TIMEOUT", 5))
+
+    # === METRICS ===
+    # every worker writes its snapshot here; must be shared by all workers of one host
+    METRICS_DIR = os.getenv("METRICS_DIR")
+    # when set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
 
 
 
@@ -17,9 +17,22 @@ from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_mailman import Mail
 from flask_socketio import SocketIO
+from app.utils.jobs import JobQueue
+from app.utils.metrics import SOCKETIO_EMITS
+from app.utils.replica import RoutingSession
 
-db = SQLAlchemy()
+
+class InstrumentedSocketIO(SocketIO):
+    """SocketIO that counts server-side emits for /metrics"""
+
+    def emit(self, event, *args, **kwargs):
+        SOCKETIO_EMITS.inc(event=event)
+        return super().emit(event, *args, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
 mail = Mail()
-socketio = SocketIO(cors_allowed_origins="*")
+socketio = InstrumentedSocketIO(cors_allowed_origins="*")
+jobs = JobQueue(db)
@@ -2,13 +2,24 @@
 from flask import jsonify
 from werkzeug.exceptions import HTTPException
 from app.utils.responses import error_response
+from app.middlewares.query_stats import init_query_stats
+from app.middlewares.metrics import init_metrics
+from app.middlewares.http_cache import init_http_cache
+from app.utils.replica import init_replica_routing
 
 
 def register_middlewares(app):
 
-    @app.before_request
-    def log_request():
-        print(f"[REQ] {app.name}: {app.request_class}")
+    # ETag / 304 / gzip+br; registered first so it runs after the other
+    # after_request hooks and sees the final body
+    init_http_cache(app)
+
+    # per-request query count / DB time / N+1 warnings (replaces print logging)
+    init_query_stats(app)
+    # latency histograms / socket.io gauges served at /metrics
+    init_metrics(app)
+    # read-your-writes: recent writers read from the primary
+    init_replica_routing(app)
 
     @app.errorhandler(Exception)
     def handle_exception(e):
@@ -0,0 +1,122 @@
+# app/middlewares/http_cache.py
+"""
+Conditional GETs and compression for API responses.
+
+- ETag: every successful GET/HEAD JSON response gets a weak ETag. Handlers
+  that know a cheap version for their data call version_etag() up front
+  (and can skip the work on a match); everything else is hashed from the
+  body. A matching If-None-Match turns the response into a bodiless 304.
+- Cache-Control: @public_cache(max_age) marks viewer-independent endpoints
+  as cacheable by browsers/CDNs; authenticated responses default to
+  "private, no-cache" (revalidate with the ETag, never store in shared caches).
+- Compression: bodies of at least COMPRESS_MIN_SIZE bytes are sent as br
+  (when the brotli package is installed) or gzip, per Accept-Encoding.
+"""
+import gzip
+import hashlib
+from functools import wraps
+
+from flask import g, make_response, request
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/javascript",
+    "text/css",
+    "text/html",
+    "text/plain",
+}
+
+
+def _weak_etag(value):
+    return hashlib.blake2b(value, digest_size=12).hexdigest()
+
+
+def version_etag(*parts):
+    """
+    Use a version (e.g. a row id + counter) instead of a body hash as the ETag.
+    Returns a 304 response when the client already has it, otherwise None:
+
+        not_modified = version_etag("reactions", post.id, post.card_version)
+        if not_modified:
+            return not_modified
+    """
+    g.etag = _weak_etag("|".join(str(p) for p in parts).encode())
+    if request.if_none_match.contains_weak(g.etag):
+        response = make_response("", 304)
+        response.set_etag(g.etag, weak=True)
+        return response
+    return None
+
+
+def public_cache(max_age):
+    """Let browsers and CDNs reuse the response for max_age seconds"""
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                response.cache_control.public = True
+                response.cache_control.max_age = max_age
+            return response
+
+        return decorated
+
+    return decorator
+
+
+def _negotiate_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def init_http_cache(app):
+    min_size = app.config.get("COMPRESS_MIN_SIZE", 1024)
+    gzip_level = app.config.get("COMPRESS_GZIP_LEVEL", 6)
+    brotli_quality = app.config.get("COMPRESS_BROTLI_QUALITY", 5)
+    compress = app.config.get("COMPRESS_ENABLED", True)
+
+    @app.after_request
+    def conditional_and_compressed(response):
+        if response.direct_passthrough or response.is_streamed:
+            return response
+
+        if request.method in ("GET", "HEAD") and response.status_code == 200:
+            if "Cache-Control" not in response.headers and "Authorization" in request.headers:
+                response.cache_control.private = True
+                response.cache_control.no_cache = True
+
+            if response.mimetype == "application/json" and not response.get_etag()[0]:
+                etag = g.pop("etag", None) or _weak_etag(response.get_data())
+                response.set_etag(etag, weak=True)
+                response.make_conditional(request)
+                if response.status_code == 304:
+                    return response
+
+        if (
+            compress
+            and response.status_code != 304
+            and response.mimetype in COMPRESSIBLE_MIMETYPES
+            and "Content-Encoding" not in response.headers
+        ):
+            response.vary.add("Accept-Encoding")
+            encoding = _negotiate_encoding()
+            body = response.get_data()
+            if encoding and len(body) >= min_size:
+                if encoding == "br":
+                    body = brotli.compress(body, quality=brotli_quality)
+                else:
+                    body = gzip.compress(body, compresslevel=gzip_level)
+                response.set_data(body)
+                response.headers["Content-Encoding"] = encoding
+
+        return response
@@ -0,0 +1,53 @@
+# app/middlewares/metrics.py
+import time
+
+from flask import g, request
+
+from app.extensions import db, socketio
+from app.utils.metrics import (
+    DB_POOL_CHECKED_OUT,
+    REQUEST_LATENCY,
+    SOCKETIO_CLIENTS,
+    registry,
+)
+
+
+def init_metrics(app):
+    """Record request latency and socket.io connections into the metrics registry"""
+    if app.config.get("METRICS_DIR"):
+        registry.configure(app.config["METRICS_DIR"])
+
+    def checked_out():
+        with app.app_context():
+            pool = db.engine.pool
+            return pool.checkedout() if hasattr(pool, "checkedout") else 0
+
+    DB_POOL_CHECKED_OUT.set_function(checked_out)
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request_latency(response):
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - started,
+                blueprint=request.blueprint or "",
+                endpoint=request.endpoint or "unmatched",
+                method=request.method,
+                status=response.status_code,
+            )
+            registry.maybe_flush()
+        return response
+
+    @socketio.on("connect")
+    def count_connect(*args):
+        SOCKETIO_CLIENTS.inc()
+        registry.maybe_flush()
+
+    @socketio.on("disconnect")
+    def count_disconnect(*args):
+        SOCKETIO_CLIENTS.dec()
+        registry.maybe_flush()
@@ -0,0 +1,128 @@
+# app/middlewares/query_stats.py
+import json
+import logging
+import re
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_NAMED_PARAM = re.compile(r"%\(\w+\)s|:\w+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement):
+    """Reduce a SQL statement to its shape: literals, params and IN lists become '?'"""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NAMED_PARAM.sub("?", shape)
+    shape = shape.replace("%s", "?")
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Queries issued while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.total_seconds += seconds
+        self.shapes[fingerprint(statement)] += 1
+
+    def repeated(self, threshold):
+        return [
+            (shape, times)
+            for shape, times in self.shapes.most_common()
+            if times > threshold
+        ]
+
+
+def current_query_stats():
+    """QueryStats of the active request, or None outside a request"""
+    if not has_request_context():
+        return None
+    return g.get("query_stats")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_start")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats = current_query_stats()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def init_query_stats(app):
+    """
+    Count queries, DB time and repeated statement shapes per request.
+
+    - debug: X-DB-Query-Count / X-DB-Time-Ms response headers
+    - production: one JSON log line per request
+    - any mode: warning when one statement shape runs more than
+      SQL_REPEAT_WARN_THRESHOLD times (usually an N+1 loop)
+    """
+    if not app.config.get("SQL_STATS_ENABLED", True):
+        return
+
+    if not app.debug and app.logger.level == logging.NOTSET:
+        app.logger.setLevel(logging.INFO)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.pop("query_stats", None)
+        if stats is None:
+            return response
+
+        duration_ms = (time.perf_counter() - g.pop("request_started")) * 1000
+        db_ms = stats.total_seconds * 1000
+
+        if app.debug:
+            response.headers["X-DB-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Time-Ms"] = f"{db_ms:.1f}"
+        else:
+            app.logger.info(
+                json.dumps(
+                    {
+                        "event": "request",
+                        "method": request.method,
+                        "path": request.path,
+                        "endpoint": request.endpoint,
+                        "status": response.status_code,
+                        "duration_ms": round(duration_ms, 1),
+                        "db_queries": stats.count,
+                        "db_time_ms": round(db_ms, 1),
+                    }
+                )
+            )
+
+        threshold = app.config.get("SQL_REPEAT_WARN_THRESHOLD", 10)
+        for shape, times in stats.repeated(threshold):
+            app.logger.warning(
+                f"Possible N+1 in {request.method} {request.path} "
+                f"({request.endpoint}): statement ran {times}x: {shape[:300]}"
+            )
+
+        return response
@@ -54,6 +54,22 @@ class User(db.Model):
     posts = db.relationship("Post", back_populates="user", cascade="all, delete-orphan")
 
 
+# Case-insensitive username lookups (public profiles, mentions)
+db.Index("ix_users_username_lower", db.func.lower(User.username))
+# Prefix search for @mentions: LIKE 'abc%' can only use a btree index with
+# text_pattern_ops on Postgres (non-C locales); SQLite uses the index above.
+db.Index(
+    "ix_users_username_prefix",
+    db.func.lower(User.username).label("username_lower"),
+    postgresql_ops={"username_lower": "text_pattern_ops"},
+).ddl_if(dialect="postgresql")
+db.Index(
+    "ix_users_fullname_prefix",
+    db.func.lower(User.fullname).label("fullname_lower"),
+    postgresql_ops={"fullname_lower": "text_pattern_ops"},
+).ddl_if(dialect="postgresql")
+
+
 class PasswordResetOTP(db.Model):
     __tablename__ = "password_reset_otps"
 
@@ -139,6 +155,18 @@ class Post(db.Model):
     # New field for reshare counter
     reshare_count = db.Column(db.Integer, default=0)
 
+    # Time-decayed engagement score, recomputed by app/utils/ranking.py
+    hot_score = db.Column(db.Float, default=0.0, nullable=False, server_default="0")
+
+    # Bumped whenever a cached post card goes stale (see app/utils/post_cards.py)
+    card_version = db.Column(db.Integer, default=0, nullable=False, server_default="0")
+
+    __table_args__ = (
+        db.Index("ix_posts_created_at", "created_at"),
+        # sort=hot feeds walk this index instead of aggregating per request
+        db.Index("ix_posts_hot_score", "hot_score", "created_at"),
+    )
+
     # ADD THIS RELATIONSHIP:
     # FIX: Use back_populates instead of backref
     user = db.relationship("User", back_populates="posts")
@@ -212,7 +240,8 @@ class Feedback(db.Model):
     __tablename__ = "feedback"
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
-    vote_type = db.Column(db.String(10), nullable=False)
+    category = db.Column(db.String(50), default="general")
+    vote_type = db.Column(db.String(10), nullable=False, default="none")
     upvotes = db.Column(db.Integer, default=0)
     downvotes = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -221,6 +250,29 @@ class Feedback(db.Model):
     parent = db.relationship("Feedback", remote_side=[id], backref="replies")
 
 
+# Sort expressions for feedback listings. Queries must use these exact
+# expressions so the planner can match them to the indexes below.
+feedback_score = Feedback.upvotes - Feedback.downvotes
+feedback_controversy = db.case(
+    (Feedback.upvotes < Feedback.downvotes, Feedback.upvotes),
+    else_=Feedback.downvotes,
+)
+
+db.Index("ix_feedback_parent_created", Feedback.feedback_id, Feedback.created_at)
+db.Index(
+    "ix_feedback_parent_score",
+    Feedback.feedback_id,
+    feedback_score,
+    Feedback.created_at,
+)
+db.Index(
+    "ix_feedback_parent_controversy",
+    Feedback.feedback_id,
+    feedback_controversy,
+    Feedback.upvotes + Feedback.downvotes,
+)
+
+
 # ---- EVENTS ----
 event_participants = db.Table(
     "event_participants",
@@ -289,6 +341,15 @@ class Mission(db.Model):
     badge_id = db.Column(db.Integer, db.ForeignKey("badges.id"), nullable=True)
     badge = db.relationship("Badge", backref="missions")
 
+    event_id = db.Column(
+        db.Integer, db.ForeignKey("events.id"), nullable=True, index=True
+    )
+    event = db.relationship("Event", backref="missions")
+
+    # Denormalized counters, maintained by join_mission / complete_mission
+    participant_count = db.Column(db.Integer, default=0, nullable=False)
+    completed_count = db.Column(db.Integer, default=0, nullable=False)
+
     participants = db.relationship("MissionParticipant", back_populates="mission")
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -310,6 +371,9 @@ class Idea(db.Model):
 
 class MissionParticipant(db.Model):
     __tablename__ = "mission_participants"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "mission_id", name="unique_user_mission"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     mission_id = db.Column(db.Integer, db.ForeignKey("missions.id"), nullable=False)
@@ -331,6 +395,10 @@ class FeedbackVote(db.Model):
     vote_type = db.Column(db.String(10), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "feedback_id", name="unique_user_feedback_vote"),
+    )
+
     user = db.relationship("User", backref="feedback_votes", lazy=True)
     feedback = db.relationship("Feedback", backref="votes", lazy=True)
 
@@ -421,3 +489,157 @@ class Bookmark(db.Model):
     # Relationships
     user = db.relationship("User", backref="bookmarks")
     post = db.relationship("Post", backref="bookmarked_by")
+
+
+# ---- SEARCH ----
+class SearchDocument(db.Model):
+    """
+    One searchable post or comment, kept in sync by app/utils/search.py.
+    Postgres searches it through a GIN tsvector expression index, SQLite
+    through the search_documents_fts FTS5 table (maintained by triggers).
+    """
+
+    __tablename__ = "search_documents"
+    id = db.Column(db.Integer, primary_key=True)
+    doc_type = db.Column(db.String(20), nullable=False)  # "post" / "comment"
+    doc_id = db.Column(db.Integer, nullable=False)
+    post_id = db.Column(db.Integer, nullable=False)
+    era_id = db.Column(db.Integer, nullable=True)
+    zone_id = db.Column(db.Integer, nullable=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.String(255), nullable=True)
+    body = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("doc_type", "doc_id", name="unique_search_document"),
+        db.Index("ix_search_documents_post_id", "post_id"),
+        db.Index("ix_search_documents_era_zone", "era_id", "zone_id"),
+    )
+
+
+# Must match the expression of ix_search_documents_tsv for the GIN index to be used
+search_document_tsvector = db.func.to_tsvector(
+    db.literal("english", db.String),
+    db.func.coalesce(SearchDocument.title, "")
+    + " "
+    + db.func.coalesce(SearchDocument.body, ""),
+)
+db.Index(
+    "ix_search_documents_tsv", search_document_tsvector, postgresql_using="gin"
+).ddl_if(dialect="postgresql")
+
+SEARCH_FTS5_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_documents_fts USING fts5("
+    "title, body, content='search_documents', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(rowid, title, body) "
+    "VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_documents_fts(rowid, title, body) "
+    "VALUES (new.id, new.title, new.body); END",
+)
+for _statement in SEARCH_FTS5_DDL:
+    db.event.listen(
+        SearchDocument.__table__,
+        "after_create",
+        db.DDL(_statement).execute_if(dialect="sqlite"),
+    )
+db.event.listen(
+    SearchDocument.__table__,
+    "before_drop",
+    db.DDL("DROP TABLE IF EXISTS search_documents_fts").execute_if(dialect="sqlite"),
+)
+
+
+class ChangeLog(db.Model):
+    """
+    Append-only log of community changes, written in the same transaction as
+    the change itself (app/utils/change_log.py). (txid, id) is the commit
+    order clients page through with GET /community/sync?since=.
+    """
+
+    __tablename__ = "change_log"
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # post / comment / reaction / membership
+    op = db.Column(db.String(10), nullable=False)  # upsert / delete
+    entity_id = db.Column(db.Integer, nullable=False)
+    era_id = db.Column(db.Integer, nullable=False)
+    post_id = db.Column(db.Integer, nullable=True)
+    user_id = db.Column(db.Integer, nullable=True)  # who made the change
+    data = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # writing transaction's id on PostgreSQL, 0 elsewhere
+    txid = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+    # database clock, for the settle window on other backends
+    logged_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+
+    __table_args__ = (
+        db.Index("ix_change_log_txid_id", "txid", "id"),
+        db.Index("ix_change_log_era_id", "era_id", "id"),
+        db.Index("ix_change_log_user_id", "user_id", "id"),
+        db.Index("ix_change_log_created_at", "created_at"),
+    )
+
+
+class OutboxEvent(db.Model):
+    """
+    Side effects (socket.io events, emails, webhooks) written in the same
+    transaction as the change that causes them and delivered after commit
+    by the dispatcher in app/utils/outbox.py.
+    """
+
+    __tablename__ = "outbox_events"
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(20), nullable=False)  # socketio / email / webhook
+    event = db.Column(db.String(100), nullable=False)
+    # socket.io room, email address or webhook URL (None: broadcast)
+    target = db.Column(db.String(500), nullable=True)
+    payload = db.Column(db.JSON, nullable=False)
+    # sent along with the event so consumers can drop redeliveries
+    dedupe_key = db.Column(db.String(100), unique=True, nullable=False)
+    status = db.Column(db.String(10), default="pending", nullable=False)  # pending / sent / failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    available_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    claim = db.Column(db.String(32), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    # dropped instead of delivered after this (e.g. an OTP that has expired)
+    expires_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_outbox_events_status_available", "status", "available_at"),
+        db.Index("ix_outbox_events_claim", "claim"),
+    )
+
+
+class BackgroundJob(db.Model):
+    """Queued @jobs.job calls for the db backend (app/utils/jobs.py)"""
+
+    __tablename__ = "jobs"
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    queue = db.Column(db.String(50), default="default", nullable=False)
+    args = db.Column(db.JSON, nullable=False)  # {"args": [...], "kwargs": {...}}
+    status = db.Column(db.String(10), default="queued", nullable=False)  # queued / running / done / failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    max_attempts = db.Column(db.Integer, default=1, nullable=False)
+    # when to run; while running, when the worker's lease runs out
+    run_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    claim = db.Column(db.String(32), nullable=True)
+    unique_key = db.Column(db.String(200), unique=True, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_jobs_queue_status_run_at", "queue", "status", "run_at"),
+        db.Index("ix_jobs_claim", "claim"),
+    )
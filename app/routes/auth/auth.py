@@ -13,7 +13,9 @@ from app.utils.firebase import verify_firebase_token
 from app.utils.tokens import generate_verification_token, confirm_verification_token
 from app.utils.mailer import send_verification_email
 import uuid
-from app.utils.email import send_email
+from app.utils.outbox import send_email_later
+from app.utils.user_search import index_user
+from app.utils.public_profile import username_taken
 import random
 import re
 from datetime import datetime, timedelta
@@ -102,6 +104,7 @@ def firebase_login():
         )
         db.session.add(user)
         db.session.commit()
+        index_user(user)
 
     # Return JWT or session token (reuse your local auth logic)
     return jsonify({
@@ -184,11 +187,11 @@ def signup():
             base_username = re.sub(r"\W+", "", (firstname + lastname).lower())
             username = base_username
             counter = 1
-            while User.query.filter_by(username=username).first():
+            while username_taken(username):
                 username = f"{base_username}{counter}"
                 counter += 1
         else:
-            if User.query.filter_by(username=username).first():
+            if username_taken(username):
                 return jsonify({"error": "Username already taken"}), 400
 
         # ✅ Prepare user + OTP in memory (not yet committed)
@@ -220,28 +223,19 @@ def signup():
         db.session.add(user)
         db.session.add(otp_entry)
 
-        # ✅ Attempt to send email before commit
-        try:
-            send_email(
-                "Verify your email",
-                user.email,
-                f"Hi {user.firstname},\n\n"
-                f"Your verification code is: {otp_code}\n\n"
-                f"It will expire in 10 minutes.",
-            )
-        except Exception as e:
-            # If email fails, rollback and abort
-            db.session.rollback()
-            print("Email send failed:", e)
-            logger.exception(f"Email send failed: {e}")
-
-            return jsonify({
-                "error": "Failed to send verification email. Please try again later.",
-                "details": str(e)
-            }), 500
+        # ✅ Queue the email in the same transaction; it is sent after commit
+        send_email_later(
+            "Verify your email",
+            user.email,
+            f"Hi {user.firstname},\n\n"
+            f"Your verification code is: {otp_code}\n\n"
+            f"It will expire in 10 minutes.",
+            expires_at=expiry,
+        )
 
         # ✅ Everything succeeded → Commit
         db.session.commit()
+        index_user(user)
 
         return jsonify({
             "message": "Signup successful! Please verify your email with the OTP code.",
@@ -405,20 +399,16 @@ def resend_signup_otp():
     )
     db.session.add(new_otp)
 
-    # Send email
-    try:
-        send_email(
-            subject="Your New Verification Code",
-            to_email=user.email,
-            body=f"Hi {user.firstname},\n\n"
-            f"Your new verification code is: <strong>{otp_code}</strong>\n\n"
-            f"It expires in 10 minutes.\n\n"
-            f"If you didn't request this, ignore this email.",
-        )
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Resend OTP email failed: {e}")
-        return error_response("Failed to send OTP. Please try again.", 500)
+    # Send email (after commit)
+    send_email_later(
+        subject="Your New Verification Code",
+        to_email=user.email,
+        body=f"Hi {user.firstname},\n\n"
+        f"Your new verification code is: <strong>{otp_code}</strong>\n\n"
+        f"It expires in 10 minutes.\n\n"
+        f"If you didn't request this, ignore this email.",
+        expires_at=expiry,
+    )
 
     db.session.commit()
 
@@ -698,36 +688,30 @@ def forgot_password():
 
     # Generate new OTP
     otp = generate_otp()
+    expiry = otp_expiry()
     existing_otp = PasswordResetOTP.query.filter_by(user_id=user.id).first()
     if existing_otp:
         existing_otp.otp = otp
-        existing_otp.expires_at = otp_expiry()
+        existing_otp.expires_at = expiry
         existing_otp.request_count += 1
         existing_otp.is_verified = False
     else:
         reset_otp = PasswordResetOTP(
             user_id=user.id,
             otp=otp,
-            expires_at=otp_expiry(),
+            expires_at=expiry,
             request_count=recent_requests + 1,
         )
         db.session.add(reset_otp)
-    try:
-        send_email(
-            "Password Reset Request",
-            user.email,
-            f"Hi {user.firstname},\n\n"
-            f"Your password reset OTP is: {otp}\n\n"
-            f"This code will expire in 10 minutes.\n\n"
-            f"If you didn’t request this, please ignore this email.",
-        )
-    except Exception as e:
-        db.session.rollback()
-        print("Email send failed:", e)
-        return jsonify({
-            "message": "Failed to send password reset email. Please try again later.",
-            "details": str(e)
-        }), 500
+    send_email_later(
+        "Password Reset Request",
+        user.email,
+        f"Hi {user.firstname},\n\n"
+        f"Your password reset OTP is: {otp}\n\n"
+        f"This code will expire in 10 minutes.\n\n"
+        f"If you didn’t request this, please ignore this email.",
+        expires_at=expiry,
+    )
 
     db.session.commit()
     # reset_otp = PasswordResetOTP(
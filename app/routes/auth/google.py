@@ -4,6 +4,8 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token
 from app.extensions import db
 from app.models import User
+from app.utils.user_search import index_user
+import logging
 import os
 
 # initialize firebase
@@ -17,7 +19,9 @@ if os.path.exists(cred_path) and not firebase_admin._apps:
     cred = credentials.Certificate(cred_path)
     firebase_admin.initialize_app(cred)
 else:
-    print(f"⚠️ Firebase credentials not found at {cred_path}. Skipping Firebase init.")
+    logging.getLogger(__name__).warning(
+        f"Firebase credentials not found at {cred_path}. Skipping Firebase init."
+    )
     
 # cred = credentials.Certificate("firebase_service_key.json")
 # firebase_admin.initialize_app(cred)
@@ -122,6 +126,7 @@ paths:
             )
             db.session.add(user)
             db.session.commit()
+            index_user(user)
 
         access_token = create_access_token(identity=str(user.id))
         refresh_token = create_refresh_token(identity=str(user.id))
@@ -1,8 +1,14 @@
 from flask import Blueprint, request
-from app import db, socketio
+from app import db
 from app.models import Badge, UserBadge
 from app.utils.decorators import token_required, roles_required
 from app.utils.responses import success_response, error_response
+from app.utils.outbox import publish
+from app.utils.badge_catalog import (
+    get_badge_catalog,
+    get_user_badges as fetch_user_badges,
+    invalidate_badge_catalog,
+)
 
 badge_bp = Blueprint("badges", __name__, url_prefix="/badges")
 
@@ -28,6 +34,7 @@ def create_badge(current_user):
           properties:
             name: {type: string}
             description: {type: string}
+            icon: {type: string}
     responses:
       201:
         description: Badge created successfully
@@ -42,16 +49,19 @@ def create_badge(current_user):
     if not data.get("name") or not data.get("description"):
         return error_response("Name and description are required", 400)
 
-    badge = Badge(name=data["name"], description=data["description"])
+    badge = Badge(
+        name=data["name"], description=data["description"], icon=data.get("icon")
+    )
     db.session.add(badge)
-    db.session.commit()
+    db.session.flush()
 
     # 🔴 Emit real-time badge creation
-    socketio.emit(
+    publish(
         "badge_created",
         {"id": badge.id, "name": badge.name, "description": badge.description},
-        broadcast=True,
     )
+    db.session.commit()
+    invalidate_badge_catalog()
 
     return success_response(
         {"id": badge.id, "name": badge.name, "description": badge.description},
@@ -77,8 +87,7 @@ def list_badges(current_user):
       401:
         description: Unauthorized
     """
-    badges = Badge.query.all()
-    data = [{"id": b.id, "name": b.name, "description": b.description} for b in badges]
+    data = sorted(get_badge_catalog().values(), key=lambda b: b["id"])
     return success_response(data, "Badges fetched successfully")
 
 
@@ -120,8 +129,9 @@ def assign_badge(current_user):
         return error_response("badge_id and user_id are required", 400)
 
     # check if badge exists
-    badge = Badge.query.get(data["badge_id"])
-    if not badge:
+    if data["badge_id"] not in get_badge_catalog() and not Badge.query.get(
+        data["badge_id"]
+    ):
         return error_response("Badge not found", 404)
 
     # prevent duplicate assignment
@@ -133,17 +143,16 @@ def assign_badge(current_user):
 
     user_badge = UserBadge(badge_id=data["badge_id"], user_id=data["user_id"])
     db.session.add(user_badge)
-    db.session.commit()
 
     # 🔴 Emit real-time badge assignment
-    socketio.emit(
+    publish(
         "badge_assigned",
         {
             "user_id": user_badge.user_id,
             "badge_id": user_badge.badge_id,
         },
-        broadcast=True,
     )
+    db.session.commit()
 
     return success_response(
         {"user_id": user_badge.user_id, "badge_id": user_badge.badge_id},
@@ -177,14 +186,13 @@ def get_user_badges(current_user, user_id):
       404:
         description: User not found or no badges
     """
-    user_badges = UserBadge.query.filter_by(user_id=user_id).all()
     data = [
         {
-            "badge_id": ub.badge_id,
-            "badge_name": ub.badge.name,
-            "badge_description": ub.badge.description,
-            "assigned_at": ub.assigned_at.isoformat() if ub.assigned_at else None,
+            "badge_id": badge["id"],
+            "badge_name": badge["name"],
+            "badge_description": badge["description"],
+            "badge_icon": badge["icon"],
         }
-        for ub in user_badges
+        for badge in fetch_user_badges(user_id)
     ]
     return success_response(data, "User badges fetched successfully")
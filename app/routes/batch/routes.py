@@ -0,0 +1,139 @@
+# app/routes/batch/routes.py
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from flask import Blueprint, current_app, request
+from werkzeug.test import EnvironBuilder
+
+from app import db
+from app.utils.decorators import BATCH_AUTH_ENVIRON_KEY, _get_bearer_token, token_required
+from app.utils.replica import STICKY_HEADER
+from app.utils.responses import success_response, error_response
+
+batch_bp = Blueprint("batch", __name__, url_prefix="/batch")
+
+
+def _dispatch(app, environ):
+    """Run one GET sub-request through the full Flask pipeline (hooks included)"""
+    # fresh app context: own g, own db session, own after_request bookkeeping
+    with app.app_context(), app.request_context(environ):
+        response = app.full_dispatch_request()
+    body = None
+    if response.status_code != 304:
+        body = response.get_json(silent=True)
+        if body is None:
+            body = response.get_data(as_text=True)
+    return {
+        "status": response.status_code,
+        "etag": response.headers.get("ETag"),
+        "body": body,
+    }
+
+
+def _sub_environ(path, headers, auth):
+    parts = urlsplit(path)
+    environ = EnvironBuilder(
+        path=parts.path,
+        query_string=parts.query,
+        method="GET",
+        base_url=request.host_url,
+        headers=headers,
+        environ_base={"REMOTE_ADDR": request.remote_addr},
+    ).get_environ()
+    environ[BATCH_AUTH_ENVIRON_KEY] = auth
+    return environ
+
+
+# ---------------------------
+# REQUEST MULTIPLEXING
+# ---------------------------
+@batch_bp.route("", methods=["POST"])
+@token_required
+def batch(current_user):
+    """
+    Run several GET requests in one round trip (mobile app launch)
+    ---
+    tags:
+      - Batch
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required: [requests]
+          properties:
+            requests:
+              type: array
+              description: Up to BATCH_MAX_REQUESTS GET requests to this API; the token is checked once for all of them
+              items:
+                type: object
+                required: [path]
+                properties:
+                  id:
+                    type: string
+                    example: feed
+                    description: Echoed back to match results (defaults to the position)
+                  path:
+                    type: string
+                    example: "/community/posts/my-communities?page=1"
+                  etag:
+                    type: string
+                    description: Sent as If-None-Match; an unchanged result comes back as status 304 without a body
+            parallel:
+              type: boolean
+              default: false
+              description: Run the requests concurrently (bounded by BATCH_MAX_CONCURRENCY)
+    responses:
+      200:
+        description: One result (id, status, etag, body) per request, in request order
+      400:
+        description: Malformed batch
+    """
+    data = request.get_json(silent=True) or {}
+    subrequests = data.get("requests")
+    max_requests = current_app.config.get("BATCH_MAX_REQUESTS", 10)
+    if not isinstance(subrequests, list) or not subrequests:
+        return error_response("requests must be a non-empty list", 400)
+    if len(subrequests) > max_requests:
+        return error_response(f"At most {max_requests} requests per batch", 400)
+
+    auth = (_get_bearer_token(), current_user)
+    jobs = []
+    for position, sub in enumerate(subrequests):
+        path = sub.get("path") if isinstance(sub, dict) else None
+        if not isinstance(path, str) or not path.startswith("/") or path.startswith("//"):
+            return error_response(f"requests[{position}].path must be an absolute API path", 400)
+        if urlsplit(path).path.rstrip("/") == batch_bp.url_prefix:
+            return error_response("A batch cannot contain /batch", 400)
+
+        headers = {"Authorization": request.headers["Authorization"]}
+        # keep read-your-writes: sub-requests see the caller's sticky marker
+        if request.headers.get(STICKY_HEADER):
+            headers[STICKY_HEADER] = request.headers[STICKY_HEADER]
+        if request.headers.get("Cookie"):
+            headers["Cookie"] = request.headers["Cookie"]
+        if sub.get("etag"):
+            headers["If-None-Match"] = sub["etag"]
+        jobs.append((sub.get("id", position), _sub_environ(path, headers, auth)))
+
+    # the sub-requests open their own sessions; give this one's connection back
+    db.session.close()
+
+    app = current_app._get_current_object()
+    concurrency = min(current_app.config.get("BATCH_MAX_CONCURRENCY", 4), len(jobs))
+    if data.get("parallel") and concurrency > 1:
+        # plain threads - green threads under eventlet/gevent workers
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda job: _dispatch(app, job[1]), jobs))
+    else:
+        results = [_dispatch(app, environ) for _, environ in jobs]
+
+    return success_response(
+        {
+            "results": [
+                {"id": sub_id, **result} for (sub_id, _), result in zip(jobs, results)
+            ]
+        },
+        "Batch completed",
+    )
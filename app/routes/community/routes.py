@@ -1,13 +1,42 @@
 # app/routes/community/routes.py
-from flask import Blueprint, request
+import click
+from flask import Blueprint, current_app, request
 from flask_jwt_extended import current_user
-from app import db, socketio
+from app import db
+from app.extensions import jobs
 from app.models import Reshare, Zone, Post, Comment, Like, Event, RSVP, User, Era, user_era_membership, Badge,Bookmark
 from app.utils.decorators import token_required, roles_required
+from app.middlewares.http_cache import public_cache, version_etag
 from app.utils.responses import success_response, error_response
+from app.utils.replica import read_replica
+from app.utils.search import index_comment, index_post, remove_post
+from app.utils.post_cards import (
+    bump_card_version,
+    feed_options,
+    render_post_cards,
+    time_ago,
+)
+from app.utils.public_profile import get_public_profiles
+from app.utils.ranking import recompute_hot_scores
+from app.utils.viewer_state import get_viewer_state, invalidate_viewer_state
+from app.utils.timeline import (
+    fan_out_post,
+    home_timeline,
+    invalidate_timeline,
+    remove_from_timelines,
+)
+from app.utils.outbox import publish
+from app.utils.change_log import (
+    changes_since,
+    format_watermark,
+    is_pruned,
+    latest_watermark,
+    parse_watermark,
+    prune_changes,
+    record_change,
+)
 from sqlalchemy import case, func, distinct, text
 from datetime import datetime
-from dateutil.relativedelta import relativedelta
 import sqlalchemy as sa
 from sqlalchemy import func, distinct, desc
 from sqlalchemy.orm import joinedload
@@ -15,24 +44,38 @@ from sqlalchemy.orm import joinedload
 
 community_bp = Blueprint("community", __name__, url_prefix="/community")
 
+MAX_PER_PAGE = 100
 
-def time_ago(dt):
-    """Convert datetime to relative time string"""
-    now = datetime.utcnow()
-    diff = now - dt
-
-    if diff.days > 365:
-        return f"{diff.days // 365} years ago"
-    elif diff.days > 30:
-        return f"{diff.days // 30} months ago"
-    elif diff.days > 0:
-        return f"{diff.days} days ago"
-    elif diff.seconds > 3600:
-        return f"{diff.seconds // 3600} hours ago"
-    elif diff.seconds > 60:
-        return f"{diff.seconds // 60} minutes ago"
-    else:
-        return "just now"
+# sort name -> ORDER BY for list_posts (both backed by indexes on posts)
+POST_SORTS = {
+    "new": (Post.created_at.desc(), Post.id.desc()),
+    "hot": (Post.hot_score.desc(), Post.created_at.desc()),
+}
+
+
+@community_bp.cli.command("rank-hot")
+def rank_hot_command():
+    """Recompute Post.hot_score and the hot_thread flags"""
+    scored, hot = recompute_hot_scores()
+    print(f"Scored {scored} recent posts, {hot} flagged hot.")
+
+
+@community_bp.cli.command("prune-changes")
+@click.option("--days", default=None, type=int, help="Keep this many days (default SYNC_RETENTION_DAYS)")
+def prune_changes_command(days):
+    """Delete change log rows older than the sync retention window"""
+    days = days if days is not None else current_app.config.get("SYNC_RETENTION_DAYS", 30)
+    print(f"Pruned {prune_changes(days)} changes older than {days} days.")
+
+
+@jobs.periodic("HOT_RANK_INTERVAL_SECONDS", queue="maintenance")
+def rank_hot_job():
+    recompute_hot_scores()
+
+
+@jobs.periodic(24 * 3600, queue="maintenance")
+def prune_changes_job():
+    prune_changes(current_app.config.get("SYNC_RETENTION_DAYS", 30))
 
 
 # @community_bp.route("/zones", methods=["GET"])
@@ -436,10 +479,8 @@ def create_zone(current_user):
         )
         db.session.add(zone)
 
-    db.session.commit()
-
     # Emit era (frontend expects era data)
-    socketio.emit(
+    publish(
         "era_created",
         {
             "id": era.id,
@@ -448,8 +489,8 @@ def create_zone(current_user):
             "description": era.description or "",
             "image": era.image or "",
         },
-        # broadcast=True,
     )
+    db.session.commit()
 
     return success_response({"era_id": era.id}, "Era created successfully", status=201)
 
@@ -534,10 +575,8 @@ def join_era(current_user: User, era_id: int):
     #     text("INSERT INTO user_era_membership (user_id, era_id) VALUES (:uid, :eid)"),
     #     {"uid": current_user.id, "eid": era.id}
     # )
-    db.session.commit()
-
-    # Now emit the event
-    socketio.emit(
+    record_change("membership", "upsert", current_user.id, era.id, user_id=current_user.id)
+    publish(
         "user_joined_era",
         {
             "user_id": current_user.id,
@@ -547,6 +586,8 @@ def join_era(current_user: User, era_id: int):
         },
         to=f"era_{era.id}"
     )
+    db.session.commit()
+    invalidate_timeline(current_user.id)
 
     return success_response(message="Successfully joined the era!")
 
@@ -597,16 +638,18 @@ def leave_era(current_user: User, era_id: int):
         text("DELETE FROM user_era_membership WHERE user_id = :uid AND era_id = :eid"),
         {"uid": current_user.id, "eid": era.id}
     )
+    if result.rowcount:
+        record_change("membership", "delete", current_user.id, era.id, user_id=current_user.id)
+        publish("user_left_era", {
+            "user_id": current_user.id,
+            "username": current_user.username,
+            "era_id": era.id
+        }, to=f"era_{era.id}")
     db.session.commit()
 
     if result.rowcount == 0:
         return error_response("You are not a member of this era", 400)
-
-    socketio.emit("user_left_era", {
-        "user_id": current_user.id,
-        "username": current_user.username,
-        "era_id": era.id
-    }, to=f"era_{era.id}")
+    invalidate_timeline(current_user.id)
 
     return success_response(message="Left the era successfully")
 
@@ -685,10 +728,12 @@ def create_post(current_user):
         zone_id=zone.id,
     )
     db.session.add(post)
-    db.session.commit()
+    db.session.flush()
+    index_post(post, era_id=era.id)
+    record_change("post", "upsert", post.id, era.id, post_id=post.id, user_id=current_user.id)
 
     # Emit full post (frontend wants author, time ago, etc.)
-    socketio.emit(
+    publish(
         "post_created",
         {
             "id": post.id,
@@ -723,8 +768,9 @@ def create_post(current_user):
             },
             "zone": {"id": zone.id, "name": zone.name},
         },
-        # broadcast=True,
     )
+    db.session.commit()
+    fan_out_post(post, era.id)
 
     return success_response({"post_id": post.id}, "Post created", 201)
 
@@ -734,6 +780,7 @@ def create_post(current_user):
 # ---------------------------
 @community_bp.route("/posts/<int:post_id>/comments", methods=["GET"])
 @token_required
+@read_replica
 def get_post_comments(current_user, post_id):
     """
     Get all comments for a specific post with nested replies
@@ -851,22 +898,6 @@ def get_post_comments(current_user, post_id):
 #     return success_response(data, "Comments fetched successfully")
 
 
-def time_ago(dt):
-    now = datetime.utcnow()
-    diff = relativedelta(now, dt)
-    if diff.years > 0:
-        return f"{diff.years}y"
-    if diff.months > 0:
-        return f"{diff.months}mo"
-    if diff.days > 0:
-        return f"{diff.days}d"
-    if diff.hours > 0:
-        return f"{diff.hours}h"
-    if diff.minutes > 0:
-        return f"{diff.minutes}m"
-    return "just now"
-
-
 @community_bp.route("/posts/my-communities", methods=["GET"])
 @token_required
 def list_my_community_posts(current_user=None):
@@ -886,128 +917,39 @@ def list_my_community_posts(current_user=None):
         type: integer
         example: 20
         default: 20
+      - name: fields
+        in: query
+        type: string
+        example: "id,title,content,author,likes_count"
+        description: Comma-separated keys to return per post (default all); leaving out content and media skips loading them
+      - name: preview_chars
+        in: query
+        type: integer
+        example: 140
+        description: Truncate content to this many characters (adds content_truncated)
     responses:
       200:
         description: Posts from user's communities fetched successfully
     """
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 20, type=int)
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 20, type=int), 1), MAX_PER_PAGE)
 
-    # Get the eras the user has joined
-    user_era_ids = [era.id for era in current_user.joined_eras]
+    # Post ids come from the user's timeline (fan-out-on-write, see
+    # app/utils/timeline.py); only the page's posts are aggregated.
+    page_ids, total = home_timeline(current_user.id, page=page, per_page=per_page)
 
-    if not user_era_ids:
+    if not total and not current_user.joined_eras:
         return success_response(
             {"posts": [], "pagination": {"page": page, "total": 0}},
             "No posts found - user hasn't joined any communities",
         )
 
-    query = (
-        db.session.query(
-            Post,
-            User,  # Post author
-            Zone,
-            Era,
-            func.count(distinct(Like.id)).label("likes_count"),
-            func.count(
-                distinct(case((Like.reaction_type == "agree", Like.id), else_=None))
-            ).label("agree_count"),
-            func.count(
-                distinct(case((Like.reaction_type == "disagree", Like.id), else_=None))
-            ).label("disagree_count"),
-            func.count(distinct(Comment.id)).label("comments_count"),
-        )
-        .join(User, Post.user_id == User.id)  # Join with User to get author
-        .join(Zone, Post.zone_id == Zone.id)
-        .join(Era, Zone.era_id == Era.id)
-        .outerjoin(Like, (Like.post_id == Post.id) & (Like.type == "post"))
-        .outerjoin(Comment, Comment.post_id == Post.id)
-        .filter(Era.id.in_(user_era_ids))
-        .group_by(Post.id, User.id, Zone.id, Era.id)
+    data = render_post_cards(
+        page_ids, current_user, reshared_key="reshared", **feed_options(request.args)
     )
 
-    paginated = query.order_by(Post.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
-
-    user_reactions = {}
-    bookmarked_posts = set()
-
-    post_ids = [post.id for post, _, _, _, _, _, _, _ in paginated.items]
-    if post_ids:
-        # Get user reactions
-        reactions = Like.query.filter(
-            Like.user_id == current_user.id,
-            Like.post_id.in_(post_ids),
-            Like.type == "post",
-        ).all()
-        user_reactions = {r.post_id: r.reaction_type for r in reactions}
-
-        # Get bookmarked posts
-        bookmarks = Bookmark.query.filter(
-            Bookmark.user_id == current_user.id, Bookmark.post_id.in_(post_ids)
-        ).all()
-        bookmarked_posts = {bm.post_id for bm in bookmarks}
-
-    data = []
-    if current_user:
-            post_ids = [post.id for post, _, _, _, _, _, _, _ in paginated.items]
-            if post_ids:
-                reshares = Reshare.query.filter(
-                    Reshare.user_id == current_user.id,
-                    Reshare.post_id.in_(post_ids)
-                ).all()
-                user_reshared_posts = {r.post_id for r in reshares}
-    for (
-        post,
-        user,  # Post author
-        zone,
-        era,
-        likes_count,
-        agree_count,
-        disagree_count,
-        comments_count,
-    ) in paginated.items:
-        user_reaction = user_reactions.get(post.id)
-        is_bookmarked = post.id in bookmarked_posts
-        is_reshared = post.id in user_reshared_posts
-
-        data.append(
-            {
-                "id": post.id,
-                "title": post.title,
-                "content": post.content,
-                "media": (post.media.split("|") if post.media else []),
-                "created_at": post.created_at.isoformat(),
-                "time_ago": time_ago(post.created_at),
-                "pinned": post.pinned,
-                "hot_thread": post.hot_thread,
-                "likes_count": likes_count or 0,
-                "agree_count": agree_count or 0,
-                "disagree_count": disagree_count or 0,
-                "user_agreed": user_reaction == "agree",
-                "user_disagreed": user_reaction == "disagree",
-                "comments_count": comments_count or 0,
-                "bookmarked": is_bookmarked,  # Add bookmarked status
-                "reshared": is_reshared,  # Add reshared status
-                "author": {
-                    "id": user.id,
-                    "firstname": user.firstname,  # FIXED: Use post author's firstname
-                    "lastname": user.lastname,  # FIXED: Use post author's lastname
-                    "username": user.username,
-                    "avatar": user.avatar or "",
-                },
-                "era": {
-                    "id": era.id,
-                    "name": era.name,
-                    "year_range": era.year_range or "",
-                },
-                "zone": {"id": zone.id, "name": zone.name},
-            }
-        )
-
     return success_response(
-        {"posts": data, "pagination": {"page": page, "total": paginated.total}},
+        {"posts": data, "pagination": {"page": page, "total": total}},
         "Posts from your communities fetched",
     )
 
@@ -1031,6 +973,16 @@ def get_my_posts(current_user):
         type: integer
         example: 20
         default: 20
+      - name: fields
+        in: query
+        type: string
+        example: "id,title,content,author,likes_count"
+        description: Comma-separated keys to return per post (default all); leaving out content and media skips loading them
+      - name: preview_chars
+        in: query
+        type: integer
+        example: 140
+        description: Truncate content to this many characters (adds content_truncated)
     responses:
       200:
         description: User's posts fetched successfully
@@ -1081,123 +1033,27 @@ def get_my_posts(current_user):
             }
           }
     """
+    options = feed_options(request.args)
+
     try:
         page = request.args.get("page", 1, type=int)
         per_page = request.args.get("per_page", 20, type=int)
 
         print(f"🔍 DEBUG get_my_posts: Fetching posts for user_id={current_user.id}")
 
-        # Query for posts created by the current user
-        query = (
-            db.session.query(
-                Post,
-                User,  # Post author (should be current user)
-                Zone,
-                Era,
-                func.count(distinct(Like.id)).label("likes_count"),
-                func.count(
-                    distinct(case((Like.reaction_type == "agree", Like.id), else_=None))
-                ).label("agree_count"),
-                func.count(
-                    distinct(case((Like.reaction_type == "disagree", Like.id), else_=None))
-                ).label("disagree_count"),
-                func.count(distinct(Comment.id)).label("comments_count"),
-            )
-            .join(User, Post.user_id == User.id)
-            .join(Zone, Post.zone_id == Zone.id)
-            .join(Era, Zone.era_id == Era.id)
-            .outerjoin(Like, (Like.post_id == Post.id) & (Like.type == "post"))
-            .outerjoin(Comment, Comment.post_id == Post.id)
-            .filter(Post.user_id == current_user.id)  # Filter by current user's posts
-            .group_by(Post.id, User.id, Zone.id, Era.id)
+        paginated = (
+            db.session.query(Post.id)
+            .filter(Post.user_id == current_user.id)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .paginate(page=page, per_page=per_page, error_out=False)
         )
-
-        paginated = query.order_by(Post.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
+        data = render_post_cards(
+            [row.id for row in paginated.items],
+            current_user,
+            reshared_key="reshared",
+            **options,
         )
 
-        print(f"🔍 DEBUG: Found {paginated.total} total posts by user, {len(paginated.items)} on this page")
-
-        # Get user reactions and bookmarks for these posts
-        user_reactions = {}
-        bookmarked_posts = set()
-        
-        post_ids = [post.id for post, _, _, _, _, _, _, _ in paginated.items]
-        if post_ids:
-            # Get user reactions (though user probably hasn't reacted to their own posts)
-            reactions = Like.query.filter(
-                Like.user_id == current_user.id,
-                Like.post_id.in_(post_ids),
-                Like.type == "post"
-            ).all()
-            user_reactions = {r.post_id: r.reaction_type for r in reactions}
-            
-            # Get bookmarked posts (user might bookmark their own posts)
-            bookmarks = Bookmark.query.filter(
-                Bookmark.user_id == current_user.id,
-                Bookmark.post_id.in_(post_ids)
-            ).all()
-            bookmarked_posts = {bm.post_id for bm in bookmarks}
-
-        data = []
-        user_reshared_posts = set()
-        if current_user:
-            post_ids = [post.id for post, _, _, _, _, _, _, _ in paginated.items]
-            if post_ids:
-                reshares = Reshare.query.filter(
-                    Reshare.user_id == current_user.id,
-                    Reshare.post_id.in_(post_ids)
-                ).all()
-                user_reshared_posts = {r.post_id for r in reshares}
-        for (
-            post,
-            user,  # This should be the current user (post author)
-            zone,
-            era,
-            likes_count,
-            agree_count,
-            disagree_count,
-            comments_count,
-        ) in paginated.items:
-            user_reaction = user_reactions.get(post.id)
-            is_bookmarked = post.id in bookmarked_posts
-            is_reshared = post.id in user_reshared_posts
-
-            data.append(
-                {
-                    "id": post.id,
-                    "title": post.title,
-                    "content": post.content,
-                    "media": (post.media.split("|") if post.media else []),
-                    "created_at": post.created_at.isoformat(),
-                    "time_ago": time_ago(post.created_at),
-                    "pinned": post.pinned,
-                    "hot_thread": post.hot_thread,
-                    "likes_count": likes_count or 0,
-                    "agree_count": agree_count or 0,
-                    "disagree_count": disagree_count or 0,
-                    "user_agreed": user_reaction == "agree",
-                    "user_disagreed": user_reaction == "disagree",
-                    "comments_count": comments_count or 0,
-                    "bookmarked": is_bookmarked,
-                    "reshared": is_reshared,
-                    
-                    "author": {
-                        "id": user.id,
-                        "firstname": user.firstname,
-                        "lastname": user.lastname,
-                        "username": user.username,
-                        "avatar": user.avatar or "",
-                    },
-                    "era": {
-                        "id": era.id,
-                        "name": era.name,
-                        "year_range": era.year_range or "",
-                    },
-                    "zone": {"id": zone.id, "name": zone.name},
-                }
-            )
-
         print(f"✅ DEBUG: Successfully processed {len(data)} user posts")
         return success_response(
             {"posts": data, "pagination": {"page": page, "total": paginated.total}},
@@ -1235,12 +1091,24 @@ def get_user_posts(current_user, user_id):
         type: integer
         example: 20
         default: 20
+      - name: fields
+        in: query
+        type: string
+        example: "id,title,content,author,likes_count"
+        description: Comma-separated keys to return per post (default all); leaving out content and media skips loading them
+      - name: preview_chars
+        in: query
+        type: integer
+        example: 140
+        description: Truncate content to this many characters (adds content_truncated)
     responses:
       200:
         description: User's posts fetched successfully
       404:
         description: User not found
     """
+    options = feed_options(request.args)
+
     try:
         # Check if user exists
         target_user = User.query.get(user_id)
@@ -1252,112 +1120,16 @@ def get_user_posts(current_user, user_id):
 
         print(f"🔍 DEBUG get_user_posts: Fetching posts for user_id={user_id}")
 
-        # Query for posts created by the target user
-        query = (
-            db.session.query(
-                Post,
-                User,  # Post author (the target user)
-                Zone,
-                Era,
-                func.count(distinct(Like.id)).label("likes_count"),
-                func.count(
-                    distinct(case((Like.reaction_type == "agree", Like.id), else_=None))
-                ).label("agree_count"),
-                func.count(
-                    distinct(case((Like.reaction_type == "disagree", Like.id), else_=None))
-                ).label("disagree_count"),
-                func.count(distinct(Comment.id)).label("comments_count"),
-            )
-            .join(User, Post.user_id == User.id)
-            .join(Zone, Post.zone_id == Zone.id)
-            .join(Era, Zone.era_id == Era.id)
-            .outerjoin(Like, (Like.post_id == Post.id) & (Like.type == "post"))
-            .outerjoin(Comment, Comment.post_id == Post.id)
-            .filter(Post.user_id == user_id)  # Filter by target user's posts
-            .group_by(Post.id, User.id, Zone.id, Era.id)
+        paginated = (
+            db.session.query(Post.id)
+            .filter(Post.user_id == user_id)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .paginate(page=page, per_page=per_page, error_out=False)
         )
-
-        paginated = query.order_by(Post.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
+        data = render_post_cards(
+            [row.id for row in paginated.items], current_user, **options
         )
 
-        # Get current user's reactions and bookmarks for these posts
-        user_reactions = {}
-        bookmarked_posts = set()
-        
-        post_ids = [post.id for post, _, _, _, _, _, _, _ in paginated.items]
-        if post_ids and current_user:
-            reactions = Like.query.filter(
-                Like.user_id == current_user.id,
-                Like.post_id.in_(post_ids),
-                Like.type == "post"
-            ).all()
-            user_reactions = {r.post_id: r.reaction_type for r in reactions}
-            
-            bookmarks = Bookmark.query.filter(
-                Bookmark.user_id == current_user.id,
-                Bookmark.post_id.in_(post_ids)
-            ).all()
-            bookmarked_posts = {bm.post_id for bm in bookmarks}
-
-        data = []
-        user_reshared_posts = set()
-        if current_user:
-            post_ids = [post.id for post, _, _, _, _, _, _, _ in paginated.items]
-            if post_ids:
-                reshares = Reshare.query.filter(
-                    Reshare.user_id == current_user.id,
-                    Reshare.post_id.in_(post_ids)
-                ).all()
-                user_reshared_posts = {r.post_id for r in reshares}
-        for (
-            post,
-            user,  # The target user (post author)
-            zone,
-            era,
-            likes_count,
-            agree_count,
-            disagree_count,
-            comments_count,
-        ) in paginated.items:
-            user_reaction = user_reactions.get(post.id)
-            is_bookmarked = post.id in bookmarked_posts if current_user else False
-            user_reshared = post.id in user_reshared_posts if current_user else False
-
-            data.append(
-                {
-                    "id": post.id,
-                    "title": post.title,
-                    "content": post.content,
-                    "media": (post.media.split("|") if post.media else []),
-                    "created_at": post.created_at.isoformat(),
-                    "time_ago": time_ago(post.created_at),
-                    "pinned": post.pinned,
-                    "hot_thread": post.hot_thread,
-                    "likes_count": likes_count or 0,
-                    "agree_count": agree_count or 0,
-                    "disagree_count": disagree_count or 0,
-                    "user_agreed": user_reaction == "agree",
-                    "user_disagreed": user_reaction == "disagree",
-                    "comments_count": comments_count or 0,
-                    "bookmarked": is_bookmarked,
-                    "user_reshared": user_reshared,
-                    "author": {
-                        "id": user.id,
-                        "firstname": user.firstname,
-                        "lastname": user.lastname,
-                        "username": user.username,
-                        "avatar": user.avatar or "",
-                    },
-                    "era": {
-                        "id": era.id,
-                        "name": era.name,
-                        "year_range": era.year_range or "",
-                    },
-                    "zone": {"id": zone.id, "name": zone.name},
-                }
-            )
-
         message = f"{target_user.username}'s posts fetched successfully"
         if user_id == current_user.id:
             message = "Your posts fetched successfully"
@@ -1394,93 +1166,205 @@ def get_single_post(current_user, post_id):
       404:
         description: Post not found
     """
-    # Query for the specific post with all counts and relationships
-    result = (
-        db.session.query(
-            Post,
-            User,
-            Zone,
-            Era,
-            func.count(distinct(Like.id)).label("likes_count"),
-            func.count(
-                distinct(case((Like.reaction_type == "agree", Like.id), else_=None))
-            ).label("agree_count"),
-            func.count(
-                distinct(case((Like.reaction_type == "disagree", Like.id), else_=None))
-            ).label("disagree_count"),
-            func.count(distinct(Comment.id)).label("comments_count"),
-        )
-        .join(User, Post.user_id == User.id)
-        .join(Zone, Post.zone_id == Zone.id)
-        .join(Era, Zone.era_id == Era.id)
-        .outerjoin(Like, (Like.post_id == Post.id) & (Like.type == "post"))
-        .outerjoin(Comment, Comment.post_id == Post.id)
-        .filter(Post.id == post_id)
-        .group_by(Post.id, User.id, Zone.id, Era.id)
-        .first()
-    )
-
-    if not result:
+    items = render_post_cards([post_id], current_user, reshared_key=None)
+    if not items:
         return error_response("Post not found", 404)
+    post_data = items[0]
 
-    # Unpack the result
-    post, user, zone, era, likes_count, agree_count, disagree_count, comments_count = result
+    return success_response(post_data, "Post fetched successfully")
 
-    # Get user's reaction to this post
-    user_reaction = None
-    if current_user:
-        reaction = Like.query.filter(
-            Like.user_id == current_user.id,
-            Like.post_id == post_id,
-            Like.type == "post"
-        ).first()
-        user_reaction = reaction.reaction_type if reaction else None
 
-    # Check if post is bookmarked by current user
-    is_bookmarked = False
-    if current_user:
-        bookmark = Bookmark.query.filter_by(
-            user_id=current_user.id, 
-            post_id=post_id
-        ).first()
-        is_bookmarked = bookmark is not None
-
-    # Build the post data
-    post_data = {
-        "id": post.id,
-        "title": post.title,
-        "content": post.content,
-        "media": (post.media.split("|") if post.media else []),
-        "created_at": post.created_at.isoformat(),
-        "time_ago": time_ago(post.created_at),
-        "pinned": post.pinned,
-        "hot_thread": post.hot_thread,
-        "likes_count": likes_count or 0,
-        "agree_count": agree_count or 0,
-        "disagree_count": disagree_count or 0,
-        "user_agreed": user_reaction == "agree",
-        "user_disagreed": user_reaction == "disagree",
-        "comments_count": comments_count or 0,
-        "bookmarked": is_bookmarked,
-        "author": {
-            "id": user.id,
-            "firstname": user.firstname,
-            "lastname": user.lastname,
-            "username": user.username,
-            "avatar": user.avatar or "",
-        },
-        "era": {
-            "id": era.id,
-            "name": era.name,
-            "year_range": era.year_range or "",
+# ---------------------------
+# MULTI-GET (posts / users by id list)
+# ---------------------------
+def _batch_ids():
+    """Unique ids from ?ids=1,2,3 (or repeated ?ids=), in request order"""
+    raw = ",".join(request.args.getlist("ids"))
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        return None, error_response("ids must be a comma-separated list of integers", 400)
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return None, error_response("ids is required", 400)
+    max_ids = current_app.config.get("BATCH_MAX_IDS", 100)
+    if len(ids) > max_ids:
+        return None, error_response(f"At most {max_ids} ids per request", 400)
+    return ids, None
+
+
+@community_bp.route("/posts/batch", methods=["GET"])
+@token_required
+@read_replica
+def get_posts_batch(current_user):
+    """
+    Get several posts by id in one request (notifications, mentions, bookmarks)
+    ---
+    tags:
+      - Community
+    parameters:
+      - name: ids
+        in: query
+        type: string
+        required: true
+        example: "12,7,31"
+        description: Comma-separated post ids (up to BATCH_MAX_IDS); the response keeps this order
+      - name: fields
+        in: query
+        type: string
+        description: Comma-separated keys to return per post (default all)
+      - name: preview_chars
+        in: query
+        type: integer
+        description: Truncate content to this many characters (adds content_truncated)
+    responses:
+      200:
+        description: Posts in request order plus the ids that do not exist
+        schema:
+          type: object
+          properties:
+            posts:
+              type: array
+              items: {type: object}
+            missing:
+              type: array
+              items: {type: integer}
+      400:
+        description: Missing, malformed or too many ids
+    """
+    ids, error = _batch_ids()
+    if error:
+        return error
+
+    posts = render_post_cards(ids, current_user, **feed_options(request.args))
+    found = {post["id"] for post in posts}
+    return success_response(
+        {"posts": posts, "missing": [post_id for post_id in ids if post_id not in found]},
+        "Posts fetched successfully",
+    )
+
+
+@community_bp.route("/users/batch", methods=["GET"])
+@read_replica
+def get_users_batch():
+    """
+    Get several public profiles by user id in one request (public)
+    ---
+    tags:
+      - Community
+    parameters:
+      - name: ids
+        in: query
+        type: string
+        required: true
+        example: "3,18,5"
+        description: Comma-separated user ids (up to BATCH_MAX_IDS); the response keeps this order
+    responses:
+      200:
+        description: Public profiles in request order plus the ids that do not exist
+      400:
+        description: Missing, malformed or too many ids
+    """
+    ids, error = _batch_ids()
+    if error:
+        return error
+
+    profiles = get_public_profiles(ids)
+    return success_response(
+        {
+            "users": [profiles[user_id] for user_id in ids if user_id in profiles],
+            "missing": [user_id for user_id in ids if user_id not in profiles],
         },
-        "zone": {
-            "id": zone.id, 
-            "name": zone.name
+        "Users fetched successfully",
+    )
+
+# ---------------------------
+# DELTA SYNC
+# ---------------------------
+@community_bp.route("/sync", methods=["GET"])
+@token_required
+# primary only: the visibility horizon must come from the database that
+# hands out the transaction ids
+def sync_changes(current_user):
+    """
+    Changes in the caller's eras since a watermark (offline-first clients)
+    ---
+    tags:
+      - Community
+    parameters:
+      - name: since
+        in: query
+        type: string
+        description: next_since from the previous sync (opaque); omit on first launch to get the current watermark
+      - name: fields
+        in: query
+        type: string
+        description: Comma-separated keys to return per post (default all)
+      - name: preview_chars
+        in: query
+        type: integer
+        description: Truncate content to this many characters (adds content_truncated)
+    responses:
+      200:
+        description: >
+          Changes oldest first (entity post/comment/reaction/membership, op
+          upsert/delete), the current cards of the posts they touch, next_since
+          and has_more (call again right away with next_since)
+      400:
+        description: Malformed since
+      410:
+        description: since is older than the retained log; do a full reload and start over without since
+    """
+    since = None
+    if "since" in request.args:
+        since = parse_watermark(request.args["since"])
+        if since is None:
+            return error_response("since must be a watermark returned by /community/sync", 400)
+    options = feed_options(request.args)
+
+    if since is None:
+        return success_response(
+            {"changes": [], "posts": [], "next_since": latest_watermark(), "has_more": False},
+            "Sync started",
+        )
+    if is_pruned(since):
+        return error_response("Change log no longer covers since; full resync required", 410)
+
+    limit = current_app.config.get("SYNC_MAX_CHANGES", 500)
+    changes, has_more = changes_since(current_user.id, since, limit)
+
+    deleted = {change.post_id for change in changes if change.entity == "post" and change.op == "delete"}
+    touched = [
+        post_id
+        for post_id in dict.fromkeys(change.post_id for change in changes if change.post_id)
+        if post_id not in deleted
+    ]
+    return success_response(
+        {
+            "changes": [
+                {
+                    "watermark": format_watermark(change.txid, change.id),
+                    "entity": change.entity,
+                    "op": change.op,
+                    "id": change.entity_id,
+                    "era_id": change.era_id,
+                    "post_id": change.post_id,
+                    "user_id": change.user_id,
+                    "data": change.data,
+                    "created_at": change.created_at.isoformat(),
+                }
+                for change in changes
+            ],
+            # posts deleted later in the log are simply absent
+            "posts": render_post_cards(touched, current_user, **options),
+            "next_since": format_watermark(
+                *((changes[-1].txid, changes[-1].id) if changes else since)
+            ),
+            "has_more": has_more,
         },
-    }
+        "Changes fetched successfully",
+    )
 
-    return success_response(post_data, "Post fetched successfully")
 
 # ---------------------------
 # BOOKMARKS
@@ -1518,11 +1402,13 @@ def toggle_bookmark(current_user, post_id):
     if existing_bookmark:
         db.session.delete(existing_bookmark)
         db.session.commit()
+        invalidate_viewer_state(current_user.id, post_id)
         return success_response(message="Bookmark removed")
     else:
         bookmark = Bookmark(user_id=current_user.id, post_id=post_id)
         db.session.add(bookmark)
         db.session.commit()
+        invalidate_viewer_state(current_user.id, post_id)
         return success_response(message="Post bookmarked", status=201)
 
 
@@ -1545,6 +1431,16 @@ def get_bookmarks(current_user):
         type: integer
         example: 20
         default: 20
+      - name: fields
+        in: query
+        type: string
+        example: "id,title,content,author,likes_count"
+        description: Comma-separated keys to return per post (default all); leaving out content and media skips loading them
+      - name: preview_chars
+        in: query
+        type: integer
+        example: 140
+        description: Truncate content to this many characters (adds content_truncated)
     responses:
       200:
         description: Bookmarked posts fetched successfully
@@ -1596,6 +1492,8 @@ def get_bookmarks(current_user):
           }
     """
     
+    options = feed_options(request.args)
+
     try:
         print(f"🔍 DEBUG get_bookmarks: Starting for user_id={current_user.id}")
         
@@ -1604,94 +1502,24 @@ def get_bookmarks(current_user):
         
         print(f"🔍 DEBUG: page={page}, per_page={per_page}")
 
-        # Option 1: Include Bookmark in the GROUP BY clause
-        query = (
-            db.session.query(
-                Post,
-                User,
-                Zone,
-                Era,
-                Bookmark,  # Add Bookmark to the query
-                func.count(distinct(Like.id)).label("likes_count"),
-                func.count(
-                    distinct(case((Like.reaction_type == "agree", Like.id), else_=None))
-                ).label("agree_count"),
-                func.count(
-                    distinct(case((Like.reaction_type == "disagree", Like.id), else_=None))
-                ).label("disagree_count"),
-                func.count(distinct(Comment.id)).label("comments_count"),
-            )
-            .join(Bookmark, Bookmark.post_id == Post.id)
-            .join(User, Post.user_id == User.id)
-            .join(Zone, Post.zone_id == Zone.id)
-            .join(Era, Zone.era_id == Era.id)
-            .outerjoin(Like, (Like.post_id == Post.id) & (Like.type == "post"))
-            .outerjoin(Comment, Comment.post_id == Post.id)
+        paginated = (
+            db.session.query(Bookmark.post_id, Bookmark.created_at)
             .filter(Bookmark.user_id == current_user.id)
-            .group_by(Post.id, User.id, Zone.id, Era.id, Bookmark.id)  # Add Bookmark.id to GROUP BY
-        )
-
-        print("🔍 DEBUG: Executing paginated query...")
-        paginated = query.order_by(Bookmark.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
+            .order_by(Bookmark.created_at.desc(), Bookmark.id.desc())
+            .paginate(page=page, per_page=per_page, error_out=False)
         )
 
         print(f"🔍 DEBUG: Found {paginated.total} total bookmarks, {len(paginated.items)} on this page")
 
-        # Get user reactions for bookmarked posts
-        user_reactions = {}
-        post_ids = [post.id for post, _, _, _, _, _, _, _, _ in paginated.items]  # Updated unpacking
-        print(f"🔍 DEBUG: Post IDs to check reactions for: {post_ids}")
-        
-        if post_ids:
-            reactions = Like.query.filter(
-                Like.user_id == current_user.id,
-                Like.post_id.in_(post_ids),
-                Like.type == "post"
-            ).all()
-            user_reactions = {r.post_id: r.reaction_type for r in reactions}
-            print(f"🔍 DEBUG: User reactions found: {user_reactions}")
-
-        data = []
-        # Updated unpacking to include Bookmark
-        for post, user, zone, era, bookmark, likes_count, agree_count, disagree_count, comments_count in paginated.items:
-            user_reaction = user_reactions.get(post.id)
-            
-            print(f"🔍 DEBUG: Processing post {post.id} - {post.title}")
-
-            data.append(
-                {
-                    "id": post.id,
-                    "title": post.title,
-                    "content": post.content,
-                    "media": (post.media.split("|") if post.media else []),
-                    "created_at": post.created_at.isoformat(),
-                    "time_ago": time_ago(post.created_at),
-                    "pinned": post.pinned,
-                    "hot_thread": post.hot_thread,
-                    "likes_count": likes_count or 0,
-                    "agree_count": agree_count or 0,
-                    "disagree_count": disagree_count or 0,
-                    "user_agreed": user_reaction == "agree",
-                    "user_disagreed": user_reaction == "disagree",
-                    "comments_count": comments_count or 0,
-                    "bookmarked": True,
-                    "bookmarked_at": bookmark.created_at.isoformat(),  # Optional: include bookmark timestamp
-                    "author": {
-                        "id": user.id,
-                        "firstname": user.firstname,
-                        "lastname": user.lastname,
-                        "username": user.username,
-                        "avatar": user.avatar or "",
-                    },
-                    "era": {
-                        "id": era.id,
-                        "name": era.name,
-                        "year_range": era.year_range or "",
-                    },
-                    "zone": {"id": zone.id, "name": zone.name},
-                }
-            )
+        bookmarked_at = {row.post_id: row.created_at for row in paginated.items}
+        data = render_post_cards(
+            list(bookmarked_at), current_user, reshared_key=None, **options
+        )
+        for item in data:
+            if options["fields"] is None or "bookmarked" in options["fields"]:
+                item["bookmarked"] = True
+            if options["fields"] is None or "bookmarked_at" in options["fields"]:
+                item["bookmarked_at"] = bookmarked_at[item["id"]].isoformat()
 
         print(f"✅ DEBUG: Successfully processed {len(data)} posts")
         return success_response(
@@ -1708,6 +1536,7 @@ def get_bookmarks(current_user):
 
 @community_bp.route("/posts/all", methods=["GET"])
 @token_required
+@read_replica
 def list_all_posts(current_user=None):
     """
     List ALL posts from ALL eras (discover/explore feed)
@@ -1725,6 +1554,16 @@ def list_all_posts(current_user=None):
         type: integer
         example: 20
         default: 20
+      - name: fields
+        in: query
+        type: string
+        example: "id,title,content,author,likes_count"
+        description: Comma-separated keys to return per post (default all); leaving out content and media skips loading them
+      - name: preview_chars
+        in: query
+        type: integer
+        example: 140
+        description: Truncate content to this many characters (adds content_truncated)
     responses:
       200:
         description: All posts fetched successfully
@@ -1732,111 +1571,16 @@ def list_all_posts(current_user=None):
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 20, type=int)
 
-    query = (
-        db.session.query(
-            Post,
-            User,  # This is the post author
-            Zone,
-            Era,
-            func.count(distinct(Like.id)).label("likes_count"),
-            func.count(
-                distinct(case((Like.reaction_type == "agree", Like.id), else_=None))
-            ).label("agree_count"),
-            func.count(
-                distinct(case((Like.reaction_type == "disagree", Like.id), else_=None))
-            ).label("disagree_count"),
-            func.count(distinct(Comment.id)).label("comments_count"),
-        )
-        .outerjoin(Like, (Like.post_id == Post.id) & (Like.type == "post"))
-        .outerjoin(Comment, Comment.post_id == Post.id)
-        .join(User, Post.user_id == User.id)  # Join with User to get author info
+    paginated = (
+        db.session.query(Post.id)
         .join(Zone, Post.zone_id == Zone.id)
-        .join(Era, Zone.era_id == Era.id)
-        .group_by(Post.id, User.id, Zone.id, Era.id)
+        .order_by(Post.created_at.desc(), Post.id.desc())
+        .paginate(page=page, per_page=per_page, error_out=False)
     )
-
-    paginated = query.order_by(Post.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
+    data = render_post_cards(
+        [row.id for row in paginated.items], current_user, **feed_options(request.args)
     )
 
-    user_reactions = {}
-    bookmarked_posts = set()
-
-    if current_user:
-        post_ids = [post.id for post, _, _, _, _, _, _, _ in paginated.items]
-        if post_ids:
-            # Get user reactions
-            reactions = Like.query.filter(
-                Like.user_id == current_user.id,
-                Like.post_id.in_(post_ids),
-                Like.type == "post",
-            ).all()
-            user_reactions = {r.post_id: r.reaction_type for r in reactions}
-
-            # Get bookmarked posts
-            bookmarks = Bookmark.query.filter(
-                Bookmark.user_id == current_user.id,
-                Bookmark.post_id.in_(post_ids)
-            ).all()
-            bookmarked_posts = {bm.post_id for bm in bookmarks}
-
-    data = []
-    user_reshared_posts = set()
-    if current_user:
-        post_ids = [post.id for post, _, _, _, _, _, _, _ in paginated.items]
-        if post_ids:
-            reshares = Reshare.query.filter(
-                Reshare.user_id == current_user.id, Reshare.post_id.in_(post_ids)
-            ).all()
-            user_reshared_posts = {r.post_id for r in reshares}
-    for (
-        post,
-        user,  # This is the post author
-        zone,
-        era,
-        likes_count,
-        agree_count,
-        disagree_count,
-        comments_count,
-    ) in paginated.items:
-        user_reaction = user_reactions.get(post.id)
-        is_bookmarked = post.id in bookmarked_posts if current_user else False
-        user_reshared = post.id in user_reshared_posts if current_user else False
-
-        data.append(
-            {
-                "id": post.id,
-                "title": post.title,
-                "content": post.content,
-                "media": (post.media.split("|") if post.media else []),
-                "created_at": post.created_at.isoformat(),
-                "time_ago": time_ago(post.created_at),
-                "pinned": post.pinned,
-                "hot_thread": post.hot_thread,
-                "likes_count": likes_count or 0,
-                "agree_count": agree_count or 0,
-                "disagree_count": disagree_count or 0,
-                "user_agreed": user_reaction == "agree",
-                "user_disagreed": user_reaction == "disagree",
-                "comments_count": comments_count or 0,
-                "bookmarked": is_bookmarked,  # Add bookmarked status
-                "user_reshared": user_reshared,  # Add reshared status
-                "author": {
-                    "id": user.id,  # Use post author's ID
-                    "firstname": user.firstname,  # FIXED: Use post author's firstname
-                    "lastname": user.lastname,    # FIXED: Use post author's lastname
-                    "username": user.username,    # This was already correct
-                    "avatar": user.avatar or "",
-                },
-                "era": {
-                    "id": era.id,
-                    "name": era.name,
-                    "year_range": era.year_range or "",
-                },
-                "zone": {"id": zone.id, "name": zone.name},
-            }
-        )
-
     return success_response(
         {"posts": data, "pagination": {"page": page, "total": paginated.total}},
         "All posts fetched",
@@ -1845,6 +1589,7 @@ def list_all_posts(current_user=None):
 
 @community_bp.route("/posts", methods=["GET"])
 @token_required
+@read_replica
 def list_posts(current_user=None):
     """
     List posts with pagination and filters
@@ -1856,7 +1601,13 @@ def list_posts(current_user=None):
         in: query
         type: integer
         example: 1
-        description: Filter posts by era
+        description: Filter posts by era (with sort=hot this is the era's hot feed)
+      - name: sort
+        in: query
+        type: string
+        enum: [new, hot]
+        default: new
+        description: "new: newest first; hot: precomputed hot_score (see flask community rank-hot)"
       - name: page
         in: query
         type: integer
@@ -1867,6 +1618,16 @@ def list_posts(current_user=None):
         type: integer
         example: 20
         default: 20
+      - name: fields
+        in: query
+        type: string
+        example: "id,title,content,author,likes_count"
+        description: Comma-separated keys to return per post (default all); leaving out content and media skips loading them
+      - name: preview_chars
+        in: query
+        type: integer
+        example: 140
+        description: Truncate content to this many characters (adds content_truncated)
     responses:
       200:
         description: Posts fetched successfully
@@ -1915,122 +1676,27 @@ def list_posts(current_user=None):
     era_id = request.args.get("era_id", type=int)
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 20, type=int)
+    sort = request.args.get("sort", "new")
+    if sort not in POST_SORTS:
+        return error_response(f"sort must be one of: {', '.join(POST_SORTS)}", 400)
 
-    query = (
-        db.session.query(
-            Post,
-            User,  # Post author
-            Zone,
-            Era,
-            func.count(distinct(Like.id)).label("likes_count"),
-            func.count(
-                distinct(case((Like.reaction_type == "agree", Like.id), else_=None))
-            ).label("agree_count"),
-            func.count(
-                distinct(case((Like.reaction_type == "disagree", Like.id), else_=None))
-            ).label("disagree_count"),
-            func.count(distinct(Comment.id)).label("comments_count"),
-        )
-        .outerjoin(Like, (Like.post_id == Post.id) & (Like.type == "post"))
-        .outerjoin(Comment, Comment.post_id == Post.id)
-        .join(User, Post.user_id == User.id)  # Join with User to get author
-        .join(Zone, Post.zone_id == Zone.id)
-        .join(Era, Zone.era_id == Era.id)
-        .group_by(Post.id, User.id, Zone.id, Era.id)
-    )
-
-    # If no era_id specified, default to user's communities
-    # if not era_id and current_user:
-    #     user_era_ids = [era.id for era in current_user.joined_eras]
-    #     if user_era_ids:
-    #         query = query.filter(Era.id.in_(user_era_ids))
-
+    # Pick the page from the posts index first, then serve those rows from
+    # the post-card cache (counts are aggregated only for cache misses)
+    page_query = db.session.query(Post.id).join(Zone, Post.zone_id == Zone.id)
     if era_id:
-        query = query.filter(Era.id == era_id)
-
-    paginated = query.order_by(Post.created_at.desc()).paginate(
+        page_query = page_query.filter(Zone.era_id == era_id)
+    paginated = page_query.order_by(*POST_SORTS[sort]).paginate(
         page=page, per_page=per_page, error_out=False
     )
+    page_ids = [row.id for row in paginated.items]
+    data = render_post_cards(page_ids, current_user, **feed_options(request.args))
 
-    user_reactions = {}
-    bookmarked_posts = set()
-
-    if current_user:
-        post_ids = [post.id for post, _, _, _, _, _, _, _ in paginated.items]
-        if post_ids:
-            # Get user reactions
-            reactions = Like.query.filter(
-                Like.user_id == current_user.id,
-                Like.post_id.in_(post_ids),
-                Like.type == "post",
-            ).all()
-            user_reactions = {r.post_id: r.reaction_type for r in reactions}
-
-            # Get bookmarked posts
-            bookmarks = Bookmark.query.filter(
-                Bookmark.user_id == current_user.id,
-                Bookmark.post_id.in_(post_ids)
-            ).all()
-            bookmarked_posts = {bm.post_id for bm in bookmarks}
-
-    data = []
-    user_reshared_posts = set()
-    if current_user:
-        post_ids = [post.id for post, _, _, _, _, _, _, _ in paginated.items]
-        if post_ids:
-            reshares = Reshare.query.filter(
-                Reshare.user_id == current_user.id, Reshare.post_id.in_(post_ids)
-            ).all()
-            user_reshared_posts = {r.post_id for r in reshares}
-    for (
-        post,
-        user,  # Post author
-        zone,
-        era,
-        likes_count,
-        agree_count,
-        disagree_count,
-        comments_count,
-    ) in paginated.items:
-        user_reaction = user_reactions.get(post.id)
-        is_bookmarked = post.id in bookmarked_posts if current_user else False
-        user_reshared = post.id in user_reshared_posts if current_user else False
-
-        data.append(
-            {
-                "id": post.id,
-                "title": post.title,
-                "content": post.content,
-                "media": (post.media.split("|") if post.media else []),
-                "created_at": post.created_at.isoformat(),
-                "time_ago": time_ago(post.created_at),
-                "pinned": post.pinned,
-                "hot_thread": post.hot_thread,
-                "likes_count": likes_count or 0,
-                "agree_count": agree_count or 0,
-                "disagree_count": disagree_count or 0,
-                "user_agreed": user_reaction == "agree",
-                "user_disagreed": user_reaction == "disagree",
-                "comments_count": comments_count or 0,
-                "bookmarked": is_bookmarked,  # Add bookmarked status
-                "user_reshared": user_reshared,  # Add reshared status
-                "author": {
-                    "id": user.id,
-                    "firstname": user.firstname,  # FIXED: Use post author's firstname
-                    "lastname": user.lastname,    # FIXED: Use post author's lastname
-                    "username": user.username,
-                    "avatar": user.avatar or "",
-                },
-                "era": {
-                    "id": era.id,
-                    "name": era.name,
-                    "year_range": era.year_range or "",
-                },
-                "zone": {"id": zone.id, "name": zone.name},
-            }
-        )
     return success_response(
-        {"posts": data, "pagination": {"page": page, "total": paginated.total}},
+        {
+            "posts": data,
+            "pagination": {"page": page, "total": paginated.total},
+            "sort": sort,
+        },
         "Posts fetched",
     )
 
@@ -2158,6 +1824,9 @@ def delete_post(current_user, post_id):
             # Delete reshare records for this post
             Reshare.query.filter_by(post_id=post_id).delete()
 
+            # Drop the post and its comments from the search index
+            remove_post(post_id)
+
             # If you have any other related tables, add them here
 
             print("🔍 DEBUG: All related records deleted, now deleting post...")
@@ -2168,17 +1837,21 @@ def delete_post(current_user, post_id):
             return error_response("Failed to clean up post dependencies", 500)
 
         # Now delete the post
+        era_id = post.zone.era_id
+        record_change(
+            "post", "delete", post_id, era_id, post_id=post_id, user_id=current_user.id
+        )
         db.session.delete(post)
-        db.session.commit()
-
-        print("✅ DEBUG: Post deleted successfully")
 
         # 🔴 Emit real-time event
-        socketio.emit(
+        publish(
             "post_deleted",
             {"id": post_id, "deleted_by": current_user.id, "was_admin": is_admin},
-            broadcast=True,
         )
+        db.session.commit()
+        remove_from_timelines(post_id, era_id)
+
+        print("✅ DEBUG: Post deleted successfully")
 
         return success_response(message="Post deleted successfully")
 
@@ -2253,7 +1926,18 @@ def add_comment(current_user, post_id):
         parent_comment_id=parent_comment_id
     )
     db.session.add(comment)
-    db.session.commit()
+    db.session.flush()
+    index_comment(comment, post)
+    bump_card_version(post.id)
+    record_change(
+        "comment",
+        "upsert",
+        comment.id,
+        post.zone.era_id,
+        post_id=post.id,
+        user_id=current_user.id,
+        data={"parent_comment_id": comment.parent_comment_id},
+    )
 
     # Get the author info for the response
     user = User.query.get(current_user.id)
@@ -2274,14 +1958,14 @@ def add_comment(current_user, post_id):
     }
 
     # 🔴 Emit real-time event
-    socketio.emit(
+    publish(
         "comment_added",
         {
             **comment_data,
             "post_id": comment.post_id,
         },
-        # broadcast=True,
     )
+    db.session.commit()
 
     return success_response(
         {"comment": comment_data},
@@ -2475,10 +2159,8 @@ def reshare_post(current_user, post_id):
         # Increment reshare counter
         post.reshare_count += 1
         
-        db.session.commit()
-        
         # 🔴 Emit real-time event
-        socketio.emit(
+        publish(
             "post_reshared",
             {
                 "post_id": post_id,
@@ -2486,8 +2168,9 @@ def reshare_post(current_user, post_id):
                 "reshared_by": current_user.id,
                 "reshared_by_username": current_user.username
             },
-            broadcast=True
         )
+        db.session.commit()
+        invalidate_viewer_state(current_user.id, post_id)
         
         return success_response(
             {
@@ -2544,18 +2227,17 @@ def unreshare_post(current_user, post_id):
         # Decrement reshare counter (ensure it doesn't go below 0)
         post.reshare_count = max(0, post.reshare_count - 1)
 
-        db.session.commit()
-
         # 🔴 Emit real-time event
-        socketio.emit(
+        publish(
             "post_unreshared",
             {
                 "post_id": post_id,
                 "reshare_count": post.reshare_count,
                 "unreshared_by": current_user.id
             },
-            broadcast=True
         )
+        db.session.commit()
+        invalidate_viewer_state(current_user.id, post_id)
 
         return success_response(
             {
@@ -2595,10 +2277,7 @@ def get_reshare_status(current_user, post_id):
     if not post:
         return error_response("Post not found", 404)
 
-    has_reshared = (
-        Reshare.query.filter_by(user_id=current_user.id, post_id=post_id).first()
-        is not NoneReshare # type: ignore
-    )
+    has_reshared = get_viewer_state(current_user.id, [post_id])[post_id]["reshared"]
 
     return success_response(
         {"user_reshared": has_reshared, "reshare_count": post.reshare_count},
@@ -2826,41 +2505,62 @@ def _handle_reaction(current_user, post_id, reaction_type):
     existing_reaction = Like.query.filter_by(
         user_id=current_user.id, post_id=post_id, type="post"
     ).first()
+    # every branch below changes the post's counts
+    bump_card_version(post_id)
 
     if existing_reaction:
         if existing_reaction.reaction_type == reaction_type:
             # User is clicking the same button - remove the reaction
+            record_change(
+                "reaction",
+                "delete",
+                existing_reaction.id,
+                post.zone.era_id,
+                post_id=post_id,
+                user_id=current_user.id,
+                data={"reaction_type": reaction_type},
+            )
             db.session.delete(existing_reaction)
-            db.session.commit()
 
             # Emit reaction removed event
-            socketio.emit(
+            publish(
                 f"post_{reaction_type}_removed",
                 {
                     "post_id": post_id,
                     "user_id": current_user.id,
                     "reaction_type": reaction_type,
                 },
-                # broadcast=True,
             )
+            db.session.commit()
+            invalidate_viewer_state(current_user.id, post_id)
 
             return success_response(message=f"{reaction_type.capitalize()} removed")
         else:
             # User is switching reaction types - update existing reaction
+            old_reaction_type = existing_reaction.reaction_type
             existing_reaction.reaction_type = reaction_type
-            db.session.commit()
+            record_change(
+                "reaction",
+                "upsert",
+                existing_reaction.id,
+                post.zone.era_id,
+                post_id=post_id,
+                user_id=current_user.id,
+                data={"reaction_type": reaction_type},
+            )
 
             # Emit reaction changed event
-            socketio.emit(
-                f"post_reaction_changed",
+            publish(
+                "post_reaction_changed",
                 {
                     "post_id": post_id,
                     "user_id": current_user.id,
-                    "old_reaction_type": existing_reaction.reaction_type,
+                    "old_reaction_type": old_reaction_type,
                     "new_reaction_type": reaction_type,
                 },
-                broadcast=True,
             )
+            db.session.commit()
+            invalidate_viewer_state(current_user.id, post_id)
 
             return success_response(message=f"Reaction changed to {reaction_type}")
     else:
@@ -2872,18 +2572,28 @@ def _handle_reaction(current_user, post_id, reaction_type):
             reaction_type=reaction_type,
         )
         db.session.add(reaction)
-        db.session.commit()
+        db.session.flush()
+        record_change(
+            "reaction",
+            "upsert",
+            reaction.id,
+            post.zone.era_id,
+            post_id=post_id,
+            user_id=current_user.id,
+            data={"reaction_type": reaction_type},
+        )
 
         # Emit new reaction event
-        socketio.emit(
+        publish(
             f"post_{reaction_type}_added",
             {
                 "post_id": post_id,
                 "user_id": current_user.id,
                 "reaction_type": reaction_type,
             },
-            broadcast=True,
         )
+        db.session.commit()
+        invalidate_viewer_state(current_user.id, post_id)
 
         return success_response(
             message=f"{reaction_type.capitalize()} added", status=201
@@ -2894,6 +2604,7 @@ def _handle_reaction(current_user, post_id, reaction_type):
 # GET REACTION COUNTS
 # ---------------------------
 @community_bp.route("/posts/<int:post_id>/reactions", methods=["GET"])
+@public_cache(max_age=10)
 def get_post_reactions(post_id):
     """
     Get agree/disagree counts for a post
@@ -2916,6 +2627,11 @@ def get_post_reactions(post_id):
     if not post:
         return error_response("Post not found", 404)
 
+    # card_version moves with every reaction
+    not_modified = version_etag("reactions", post.id, post.card_version)
+    if not_modified:
+        return not_modified
+
     agree_count = Like.query.filter_by(
         post_id=post_id, type="post", reaction_type="agree"
     ).count()
@@ -2961,14 +2677,12 @@ def get_my_reaction(current_user, post_id):
     if not post:
         return error_response("Post not found", 404)
 
-    my_reaction = Like.query.filter_by(
-        user_id=current_user.id, post_id=post_id, type="post"
-    ).first()
+    my_reaction = get_viewer_state(current_user.id, [post_id])[post_id]["reaction"]
 
     reaction_data = {
         "post_id": post_id,
         "user_reacted": my_reaction is not None,
-        "reaction_type": my_reaction.reaction_type if my_reaction else None,
+        "reaction_type": my_reaction,
     }
 
     return success_response(reaction_data, "User reaction status retrieved")
@@ -3016,10 +2730,10 @@ def create_event(current_user):
         event_date=data["event_date"],
     )
     db.session.add(event)
-    db.session.commit()
+    db.session.flush()
 
     # 🔴 Emit real-time event
-    socketio.emit(
+    publish(
         "event_created",
         {
             "id": event.id,
@@ -3027,8 +2741,8 @@ def create_event(current_user):
             "description": event.description,
             "event_date": str(event.event_date),
         },
-        broadcast=True,
     )
+    db.session.commit()
 
     return success_response(message="Event created successfully", status=201)
 
@@ -3075,14 +2789,12 @@ def rsvp_event(current_user, event_id):
         rsvp = RSVP(status=data["status"], user_id=current_user.id, event_id=event_id)
         db.session.add(rsvp)
 
-    db.session.commit()
-
     # 🔴 Emit real-time event
-    socketio.emit(
+    publish(
         "event_rsvp",
         {"event_id": event_id, "user_id": current_user.id, "status": data["status"]},
-        broadcast=True,
     )
+    db.session.commit()
 
     return success_response(message="RSVP updated successfully")
 
@@ -3188,6 +2900,7 @@ def get_community_members(current_user, zone_id):
 
 @community_bp.route("/<int:zone_id>/posts", methods=["GET"])
 @token_required
+@read_replica
 def get_zone_posts(current_user=None, zone_id=None):
     """
     Get all posts in a specific zone with full details (same shape as all other feeds)
@@ -1,4 +1,5 @@
-from flask import Blueprint, request
+from flask import Blueprint, current_app, request
+from sqlalchemy.exc import IntegrityError
 from app import db
 from app.models import (
     Event,
@@ -8,8 +9,17 @@ from app.models import (
     # MissionProgress,
     MissionParticipant,
 )
-from app.utils.decorators import token_required, roles_required
+from app.utils.decorators import token_required, token_optional, roles_required
 from app.utils.responses import success_response, error_response
+from app.utils.replica import read_replica
+from app.middlewares.http_cache import public_cache
+from app.utils.missions import (
+    mission_progress,
+    claim_completion,
+    participant_status,
+    record_completion,
+    record_join,
+)
 from datetime import datetime
 
 events_bp = Blueprint("events", __name__, url_prefix="/events")
@@ -37,14 +47,35 @@ def mission_to_dict(mission):
         "description": mission.description,
         "points": mission.points,
         "event_id": mission.event_id,
+        "badge_id": mission.badge_id,
+        "participant_count": mission.participant_count or 0,
+        "completed_count": mission.completed_count or 0,
         "created_at": mission.created_at.isoformat() if mission.created_at else None,
     }
 
 
+def mission_progress_to_dict(mission, participant):
+    data = mission_to_dict(mission)
+    data["status"] = participant_status(participant)
+    data["joined_at"] = (
+        participant.joined_at.isoformat()
+        if participant and participant.joined_at
+        else None
+    )
+    data["completed_at"] = (
+        participant.completed_at.isoformat()
+        if participant and participant.completed_at
+        else None
+    )
+    return data
+
+
 # ---------------------------
 # EVENTS
 # ---------------------------
 @events_bp.route("/", methods=["GET"])
+@public_cache(max_age=60)
+@read_replica
 def list_events():
     """
     List all events
@@ -373,7 +404,8 @@ def rsvp_event(current_user, event_id):
 # MISSIONS
 # ---------------------------
 @events_bp.route("/<int:event_id>/missions", methods=["GET"])
-def list_missions(event_id):
+@token_optional
+def list_missions(current_user, event_id):
     """
     List missions for an event
     ---
@@ -386,12 +418,52 @@ def list_missions(event_id):
         type: integer
     responses:
       200:
-        description: Missions fetched successfully
+        description: Missions fetched successfully (with the caller's status when authenticated)
     """
     """List missions for an event."""
-    missions = Mission.query.filter_by(event_id=event_id).all()
+    rows = mission_progress(
+        user_id=current_user.id if current_user else None, event_id=event_id
+    )
+    if current_user:
+        data = [mission_progress_to_dict(m, p) for m, p in rows]
+    else:
+        data = [mission_to_dict(m) for m, _ in rows]
+    return success_response(data, "Missions fetched successfully")
+
+
+@events_bp.route("/missions/me", methods=["GET"])
+@token_required
+def list_my_missions(current_user):
+    """
+    List the current user's missions with progress
+    ---
+    tags:
+      - Missions
+    parameters:
+      - in: query
+        name: event_id
+        type: integer
+        required: false
+        description: Only missions of this event
+      - in: query
+        name: joined
+        type: boolean
+        required: false
+        default: true
+        description: Only missions the user has joined (false = all missions with status)
+    responses:
+      200:
+        description: Missions fetched successfully
+    """
+    joined_only = request.args.get("joined", "true").lower() != "false"
+    rows = mission_progress(
+        user_id=current_user.id,
+        event_id=request.args.get("event_id", type=int),
+        joined_only=joined_only,
+    )
     return success_response(
-        [mission_to_dict(m) for m in missions], "Missions fetched successfully"
+        [mission_progress_to_dict(m, p) for m, p in rows],
+        "Missions fetched successfully",
     )
 
 
@@ -424,12 +496,17 @@ def create_mission(current_user, event_id):
         description: Mission created successfully
       400:
         description: Invalid input
+      404:
+        description: Event not found
     """
     """Admin-only: create a mission for an event."""
     data = request.get_json() or {}
     if not data.get("title") or not data.get("points"):
         return error_response("title and points are required", 400)
 
+    if not db.session.query(Event.id).filter_by(id=event_id).first():
+        return error_response("Event not found", 404)
+
     mission = Mission(
         title=data["title"],
         description=data.get("description"),
@@ -463,6 +540,8 @@ def join_mission(current_user, mission_id):
         description: Mission not found
       400:
         description: Already joined this mission
+      409:
+        description: A concurrent request joined this mission first
     """
     mission = Mission.query.get(mission_id)
     if not mission:
@@ -473,8 +552,17 @@ def join_mission(current_user, mission_id):
         return error_response("Already joined this mission", 400)
 
     participant = MissionParticipant(user_id=current_user.id, mission_id=mission_id, status="joined")
-    db.session.add(participant)
-    db.session.commit()
+    try:
+        db.session.add(participant)
+        record_join(mission_id)  # autoflush inserts the participant first
+        db.session.commit()
+    except IntegrityError:
+        # a concurrent request from the same user joined first
+        db.session.rollback()
+        current_app.logger.info(
+            f"Duplicate mission join user={current_user.id} mission={mission_id}"
+        )
+        return error_response("Already joined this mission", 409)
     return success_response({"mission_id": mission_id}, "Mission joined successfully")
 
 
@@ -498,6 +586,8 @@ def complete_mission(current_user, mission_id):
         description: Mission not found
       400:
         description: Already completed or not joined
+      409:
+        description: A concurrent request completed this mission first
     """
     mission = Mission.query.get(mission_id)
     if not mission:
@@ -511,9 +601,12 @@ def complete_mission(current_user, mission_id):
     if participant.status == "completed":
         return error_response("Mission already completed", 400)
 
-    participant.status = "completed"
-    participant.completed_at = datetime.utcnow()
-    current_user.points += mission.points  # reward points
+    # the check above is only for the error message: the claim is what makes
+    # the counter and the reward happen once
+    if not claim_completion(current_user.id, mission_id):
+        db.session.rollback()
+        return error_response("Mission already completed", 409)
+    record_completion(mission_id, current_user.id, mission.points or 0)  # reward points
 
     db.session.commit()
     return success_response(
@@ -1,12 +1,161 @@
 # app/routes/feedback/routes.py
-from flask import Blueprint, request
-from app.extensions import db
-from app.models import Feedback, FeedbackVote
-from app.utils.decorators import token_required, roles_required
+from flask import Blueprint, request, current_app
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime
+from app.extensions import db, jobs
+from app.models import Feedback, FeedbackVote, feedback_controversy, feedback_score
+from app.utils.decorators import token_required, token_optional, roles_required
 from app.utils.responses import success_response, error_response
 
 feedback_bp = Blueprint("feedback", __name__, url_prefix="/feedback")
 
+# sort name -> ORDER BY clause (each one is backed by an index in models.py)
+FEEDBACK_SORTS = {
+    "new": (Feedback.created_at.desc(), Feedback.id.desc()),
+    "top": (feedback_score.desc(), Feedback.created_at.desc()),
+    "controversial": (
+        feedback_controversy.desc(),
+        (Feedback.upvotes + Feedback.downvotes).desc(),
+    ),
+}
+MAX_PER_PAGE = 100
+# hard stop for the reply walk, also protects against accidental cycles
+MAX_THREAD_DEPTH = 50
+
+
+def feedback_to_dict(f):
+    return {
+        "id": f.id,
+        "content": f.content,
+        "category": f.category,
+        "user_id": f.user_id,
+        "parent_id": f.feedback_id,
+        "upvotes": f.upvotes or 0,
+        "downvotes": f.downvotes or 0,
+        "created_at": f.created_at.isoformat() if f.created_at else None,
+    }
+
+
+def _supports_recursive_cte():
+    dialect = db.engine.dialect
+    if dialect.name == "sqlite":
+        return dialect.dbapi.sqlite_version_info >= (3, 8, 3)
+    return dialect.name in ("postgresql", "mysql", "mariadb")
+
+
+def _load_subtrees(root_ids):
+    """
+    Load the given feedback rows and every reply beneath them.
+    One recursive CTE where supported, otherwise one query per depth level.
+    """
+    if not root_ids:
+        return []
+
+    if _supports_recursive_cte():
+        tree = (
+            select(Feedback.id, literal(0).label("depth"))
+            .where(Feedback.id.in_(root_ids))
+            .cte("feedback_tree", recursive=True)
+        )
+        tree = tree.union_all(
+            select(Feedback.id, tree.c.depth + 1)
+            .join(tree, Feedback.feedback_id == tree.c.id)
+            .where(tree.c.depth < MAX_THREAD_DEPTH)
+        )
+        return Feedback.query.join(tree, Feedback.id == tree.c.id).all()
+
+    rows = Feedback.query.filter(Feedback.id.in_(root_ids)).all()
+    frontier = [f.id for f in rows]
+    for _ in range(MAX_THREAD_DEPTH):
+        if not frontier:
+            break
+        level = Feedback.query.filter(Feedback.feedback_id.in_(frontier)).all()
+        rows.extend(level)
+        frontier = [f.id for f in level]
+    return rows
+
+
+def _build_threads(root_ids, current_user):
+    """Nest the loaded rows under their roots, with the caller's vote on each node"""
+    rows = _load_subtrees(root_ids)
+
+    my_votes = {}
+    if current_user and rows:
+        my_votes = dict(
+            db.session.query(FeedbackVote.feedback_id, FeedbackVote.vote_type)
+            .filter(
+                FeedbackVote.user_id == current_user.id,
+                FeedbackVote.feedback_id.in_([f.id for f in rows]),
+            )
+            .all()
+        )
+
+    nodes = {}
+    for f in rows:
+        node = feedback_to_dict(f)
+        node["my_vote"] = my_votes.get(f.id)
+        node["replies"] = []
+        nodes[f.id] = node
+
+    root_set = set(root_ids)
+    for f in sorted(rows, key=lambda f: (f.created_at or datetime.min, f.id)):
+        if f.id not in root_set and f.feedback_id in nodes:
+            nodes[f.feedback_id]["replies"].append(nodes[f.id])
+
+    return [nodes[rid] for rid in root_ids if rid in nodes]
+
+
+def reconcile_feedback_counters():
+    """
+    Recompute upvotes/downvotes from feedback_votes and fix rows that drifted.
+    Returns the number of feedback rows corrected.
+    """
+    tallies = (
+        db.session.query(
+            FeedbackVote.feedback_id.label("feedback_id"),
+            func.sum(db.case((FeedbackVote.vote_type == "upvote", 1), else_=0)).label(
+                "upvotes"
+            ),
+            func.sum(
+                db.case((FeedbackVote.vote_type == "downvote", 1), else_=0)
+            ).label("downvotes"),
+        )
+        .group_by(FeedbackVote.feedback_id)
+        .subquery()
+    )
+    real_up = func.coalesce(tallies.c.upvotes, 0)
+    real_down = func.coalesce(tallies.c.downvotes, 0)
+
+    drifted = (
+        db.session.query(Feedback.id, real_up, real_down)
+        .outerjoin(tallies, tallies.c.feedback_id == Feedback.id)
+        .filter(
+            (func.coalesce(Feedback.upvotes, -1) != real_up)
+            | (func.coalesce(Feedback.downvotes, -1) != real_down)
+        )
+        .all()
+    )
+    if drifted:
+        db.session.execute(
+            update(Feedback),
+            [{"id": fid, "upvotes": up, "downvotes": down} for fid, up, down in drifted],
+        )
+    db.session.commit()
+    return len(drifted)
+
+
+@feedback_bp.cli.command("reconcile")
+def reconcile_command():
+    """Fix feedback vote counters that drifted from feedback_votes"""
+    fixed = reconcile_feedback_counters()
+    print(f"Reconciled {fixed} feedback rows.")
+
+
+@jobs.periodic("FEEDBACK_RECONCILE_INTERVAL_SECONDS", queue="maintenance")
+def reconcile_feedback_job():
+    reconcile_feedback_counters()
+
 
 # ---------------------------
 # SUBMIT FEEDBACK
@@ -28,21 +177,29 @@ def submit_feedback(current_user):
           properties:
             content: {type: string}
             category: {type: string, default: general}
+            parent_id: {type: integer, description: "ID of feedback being replied to"}
     responses:
       201:
         description: Feedback submitted successfully
       400:
         description: Content is required
+      404:
+        description: Parent feedback not found
     """
     """Submit new feedback"""
     data = request.get_json()
     if not data.get("content"):
         return error_response("Content is required", 400)
 
+    parent_id = data.get("parent_id")
+    if parent_id and not db.session.query(Feedback.id).filter_by(id=parent_id).first():
+        return error_response("Parent feedback not found", 404)
+
     feedback = Feedback(
         content=data["content"],
         category=data.get("category", "general"),
         user_id=current_user.id,
+        feedback_id=parent_id,
     )
     db.session.add(feedback)
     db.session.commit()
@@ -55,6 +212,7 @@ def submit_feedback(current_user):
             "content": feedback.content,
             "category": feedback.category,
             "user_id": feedback.user_id,
+            "parent_id": feedback.feedback_id,
             "upvotes": 0,
             "downvotes": 0,
         },
@@ -67,31 +225,146 @@ def submit_feedback(current_user):
 @feedback_bp.route("/", methods=["GET"])
 def list_feedback():
     """
-    List all feedback
+    List top-level feedback (paginated)
     ---
     tags:
       - Feedback
+    parameters:
+      - name: sort
+        in: query
+        type: string
+        enum: [new, top, controversial]
+        default: new
+      - name: page
+        in: query
+        type: integer
+        default: 1
+      - name: per_page
+        in: query
+        type: integer
+        default: 20
     responses:
       200:
         description: Feedback fetched successfully
+      400:
+        description: Invalid sort
     """
-    """Fetch all feedback with votes"""
-    feedback_list = Feedback.query.order_by(Feedback.created_at.desc()).all()
-    data = []
-    for f in feedback_list:
-        data.append(
-            {
-                "id": f.id,
-                "content": f.content,
-                "category": f.category,
-                "user_id": f.user_id,
-                "upvotes": f.upvotes,
-                "downvotes": f.downvotes,
-                "created_at": f.created_at,
-            }
+    sort = request.args.get("sort", "new")
+    if sort not in FEEDBACK_SORTS:
+        return error_response(
+            f"sort must be one of: {', '.join(FEEDBACK_SORTS)}", 400
         )
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 20, type=int), 1), MAX_PER_PAGE)
 
-    return success_response(data, "Feedback fetched successfully")
+    paginated = (
+        Feedback.query.filter(Feedback.feedback_id.is_(None))
+        .order_by(*FEEDBACK_SORTS[sort])
+        .paginate(page=page, per_page=per_page, error_out=False)
+    )
+
+    return success_response(
+        {
+            "feedback": [feedback_to_dict(f) for f in paginated.items],
+            "pagination": {
+                "page": page,
+                "per_page": per_page,
+                "total": paginated.total,
+                "pages": paginated.pages,
+                "has_next": paginated.has_next,
+            },
+            "sort": sort,
+        },
+        "Feedback fetched successfully",
+    )
+
+
+# ---------------------------
+# FEEDBACK THREADS (Public)
+# ---------------------------
+@feedback_bp.route("/threads", methods=["GET"])
+@token_optional
+def list_feedback_threads(current_user):
+    """
+    List a page of top-level feedback with their full reply trees
+    ---
+    tags:
+      - Feedback
+    parameters:
+      - name: sort
+        in: query
+        type: string
+        enum: [new, top, controversial]
+        default: new
+      - name: page
+        in: query
+        type: integer
+        default: 1
+      - name: per_page
+        in: query
+        type: integer
+        default: 20
+    responses:
+      200:
+        description: Feedback threads fetched successfully
+      400:
+        description: Invalid sort
+    """
+    sort = request.args.get("sort", "new")
+    if sort not in FEEDBACK_SORTS:
+        return error_response(
+            f"sort must be one of: {', '.join(FEEDBACK_SORTS)}", 400
+        )
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 20, type=int), 1), MAX_PER_PAGE)
+
+    paginated = (
+        db.session.query(Feedback.id)
+        .filter(Feedback.feedback_id.is_(None))
+        .order_by(*FEEDBACK_SORTS[sort])
+        .paginate(page=page, per_page=per_page, error_out=False)
+    )
+    root_ids = [row.id for row in paginated.items]
+
+    return success_response(
+        {
+            "threads": _build_threads(root_ids, current_user),
+            "pagination": {
+                "page": page,
+                "per_page": per_page,
+                "total": paginated.total,
+                "pages": paginated.pages,
+                "has_next": paginated.has_next,
+            },
+            "sort": sort,
+        },
+        "Feedback threads fetched successfully",
+    )
+
+
+@feedback_bp.route("/<int:feedback_id>/thread", methods=["GET"])
+@token_optional
+def get_feedback_thread(current_user, feedback_id):
+    """
+    Get a feedback item with its full reply tree
+    ---
+    tags:
+      - Feedback
+    parameters:
+      - in: path
+        name: feedback_id
+        required: true
+        type: integer
+    responses:
+      200:
+        description: Feedback thread fetched successfully
+      404:
+        description: Feedback not found
+    """
+    threads = _build_threads([feedback_id], current_user)
+    if not threads:
+        return error_response("Feedback not found", 404)
+    return success_response(threads[0], "Feedback thread fetched successfully")
 
 
 # ---------------------------
@@ -126,44 +399,62 @@ def vote_feedback(current_user, feedback_id):
         description: Invalid vote value
       404:
         description: Feedback not found
+      409:
+        description: Concurrent duplicate vote, retry
     """
     """Vote on feedback (upvote/downvote)"""
     data = request.get_json()
     if not data.get("vote") or data["vote"] not in ["upvote", "downvote"]:
         return error_response("Vote must be 'upvote' or 'downvote'", 400)
 
-    feedback = Feedback.query.get(feedback_id)
-    if not feedback:
+    if not db.session.query(Feedback.id).filter_by(id=feedback_id).first():
         return error_response("Feedback not found", 404)
 
+    vote_type = data["vote"]
     existing_vote = FeedbackVote.query.filter_by(
         user_id=current_user.id, feedback_id=feedback_id
     ).first()
 
+    # Work out how this vote moves the counters instead of re-counting them
+    delta = {"upvote": 0, "downvote": 0}
     if existing_vote:
-        existing_vote.vote_type = data["vote"]
+        if existing_vote.vote_type != vote_type:
+            delta[existing_vote.vote_type] -= 1
+            delta[vote_type] += 1
+            existing_vote.vote_type = vote_type
     else:
-        vote = FeedbackVote(
-            user_id=current_user.id, feedback_id=feedback_id, vote_type=data["vote"]
+        db.session.add(
+            FeedbackVote(
+                user_id=current_user.id, feedback_id=feedback_id, vote_type=vote_type
+            )
         )
-        db.session.add(vote)
-
-    # Update counters
-    feedback.upvotes = FeedbackVote.query.filter_by(
-        feedback_id=feedback_id, vote_type="upvote"
-    ).count()
-    feedback.downvotes = FeedbackVote.query.filter_by(
-        feedback_id=feedback_id, vote_type="downvote"
-    ).count()
+        delta[vote_type] += 1
 
-    db.session.commit()
+    try:
+        upvotes, downvotes = db.session.execute(
+            update(Feedback)
+            .where(Feedback.id == feedback_id)
+            .values(
+                upvotes=func.coalesce(Feedback.upvotes, 0) + delta["upvote"],
+                downvotes=func.coalesce(Feedback.downvotes, 0) + delta["downvote"],
+            )
+            .returning(Feedback.upvotes, Feedback.downvotes)
+        ).one()
+        db.session.commit()
+    except IntegrityError:
+        # a concurrent request from the same user inserted the vote first
+        db.session.rollback()
+        current_app.logger.info(
+            f"Duplicate feedback vote user={current_user.id} feedback={feedback_id}"
+        )
+        return error_response("Vote already being recorded, please retry", 409)
 
     return success_response(
         message="Vote recorded successfully",
         data={
-            "id": feedback.id,
-            "upvotes": feedback.upvotes,
-            "downvotes": feedback.downvotes,
+            "id": feedback_id,
+            "upvotes": upvotes,
+            "downvotes": downvotes,
         },
     )
 
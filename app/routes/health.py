@@ -1,44 +1,154 @@
-from flask import Blueprint, jsonify
+import hmac
+import threading
+import time
+
+from flask import Blueprint, Response, current_app, jsonify, request
 from app.extensions import db
+from app.utils.metrics import registry
 from datetime import datetime
-from sqlalchemy import text  # <-- Add this import
+from sqlalchemy import text
 
 health_bp = Blueprint("health", __name__)
 
 
+# Load balancers probe every few seconds per instance, so the DB ping result
+# is shared for READINESS_CACHE_TTL seconds instead of hitting the DB each time.
+_ping_lock = threading.Lock()
+_last_ping = {"at": None, "ok": False, "error": None}
+
+
+def _pool_status():
+    """Checked-out connections vs. capacity; capacity is None for unbounded pools"""
+    pool = db.engine.pool
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+        return {"checked_out": None, "capacity": None, "saturated": False}
+
+    checked_out = pool.checkedout()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    capacity = None if max_overflow < 0 else pool.size() + max_overflow
+    saturated = capacity is not None and checked_out >= capacity
+    return {"checked_out": checked_out, "capacity": capacity, "saturated": saturated}
+
+
+def _ping_database():
+    """SELECT 1 at most once per READINESS_CACHE_TTL; concurrent probes reuse the last result"""
+    config = current_app.config
+    ttl = config.get("READINESS_CACHE_TTL", 2)
+
+    def fresh():
+        return _last_ping["at"] is not None and time.monotonic() - _last_ping["at"] < ttl
+
+    if fresh():
+        return _last_ping["ok"], _last_ping["error"]
+
+    # until a first ping has finished there is no result to reuse, so wait for it
+    first = _last_ping["at"] is None
+    if first:
+        acquired = _ping_lock.acquire(timeout=config.get("READINESS_FIRST_PING_TIMEOUT", 5))
+    else:
+        acquired = _ping_lock.acquire(blocking=False)
+
+    if acquired:
+        try:
+            if not fresh():  # nobody pinged while we waited for the lock
+                with db.engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                _last_ping.update(at=time.monotonic(), ok=True, error=None)
+        except Exception as e:
+            _last_ping.update(at=time.monotonic(), ok=False, error=str(e))
+        finally:
+            _ping_lock.release()
+    elif first:
+        return False, "database ping timed out"
+
+    return _last_ping["ok"], _last_ping["error"]
+
+
+def _readiness():
+    pool = _pool_status()
+    if pool["saturated"]:
+        # a ping would just queue behind the busy connections
+        ok, error = False, "connection pool saturated"
+    else:
+        ok, error = _ping_database()
+
+    payload = {
+        "status": "healthy" if ok else "unhealthy",
+        "service": "National Cake Community API",
+        "database": "connected" if ok else "disconnected",
+        "pool": pool,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+    if error:
+        payload["error"] = error
+    return jsonify(payload), 200 if ok else 503
+
+
+@health_bp.route("/livez", methods=["GET"])
+def liveness():
+    """
+    Liveness probe - the process is up and serving requests (no DB access)
+    ---
+    tags:
+      - Health
+    responses:
+      200:
+        description: Process is alive
+    """
+    return jsonify({"status": "alive"}), 200
+
+
+@health_bp.route("/readyz", methods=["GET"])
+def readiness():
+    """
+    Readiness probe - the database answers and the connection pool has room
+    ---
+    tags:
+      - Health
+    responses:
+      200:
+        description: Ready to take traffic
+      503:
+        description: Database unreachable or connection pool saturated
+    """
+    return _readiness()
+
+
 @health_bp.route("/health", methods=["GET"])
 def health_check():
-    """Health check and database initialization endpoint"""
-    try:
-        # Try to create tables if they don't exist
-        db.create_all()
-
-        # Test database connection - FIXED: use text()
-        db.session.execute(text("SELECT 1"))
-
-        return (
-            jsonify(
-                {
-                    "status": "healthy",
-                    "service": "National Cake Community API",
-                    "database": "connected",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "message": "Database tables initialized successfully",
-                }
-            ),
-            200,
-        )
-
-    except Exception as e:
-        return (
-            jsonify(
-                {
-                    "status": "error",
-                    "service": "National Cake Community API",
-                    "database": "disconnected",
-                    "error": str(e),
-                    "timestamp": datetime.utcnow().isoformat(),
-                }
-            ),
-            500,
-        )
+    """
+    Alias of /readyz kept for existing load balancer configs
+    ---
+    tags:
+      - Health
+    responses:
+      200:
+        description: Ready to take traffic
+      503:
+        description: Database unreachable or connection pool saturated
+    """
+    return _readiness()
+
+
+@health_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Prometheus metrics for every worker of this host
+    ---
+    tags:
+      - Health
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Metrics in Prometheus text format
+      401:
+        description: METRICS_TOKEN is set and the bearer token does not match
+    """
+    token = current_app.config.get("METRICS_TOKEN")
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not hmac.compare_digest(supplied, token):
+            return jsonify({"error": "Unauthorized"}), 401
+
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
@@ -5,8 +5,18 @@ from werkzeug.utils import secure_filename
 from flask import Blueprint, request, current_app
 from app import db
 from app.models import User
-from app.utils.decorators import token_required, roles_required
+from app.utils.decorators import token_required, token_optional, roles_required
 from app.utils.responses import success_response, error_response
+from app.utils.replica import read_replica
+from app.middlewares.http_cache import public_cache
+from app.utils.badge_catalog import get_user_badges
+from app.utils.public_profile import (
+    find_user_by_identifier,
+    get_public_profile,
+    invalidate_public_profile,
+    username_taken,
+)
+from app.utils.user_search import index_user, search_users
 
 profile_bp = Blueprint("profile", __name__, url_prefix="/profile")
 
@@ -42,6 +52,19 @@ def user_to_dict(user):
     }
 
 
+def _wants_badges():
+    include = request.args.get("include", "")
+    return "badges" in {part.strip() for part in include.split(",")}
+
+
+def profile_payload(user):
+    """user_to_dict plus any optional blocks requested via ?include=badges"""
+    data = user_to_dict(user)
+    if _wants_badges():
+        data["badges"] = get_user_badges(user.id)
+    return data
+
+
 # ---------------------------
 # GET CURRENT USER PROFILE
 # ---------------------------
@@ -53,21 +76,30 @@ def get_my_profile(current_user):
     ---
     tags:
       - Profile
+    parameters:
+      - in: query
+        name: include
+        type: string
+        required: false
+        description: Comma-separated optional blocks (badges)
     responses:
       200:
         description: Profile fetched successfully
     """
     """Return profile for authenticated user."""
-    return success_response(user_to_dict(current_user), "Profile fetched successfully")
+    return success_response(
+        profile_payload(current_user), "Profile fetched successfully"
+    )
 
 
 # ---------------------------
 # GET PROFILE (by id or username) - Public
 # ---------------------------
 @profile_bp.route("/<identifier>", methods=["GET"])
-def get_profile(identifier):
+@token_optional
+def get_profile(current_user, identifier):
     """
-    Get user profile (by ID or username)
+    Get user profile (by ID or username); the full profile for its owner and admins
     ---
     tags:
       - Profile
@@ -76,24 +108,69 @@ def get_profile(identifier):
         name: identifier
         required: true
         type: string
-        description: User ID (int) or username (string)
+        description: User ID (int) or username (case-insensitive)
+      - in: query
+        name: include
+        type: string
+        required: false
+        description: Comma-separated optional blocks (badges; owner and admins only, the public profile always has them)
     responses:
       200:
-        description: Profile fetched successfully
+        description: >
+          Full profile (email, phone, ...) for the owner and admins, the public
+          profile (as /profile/<identifier>/public) for everyone else
       404:
         description: User not found
     """
     """Fetch a user profile by ID or username (public)."""
-    user = None
-    if identifier.isdigit():
-        user = User.query.get(int(identifier))
-    else:
-        user = User.query.filter_by(username=identifier).first()
-
-    if not user:
+    if current_user is not None:
+        is_self = (
+            str(current_user.id) == identifier
+            if identifier.isdigit()
+            else (current_user.username or "").lower() == identifier.lower()
+        )
+        if is_self:
+            return success_response(
+                profile_payload(current_user), "Profile fetched successfully"
+            )
+        if current_user.role == "admin":
+            user = find_user_by_identifier(identifier)
+            if not user:
+                return error_response("User not found", 404)
+            return success_response(profile_payload(user), "Profile fetched successfully")
+
+    profile = get_public_profile(identifier)
+    if not profile:
         return error_response("User not found", 404)
+    return success_response(profile, "Profile fetched successfully")
+
 
-    return success_response(user_to_dict(user), "Profile fetched successfully")
+# ---------------------------
+# PUBLIC PROFILE CARD (cached) - Public
+# ---------------------------
+@profile_bp.route("/<identifier>/public", methods=["GET"])
+def get_public_profile_card(identifier):
+    """
+    Get the public profile projection (by ID or username)
+    ---
+    tags:
+      - Profile
+    parameters:
+      - in: path
+        name: identifier
+        required: true
+        type: string
+        description: User ID (int) or username (case-insensitive)
+    responses:
+      200:
+        description: Public profile with badges, post count, eras and points
+      404:
+        description: User not found
+    """
+    profile = get_public_profile(identifier)
+    if not profile:
+        return error_response("User not found", 404)
+    return success_response(profile, "Profile fetched successfully")
 
 
 # ---------------------------
@@ -131,10 +208,12 @@ def update_profile(current_user):
     Allowed fields: firstname, lastname, username, nationality, avatar, phone, referral.
     """
     data = request.get_json() or {}
+    old_username = current_user.username
 
     # username uniqueness check (if changing)
+    # case-insensitive, like every username lookup (ix_users_username_lower)
     if "username" in data and data["username"] != current_user.username:
-        if User.query.filter_by(username=data["username"]).first():
+        if username_taken(data["username"], exclude_user_id=current_user.id):
             return error_response("Username already taken", 400)
 
     # phone uniqueness check (if changing)
@@ -156,6 +235,8 @@ def update_profile(current_user):
 
     if updated:
         db.session.commit()
+        invalidate_public_profile(current_user, old_username)
+        index_user(current_user)
         return success_response(
             user_to_dict(current_user), "Profile updated successfully"
         )
@@ -218,6 +299,8 @@ def upload_avatar(current_user):
     # Save to user
     current_user.avatar = avatar_url
     db.session.commit()
+    invalidate_public_profile(current_user)
+    index_user(current_user)
 
     return success_response({"avatar": avatar_url}, "Avatar uploaded successfully", 201)
 
@@ -258,6 +341,7 @@ def set_home_era(current_user):
 
     current_user.home_era = era
     db.session.commit()
+    invalidate_public_profile(current_user)
     return success_response({"home_era": current_user.home_era}, "Home era updated")
 
 
@@ -265,6 +349,8 @@ def set_home_era(current_user):
 # LEADERBOARD (public)
 # ---------------------------
 @profile_bp.route("/leaderboard", methods=["GET"])
+@public_cache(max_age=60)
+@read_replica
 def leaderboard():
     """
     Get leaderboard (public)
@@ -305,6 +391,62 @@ def leaderboard():
     return success_response(data, "Leaderboard fetched successfully")
 
 
+# ---------------------------
+# USER SEARCH / @MENTIONS
+# ---------------------------
+@profile_bp.route("/search", methods=["GET"])
+@token_required
+def search_users_endpoint(current_user):
+    """
+    Find users by username or name prefix (@mention autocomplete, member search)
+    ---
+    tags:
+      - Profile
+    parameters:
+      - in: query
+        name: q
+        type: string
+        required: true
+        description: Prefix of a username or of any word of the full name (a leading @ is ignored)
+      - in: query
+        name: era_id
+        type: integer
+        required: false
+        description: Only members of this era
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        default: 10
+        description: Max results (up to 20)
+    responses:
+      200:
+        description: Matching users, most active first
+      400:
+        description: q is required
+      401:
+        description: Unauthorized
+    """
+    query = (request.args.get("q") or "").strip()
+    if not query.lstrip("@"):
+        return error_response("q is required", 400)
+
+    limit = max(request.args.get("limit", 10, type=int), 1)
+    users = search_users(
+        query, limit=limit, era_id=request.args.get("era_id", type=int)
+    )
+    data = [
+        {
+            "id": u["id"],
+            "username": u["username"],
+            "fullname": u["fullname"],
+            "avatar": u["avatar"],
+        }
+        for u in users
+    ]
+    return success_response(data, "Users fetched successfully")
+
+
 # ---------------------------
 # ADMIN: CHANGE ROLE
 # ---------------------------
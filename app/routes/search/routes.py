@@ -0,0 +1,103 @@
+# app/routes/search/routes.py
+import math
+
+import click
+from flask import Blueprint, request
+from app.utils.decorators import token_required
+from app.utils.responses import success_response, error_response
+from app.utils.replica import read_replica
+from app.utils.search import rebuild_index, search_documents
+
+search_bp = Blueprint("search", __name__, url_prefix="/search")
+
+MAX_PER_PAGE = 50
+DOC_TYPES = ("post", "comment")
+
+
+@search_bp.cli.command("rebuild")
+@click.option("--batch-size", default=500, show_default=True, help="Rows per insert/commit")
+def rebuild_command(batch_size):
+    """Rebuild the search index from posts and comments"""
+    rebuild_index(batch_size=batch_size)
+    print("Search index rebuilt.")
+
+
+# ---------------------------
+# SEARCH POSTS & COMMENTS
+# ---------------------------
+@search_bp.route("/", methods=["GET"])
+@token_required
+@read_replica
+def search(current_user):
+    """
+    Full-text search over post titles, post content and comments
+    ---
+    tags:
+      - Search
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Search terms (quotes and -exclusions work on Postgres)
+      - name: era_id
+        in: query
+        type: integer
+      - name: zone_id
+        in: query
+        type: integer
+      - name: type
+        in: query
+        type: string
+        enum: [post, comment]
+        description: Only return posts or only comments
+      - name: page
+        in: query
+        type: integer
+        default: 1
+      - name: per_page
+        in: query
+        type: integer
+        default: 20
+    responses:
+      200:
+        description: Ranked results, best match first
+      400:
+        description: Missing query or invalid type
+      401:
+        description: Unauthorized
+    """
+    query = (request.args.get("q") or "").strip()
+    if not query:
+        return error_response("q is required", 400)
+
+    doc_type = request.args.get("type")
+    if doc_type and doc_type not in DOC_TYPES:
+        return error_response(f"type must be one of: {', '.join(DOC_TYPES)}", 400)
+
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 20, type=int), 1), MAX_PER_PAGE)
+
+    results, total = search_documents(
+        query,
+        era_id=request.args.get("era_id", type=int),
+        zone_id=request.args.get("zone_id", type=int),
+        doc_type=doc_type,
+        page=page,
+        per_page=per_page,
+    )
+
+    return success_response(
+        {
+            "results": results,
+            "pagination": {
+                "page": page,
+                "per_page": per_page,
+                "total": total,
+                "pages": math.ceil(total / per_page) if total else 0,
+                "has_next": page * per_page < total,
+            },
+            "query": query,
+        },
+        "Search results fetched successfully",
+    )
@@ -0,0 +1,109 @@
+"""
+JSON serializer benchmark on feed-shaped payloads.
+
+Builds /community/posts style responses (long content, base64 media,
+nested author/era/zone) and times Flask's stdlib provider against
+OrjsonProvider, both through dumps() and through a full jsonify response.
+
+    python -m app.scripts.bench_json
+    python -m app.scripts.bench_json --posts 50 --repeat 500
+"""
+import argparse
+import base64
+import os
+import random
+import string
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils.json_provider import OrjsonProvider
+
+
+def _text(rng, words):
+    return " ".join(
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10)))
+        for _ in range(words)
+    )
+
+
+def feed_payload(posts=20, seed=7):
+    rng = random.Random(seed)
+    now = datetime(2026, 10, 19, 12, 0, 0)
+    items = []
+    for i in range(posts):
+        media = [
+            "data:image/png;base64," + base64.b64encode(os.urandom(rng.randint(2_000, 12_000))).decode()
+            for _ in range(rng.randint(0, 2))
+        ]
+        items.append(
+            {
+                "id": 1000 + i,
+                "title": _text(rng, 8),
+                "content": _text(rng, rng.randint(80, 400)),
+                "media": media,
+                "created_at": now - timedelta(minutes=37 * i),  # raw datetime, as some handlers return
+                "time_ago": f"{i}h",
+                "pinned": False,
+                "hot_thread": i % 7 == 0,
+                "hot_score": Decimal("0.125") * i,
+                "likes_count": rng.randint(0, 500),
+                "agree_count": rng.randint(0, 300),
+                "disagree_count": rng.randint(0, 200),
+                "comments_count": rng.randint(0, 80),
+                "user_agreed": rng.random() < 0.2,
+                "user_disagreed": False,
+                "bookmarked": rng.random() < 0.1,
+                "user_reshared": False,
+                "author": {
+                    "id": rng.randint(1, 10_000),
+                    "firstname": _text(rng, 1),
+                    "lastname": _text(rng, 1),
+                    "username": _text(rng, 1),
+                    "avatar": "https://cdn.example.com/avatars/" + _text(rng, 1) + ".png",
+                },
+                "era": {"id": 3, "name": "Colonial", "year_range": "1900-1960"},
+                "zone": {"id": 9, "name": "Colonial General"},
+            }
+        )
+    return {
+        "success": True,
+        "message": "Posts fetched",
+        "data": {"posts": items, "pagination": {"page": 1, "total": 4321}, "sort": "new"},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=20, help="posts per page")
+    parser.add_argument("--repeat", type=int, default=200, help="encodes per measurement")
+    args = parser.parse_args()
+
+    payload = feed_payload(args.posts)
+    app = Flask(__name__)
+    providers = {"stdlib": DefaultJSONProvider(app), "orjson": OrjsonProvider(app)}
+    for provider in providers.values():
+        provider.compact = True
+        provider.sort_keys = False
+
+    size = len(providers["orjson"].dumps(payload))
+    print(f"payload: {args.posts} posts, {size / 1024:.1f} KiB encoded\n")
+    print(f"{'provider':<8} {'dumps ms':>10} {'response ms':>12}")
+
+    results = {}
+    with app.app_context():
+        for name, provider in providers.items():
+            dumps = min(timeit.repeat(lambda: provider.dumps(payload), number=args.repeat, repeat=5))
+            response = min(timeit.repeat(lambda: provider.response(payload), number=args.repeat, repeat=5))
+            results[name] = (dumps / args.repeat * 1000, response / args.repeat * 1000)
+            print(f"{name:<8} {results[name][0]:>10.3f} {results[name][1]:>12.3f}")
+
+    speedup = results["stdlib"][1] / results["orjson"][1]
+    print(f"\norjson responses are {speedup:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Worker cold-start benchmark.
+
+Each run starts a fresh interpreter (like a new gunicorn worker without
+preload) and times `import app`, `create_app()` and the first / second
+Swagger spec request, for development and production startup modes.
+
+    python -m app.scripts.bench_startup            # 5 runs per mode
+    python -m app.scripts.bench_startup --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_CHILD = r"""
+import json, logging, time
+logging.disable(logging.CRITICAL)
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+flask_app = app.create_app()
+t2 = time.perf_counter()
+client = flask_app.test_client()
+client.get("/apispec_1.json")
+t3 = time.perf_counter()
+client.get("/apispec_1.json")
+t4 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "first_spec_ms": (t3 - t2) * 1000,
+    "cached_spec_ms": (t4 - t3) * 1000,
+}))
+"""
+
+MODES = {
+    "development": {"APP_ENV": "development"},
+    "production": {"APP_ENV": "production"},
+}
+
+
+def run_once(env_overrides):
+    env = dict(os.environ, **env_overrides)
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12} {'import':>9} {'create_app':>11} {'1st spec':>9} {'cached':>8}  (median ms)")
+    for mode, env in MODES.items():
+        runs = [run_once(env) for _ in range(args.runs)]
+        med = {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+        print(
+            f"{mode:<12} {med['import_ms']:>9.1f} {med['create_app_ms']:>11.1f} "
+            f"{med['first_spec_ms']:>9.1f} {med['cached_spec_ms']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# app/utils/badge_catalog.py
+import threading
+import time
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import Badge, UserBadge
+from app.utils.metrics import CACHE_REQUESTS
+
+# Badges are created by admins a handful of times a year, so the whole table is
+# kept in memory per process. Other workers pick up new badges after the TTL.
+_lock = threading.Lock()
+_catalog = None
+_loaded_at = 0.0
+
+
+def _load_catalog():
+    rows = db.session.query(Badge.id, Badge.name, Badge.description, Badge.icon).all()
+    return {
+        row.id: {
+            "id": row.id,
+            "name": row.name,
+            "description": row.description,
+            "icon": row.icon,
+        }
+        for row in rows
+    }
+
+
+def get_badge_catalog():
+    """Return {badge_id: badge_dict}, loading it from the database at most once per TTL."""
+    global _catalog, _loaded_at
+
+    ttl = current_app.config.get("BADGE_CATALOG_TTL", 600)
+    catalog = _catalog
+    if catalog is not None and time.monotonic() - _loaded_at < ttl:
+        CACHE_REQUESTS.inc(cache="badge_catalog", result="hit")
+        return catalog
+
+    CACHE_REQUESTS.inc(cache="badge_catalog", result="miss")
+    with _lock:
+        if _catalog is None or time.monotonic() - _loaded_at >= ttl:
+            _catalog = _load_catalog()
+            _loaded_at = time.monotonic()
+        return _catalog
+
+
+def invalidate_badge_catalog():
+    """Drop the cached catalog so the next read reloads it (call after badge writes)."""
+    global _catalog
+    with _lock:
+        _catalog = None
+
+
+def get_user_badges(user_id):
+    """
+    Return the badges held by a user, hydrated from the catalog.
+    Costs a single id-only query against user_badges.
+    """
+    badge_ids = [
+        row.badge_id
+        for row in db.session.query(UserBadge.badge_id)
+        .filter(UserBadge.user_id == user_id)
+        .order_by(UserBadge.id.asc())
+        .all()
+    ]
+    if not badge_ids:
+        return []
+
+    catalog = get_badge_catalog()
+    if any(badge_id not in catalog for badge_id in badge_ids):
+        # Assigned before this process saw the badge - refresh once.
+        invalidate_badge_catalog()
+        catalog = get_badge_catalog()
+
+    return [catalog[badge_id] for badge_id in badge_ids if badge_id in catalog]
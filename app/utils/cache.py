@@ -0,0 +1,53 @@
+# app/utils/cache.py
+import threading
+
+from cachetools import TTLCache as _TTLCache
+
+from app.utils.metrics import CACHE_REQUESTS
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Small thread-safe, per-process TTL cache.
+    cachetools caches are not safe to share between threads on their own.
+    """
+
+    def __init__(self, name, maxsize=1024, ttl=60):
+        self.name = name
+        self._data = _TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+        CACHE_REQUESTS.inc(cache=self.name, result="miss" if value is _MISSING else "hit")
+        return default if value is _MISSING else value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_many(self, keys):
+        """Return {key: value} for the keys that are cached"""
+        with self._lock:
+            found = {}
+            for key in keys:
+                value = self._data.get(key, _MISSING)
+                if value is not _MISSING:
+                    found[key] = value
+        if found:
+            CACHE_REQUESTS.inc(len(found), cache=self.name, result="hit")
+        if len(keys) > len(found):
+            CACHE_REQUESTS.inc(len(keys) - len(found), cache=self.name, result="miss")
+        return found
@@ -0,0 +1,147 @@
+# app/utils/change_log.py
+"""
+Append-only change log behind GET /community/sync.
+
+Mutations in the community routes call record_change() before their
+commit, so a change is logged if and only if it happened. Clients keep the
+watermark of the last change they have seen ("<txid>.<id>", opaque to
+them) and ask for everything after it.
+
+Row ids are handed out at insert time but become visible at commit time,
+so ordering by id alone can serve id 6 before a slower transaction commits
+id 5, and id 5 would never be synced. Visibility therefore follows commit
+order:
+
+- PostgreSQL: each row stores its transaction id and the log is ordered by
+  (txid, id). Only rows written by transactions older than the snapshot
+  xmin are served; every transaction below xmin has finished, so nothing
+  can still appear behind the watermark. A long-running write holds the
+  feed back until it ends; it never makes a change disappear.
+- SQLite: writers are serialized, so id order is commit order.
+- Anything else: rows are held back for SYNC_SETTLE_SECONDS, measured with
+  the database clock on both sides (logged_at and now()).
+"""
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, or_, text, tuple_
+
+from app.extensions import db
+from app.models import ChangeLog, user_era_membership
+
+ENTITIES = ("post", "comment", "reaction", "membership")
+
+
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+
+def record_change(entity, op, entity_id, era_id, post_id=None, user_id=None, data=None):
+    """Log one change in the caller's transaction (op: "upsert" or "delete")"""
+    change = ChangeLog(
+        entity=entity,
+        op=op,
+        entity_id=entity_id,
+        era_id=era_id,
+        post_id=post_id,
+        user_id=user_id,
+        data=data,
+    )
+    if _dialect() == "postgresql":
+        change.txid = func.txid_current()
+    db.session.add(change)
+
+
+def parse_watermark(value):
+    """(txid, id) from "<txid>.<id>" (a bare id means txid 0); None if malformed"""
+    txid, _, row_id = value.rpartition(".")
+    try:
+        watermark = (int(txid or 0), int(row_id))
+    except ValueError:
+        return None
+    return watermark if min(watermark) >= 0 else None
+
+
+def format_watermark(txid, row_id):
+    return f"{txid}.{row_id}"
+
+
+def _visible():
+    """(filter for rows that can be served now, PostgreSQL snapshot xmin or None)"""
+    dialect = _dialect()
+    if dialect == "postgresql":
+        xmin = db.session.execute(
+            text("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+        ).scalar()
+        return ChangeLog.txid < xmin, xmin
+    if dialect == "sqlite":
+        return None, None
+    db_now = db.session.query(func.now()).scalar()
+    settled = db_now - timedelta(seconds=current_app.config.get("SYNC_SETTLE_SECONDS", 35))
+    return ChangeLog.logged_at <= settled, None
+
+
+def latest_watermark():
+    """Watermark a client starts from; everything it may not have seen comes after it"""
+    visible, xmin = _visible()
+    if xmin is not None:
+        return format_watermark(xmin, 0)
+    query = db.session.query(func.max(ChangeLog.id))
+    if visible is not None:
+        query = query.filter(visible)
+    return format_watermark(0, query.scalar() or 0)
+
+
+def is_pruned(since):
+    """True when changes after since may already have been pruned"""
+    horizon = (
+        ChangeLog.query.filter_by(entity="prune").order_by(ChangeLog.id.desc()).first()
+    )
+    return horizon is not None and since < (horizon.data["txid"], horizon.data["id"])
+
+
+def changes_since(user_id, since, limit):
+    """
+    Up to limit changes after since, in commit order, for the eras user_id
+    has joined plus the user's own membership changes (so a client learns
+    about eras it left or joined on another device). Returns (changes, has_more).
+    """
+    joined = db.session.query(user_era_membership.c.era_id).filter(
+        user_era_membership.c.user_id == user_id
+    )
+    query = ChangeLog.query.filter(
+        tuple_(ChangeLog.txid, ChangeLog.id) > tuple_(*since),
+        or_(
+            ChangeLog.era_id.in_(joined),
+            (ChangeLog.entity == "membership") & (ChangeLog.user_id == user_id),
+        ),
+    )
+    visible, _ = _visible()
+    if visible is not None:
+        query = query.filter(visible)
+    rows = query.order_by(ChangeLog.txid, ChangeLog.id).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+
+def prune_changes(days):
+    """
+    Delete changes older than days; returns the number of rows removed.
+    The newest deleted watermark is kept as a "prune" row so older
+    watermarks get a 410 instead of silently missing changes.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    old = ChangeLog.query.filter(ChangeLog.created_at < cutoff, ChangeLog.entity != "prune")
+    horizon = old.order_by(ChangeLog.txid.desc(), ChangeLog.id.desc()).first()
+    if horizon is None:
+        return 0
+
+    deleted = old.filter(
+        tuple_(ChangeLog.txid, ChangeLog.id) <= (horizon.txid, horizon.id)
+    ).delete(synchronize_session=False)
+    ChangeLog.query.filter_by(entity="prune").delete(synchronize_session=False)
+    # era 0 does not exist, so no client ever receives this row
+    record_change(
+        "prune", "delete", horizon.id, 0, data={"txid": horizon.txid, "id": horizon.id}
+    )
+    db.session.commit()
+    return deleted
@@ -1,51 +1,95 @@
 # app/utils/decorators.py
 from functools import wraps
-from flask import request, current_app
+from flask import request, current_app, g
 import jwt
 from app.utils.responses import error_response
 from sqlalchemy import text
 from app import db  # Import db directly from app package
 from app.models import User
 
+def _get_bearer_token():
+    """Extract the raw token from the Authorization header (Bearer prefix optional)"""
+    auth_header = request.headers.get("Authorization")
+    if auth_header:
+        parts = auth_header.split()
+        if len(parts) == 2 and parts[0].lower() == "bearer":
+            return parts[1]
+        elif len(parts) == 1:
+            return parts[0]  # fallback for token without "Bearer "
+    return None
+
+
+# WSGI environ key under which /batch hands its already-authenticated
+# (token, user) to the sub-requests it dispatches
+BATCH_AUTH_ENVIRON_KEY = "ncc.batch_auth"
+
+
+def _authenticate(token):
+    """Return (user, None) for a valid token or (None, error_response) otherwise"""
+    batch_auth = request.environ.get(BATCH_AUTH_ENVIRON_KEY)
+    if batch_auth is not None and batch_auth[0] == token:
+        # sub-request of /batch: the token was checked once for the whole batch
+        current_user = db.session.merge(batch_auth[1], load=False)
+        g.current_user = current_user
+        return current_user, None
+
+    try:
+        data = jwt.decode(
+            token, current_app.config["SECRET_KEY"], algorithms=["HS256"]
+        )
+        user_id = data.get("id") or data.get("user_id") or data.get("sub")
+
+        if not user_id:
+            return None, error_response("Invalid token: no user identifier", 401)
+
+        current_user = User.query.get(user_id)
+        if not current_user:
+            return None, error_response("User not found", 404)
+        g.current_user = current_user
+
+    except jwt.ExpiredSignatureError:
+        return None, error_response("Token has expired!", 401)
+    except jwt.InvalidTokenError:
+        return None, error_response("Invalid token!", 401)
+    except Exception as e:
+        current_app.logger.error(f"Token auth error: {e}")
+        return None, error_response("Authentication failed", 401)
+
+    return current_user, None
+
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-
-        # Extract token from Authorization header
-        auth_header = request.headers.get("Authorization")
-        if auth_header:
-            parts = auth_header.split()
-            if len(parts) == 2 and parts[0].lower() == "bearer":
-                token = parts[1]
-            elif len(parts) == 1:
-                token = parts[0]  # fallback for token without "Bearer "
-
+        token = _get_bearer_token()
         if not token:
             return error_response("Token is missing!", 401)
 
-        try:
-            data = jwt.decode(
-                token, current_app.config["SECRET_KEY"], algorithms=["HS256"]
-            )
-            user_id = data.get("id") or data.get("user_id") or data.get("sub")
+        current_user, error = _authenticate(token)
+        if error:
+            return error
 
-            if not user_id:
-                return error_response("Invalid token: no user identifier", 401)
+        # Only authenticated users reach here
+        return f(current_user, *args, **kwargs)
 
-            current_user = User.query.get(user_id)
-            if not current_user:
-                return error_response("User not found", 404)
+    return decorated
 
-        except jwt.ExpiredSignatureError:
-            return error_response("Token has expired!", 401)
-        except jwt.InvalidTokenError:
-            return error_response("Invalid token!", 401)
-        except Exception as e:
-            current_app.logger.error(f"Token auth error: {e}")
-            return error_response("Authentication failed", 401)
 
-        # Only authenticated users reach here
+def token_optional(f):
+    """
+    Like token_required, but anonymous callers get current_user=None.
+    A token that is present but invalid is still rejected.
+    """
+
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        token = _get_bearer_token()
+        if not token:
+            return f(None, *args, **kwargs)
+
+        current_user, error = _authenticate(token)
+        if error:
+            return error
         return f(current_user, *args, **kwargs)
 
     return decorated
@@ -43,6 +43,7 @@
 import os
 import resend  # Official import
 from flask import current_app
+from app.utils.metrics import EMAIL_QUEUE_DEPTH
 
 
 def send_email(subject: str, to_email: str, body: str, from_email: str = None):
@@ -70,6 +71,7 @@ def send_email(subject: str, to_email: str, body: str, from_email: str = None):
         "text": body,  # Plaintext; "html": body for styled
     }
 
+    EMAIL_QUEUE_DEPTH.inc()
     try:
         response = resend.Emails.send(payload)
 
@@ -87,3 +89,5 @@ def send_email(subject: str, to_email: str, body: str, from_email: str = None):
     except Exception as e:
         current_app.logger.error(f"Email exception for {to_email}: {str(e)}")
         return False
+    finally:
+        EMAIL_QUEUE_DEPTH.dec()
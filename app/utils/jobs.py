@@ -0,0 +1,379 @@
+# app/utils/jobs.py
+"""
+Background jobs.
+
+    from app.extensions import jobs
+
+    @jobs.job(queue="default", retries=3)
+    def rebuild_counters(post_id):
+        ...
+
+    rebuild_counters.delay(post.id)               # after the current commit
+    rebuild_counters.apply_async((post.id,), countdown=60)
+
+    @jobs.periodic("HOT_RANK_INTERVAL_SECONDS", queue="maintenance")
+    def rank_hot():
+        ...
+
+Jobs are enqueued with the caller's transaction: nothing runs unless the
+caller commits, and a job never runs before the rows it was given exist.
+Arguments must be JSON-serializable (pass ids, not model objects). Delivery
+is at-least-once, so jobs should be safe to run twice.
+
+Backends (JOBS_BACKEND):
+- "local": an in-process thread pool per queue. Jobs are lost with the
+  process; meant for development and tests.
+- "db": jobs are rows in the jobs table, run by `flask jobs-worker`. A
+  worker leases what it claims for JOBS_LEASE_SECONDS, so jobs held by a
+  worker that died are picked up again.
+
+Each queue runs at most N jobs at a time per process (JOBS_QUEUES, e.g.
+"default:4,maintenance:1"). Failed jobs are retried with exponential backoff
+from retry_delay. Periodic jobs are enqueued by the worker once per
+interval; with the db backend a unique key per interval keeps several
+workers from enqueueing the same run twice.
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import update_wrapper
+
+from sqlalchemy import event, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.utils.replica import RoutingSession
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "jobs_pending"
+
+
+class Job:
+    """A registered job function; calling it runs it inline"""
+
+    def __init__(self, queue_obj, fn, name, queue, retries, retry_delay):
+        self._jobs = queue_obj
+        self.fn = fn
+        self.name = name
+        self.queue = queue
+        self.retries = retries
+        self.retry_delay = retry_delay
+        update_wrapper(self, fn)
+
+    def __call__(self, *args, **kwargs):
+        return self.fn(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        """Run in the background once the current transaction commits"""
+        self.apply_async(args, kwargs)
+
+    def apply_async(self, args=(), kwargs=None, countdown=None, eta=None, unique_key=None):
+        """
+        Like delay(), plus countdown (seconds) or eta (UTC datetime) to run
+        later and unique_key to enqueue at most once (db backend).
+        """
+        run_at = eta or datetime.utcnow()
+        if countdown:
+            run_at += timedelta(seconds=countdown)
+        self._jobs.enqueue(self, list(args), dict(kwargs or {}), run_at, unique_key)
+
+
+class JobQueue:
+    """Flask extension holding the job registry and the configured backend"""
+
+    def __init__(self, db):
+        self.db = db
+        self.app = None
+        self.registry = {}
+        self.periodic_jobs = []
+        self._executors = {}
+        self._executor_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["jobs"] = self
+
+    @property
+    def backend(self):
+        return self.app.config.get("JOBS_BACKEND", "local")
+
+    def queue_limits(self):
+        limits = {}
+        for part in self.app.config.get("JOBS_QUEUES", "default:4").split(","):
+            name, _, limit = part.strip().partition(":")
+            if name:
+                limits[name] = int(limit or 1)
+        return limits
+
+    # ---------------------------
+    # REGISTRATION
+    # ---------------------------
+    def job(self, name=None, queue="default", retries=3, retry_delay=10):
+        def decorator(fn):
+            job = Job(self, fn, name or f"{fn.__module__}.{fn.__name__}", queue, retries, retry_delay)
+            self.registry[job.name] = job
+            return job
+
+        return decorator
+
+    def periodic(self, every, name=None, queue="default", retries=0, retry_delay=10):
+        """
+        Run every `every` seconds (a number or the name of a config key
+        holding one) while a `flask jobs-worker` is running.
+        """
+
+        def decorator(fn):
+            job = self.job(name, queue, retries, retry_delay)(fn)
+            self.periodic_jobs.append((job, every))
+            return job
+
+        return decorator
+
+    # ---------------------------
+    # ENQUEUEING
+    # ---------------------------
+    def enqueue(self, job, args, kwargs, run_at, unique_key=None):
+        if self.backend == "db":
+            from app.models import BackgroundJob
+
+            if unique_key and self.db.session.query(
+                BackgroundJob.query.filter_by(unique_key=unique_key).exists()
+            ).scalar():
+                return
+            self.db.session.add(
+                BackgroundJob(
+                    name=job.name,
+                    queue=job.queue,
+                    args={"args": args, "kwargs": kwargs},
+                    max_attempts=job.retries + 1,
+                    run_at=run_at,
+                    unique_key=unique_key,
+                )
+            )
+        else:
+            # handed to the pool by the after_commit hook below; begin a
+            # transaction so a rollback() before any query still drops it
+            session = self.db.session()
+            if not session.in_transaction():
+                session.begin()
+            session.info.setdefault(_PENDING_KEY, []).append(
+                (self, job, args, kwargs, run_at)
+            )
+
+    def _submit_local(self, job, args, kwargs, run_at, attempt=1):
+        delay = (run_at - datetime.utcnow()).total_seconds()
+        if delay > 0:
+            timer = threading.Timer(
+                delay, self._submit_local, (job, args, kwargs, datetime.utcnow(), attempt)
+            )
+            timer.daemon = True
+            timer.start()
+            return
+        self._executor(job.queue).submit(self._run_local, job, args, kwargs, attempt)
+
+    def _executor(self, queue):
+        with self._executor_lock:
+            if queue not in self._executors:
+                limit = self.queue_limits().get(
+                    queue, self.app.config.get("JOBS_DEFAULT_CONCURRENCY", 1)
+                )
+                self._executors[queue] = ThreadPoolExecutor(
+                    max_workers=limit, thread_name_prefix=f"jobs-{queue}"
+                )
+            return self._executors[queue]
+
+    def _run_local(self, job, args, kwargs, attempt):
+        error = self._execute(job, args, kwargs)
+        if error is None:
+            return
+        if attempt <= job.retries:
+            retry_at = datetime.utcnow() + timedelta(seconds=job.retry_delay * 2 ** (attempt - 1))
+            self._submit_local(job, args, kwargs, retry_at, attempt + 1)
+        else:
+            logger.error("Job %s gave up after %s attempts: %s", job.name, attempt, error)
+
+    def _execute(self, job, args, kwargs):
+        """Run one job in a fresh app context; returns None or the error text"""
+        with self.app.app_context():
+            try:
+                job.fn(*args, **kwargs)
+                return None
+            except Exception as e:
+                logger.exception("Job %s failed", job.name)
+                self.db.session.rollback()
+                return f"{type(e).__name__}: {e}"
+            finally:
+                self.db.session.remove()
+
+    # ---------------------------
+    # DB BACKEND
+    # ---------------------------
+    def _claim(self, queue, limit):
+        from app.models import BackgroundJob
+
+        db = self.db
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        # running rows whose lease ran out belong to a worker that died
+        due = (
+            select(BackgroundJob.id)
+            .where(
+                BackgroundJob.queue == queue,
+                BackgroundJob.status.in_(("queued", "running")),
+                BackgroundJob.run_at <= now,
+            )
+            .order_by(BackgroundJob.run_at, BackgroundJob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        db.session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id.in_(due.scalar_subquery()), BackgroundJob.run_at <= now)
+            .values(
+                status="running",
+                claim=token,
+                attempts=BackgroundJob.attempts + 1,
+                run_at=now
+                + timedelta(seconds=self.app.config.get("JOBS_LEASE_SECONDS", 300)),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return [
+            (row.id, token, row.name, row.args, row.attempts, row.max_attempts)
+            for row in BackgroundJob.query.filter_by(claim=token).all()
+        ]
+
+    def _run_claimed(self, row_id, token, name, payload, attempts, max_attempts):
+        from app.models import BackgroundJob
+
+        job = self.registry.get(name)
+        if job is None:
+            error = f"unknown job {name!r}"
+        else:
+            error = self._execute(job, payload["args"], payload["kwargs"])
+
+        now = datetime.utcnow()
+        if error is None:
+            values = {"status": "done", "finished_at": now, "last_error": None}
+        elif attempts < max_attempts and job is not None:
+            delay = job.retry_delay * 2 ** (attempts - 1)
+            values = {"status": "queued", "run_at": now + timedelta(seconds=delay), "last_error": error}
+        else:
+            values = {"status": "failed", "finished_at": now, "last_error": error}
+            logger.error("Job %s (%s) gave up after %s attempts", row_id, name, attempts)
+
+        with self.app.app_context():
+            # claim check: leave the row alone if the lease ran out and
+            # another worker has it now
+            self.db.session.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == row_id, BackgroundJob.claim == token)
+                .values(claim=None, **values)
+            )
+            self.db.session.commit()
+            self.db.session.remove()
+
+    def _enqueue_periodic(self, job, slot):
+        """Enqueue the run for one interval slot (once across all workers)"""
+        if self.backend != "db":
+            self._submit_local(job, [], {}, datetime.utcnow())
+            return
+        try:
+            job.apply_async(unique_key=f"periodic:{job.name}:{slot}")
+            self.db.session.commit()
+        except IntegrityError:  # another worker won the race
+            self.db.session.rollback()
+
+    def prune(self, hours):
+        """Delete finished jobs older than hours (db backend)"""
+        from app.models import BackgroundJob
+
+        cutoff = datetime.utcnow() - timedelta(hours=hours)
+        deleted = BackgroundJob.query.filter(
+            BackgroundJob.status == "done", BackgroundJob.finished_at < cutoff
+        ).delete(synchronize_session=False)
+        self.db.session.commit()
+        return deleted
+
+    # ---------------------------
+    # WORKER
+    # ---------------------------
+    def run_worker(self, queues=None, stop=None):
+        """
+        `flask jobs-worker`: enqueue periodic jobs and run queued ones
+        (db backend) until stop is set or the process is killed.
+        """
+        config = self.app.config
+        limits = self.queue_limits()
+        for job in self.registry.values():
+            limits.setdefault(job.queue, config.get("JOBS_DEFAULT_CONCURRENCY", 1))
+        if queues:
+            limits = {name: limits.get(name, 1) for name in queues}
+        poll = config.get("JOBS_POLL_SECONDS", 1)
+
+        pools = {}
+        if self.backend == "db":
+            pools = {name: ThreadPoolExecutor(max_workers=limit) for name, limit in limits.items()}
+        in_flight = {name: 0 for name in limits}
+        lock = threading.Lock()
+        last_slots = {}
+        last_prune = 0.0
+
+        def finished(name, _future):
+            with lock:
+                in_flight[name] -= 1
+
+        try:
+            while stop is None or not stop.is_set():
+                with self.app.app_context():
+                    try:
+                        now = time.time()
+                        for job, every in self.periodic_jobs:
+                            if job.queue not in limits:
+                                continue
+                            interval = config[every] if isinstance(every, str) else every
+                            slot = int(now // interval)
+                            if last_slots.get(job.name) != slot:
+                                self._enqueue_periodic(job, slot)
+                                last_slots[job.name] = slot
+
+                        if self.backend == "db":
+                            for name, limit in limits.items():
+                                free = limit - in_flight[name]
+                                if free <= 0:
+                                    continue
+                                for claimed in self._claim(name, free):
+                                    with lock:
+                                        in_flight[name] += 1
+                                    future = pools[name].submit(self._run_claimed, *claimed)
+                                    future.add_done_callback(
+                                        lambda f, name=name: finished(name, f)
+                                    )
+                            if time.monotonic() - last_prune > 3600:
+                                self.prune(config.get("JOBS_RETENTION_HOURS", 72))
+                                last_prune = time.monotonic()
+                    except Exception:
+                        logger.exception("Job worker error")
+                        self.db.session.rollback()
+                    finally:
+                        self.db.session.remove()
+                time.sleep(poll)
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _submit_pending(session):
+    for jobs, job, args, kwargs, run_at in session.info.pop(_PENDING_KEY, []):
+        jobs._submit_local(job, args, kwargs, run_at)
+
+
+# soft: also fires for a rollback() with no transaction begun yet
+@event.listens_for(RoutingSession, "after_soft_rollback")
+def _drop_pending(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,54 @@
+# app/utils/json_provider.py
+"""
+orjson-backed JSON for every jsonify() / success_response().
+
+orjson encodes datetimes, dates, UUIDs and dataclasses natively (datetimes
+as ISO 8601) and is several times faster than the stdlib encoder on feed
+pages (see app/scripts/bench_json.py). Anything orjson does not know,
+like Decimal, goes through the same fallback as Flask's default provider.
+"""
+import decimal
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+def _default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    return DefaultJSONProvider.default(obj)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Drop-in for Flask's provider. sort_keys and compact keep their meaning:
+    compact=False pretty-prints with a 2-space indent (orjson's only indent).
+    """
+
+    def _options(self, sort_keys, indent):
+        # int keys are common in our {id: ...} maps; the stdlib stringifies them too
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        option = self._options(
+            kwargs.get("sort_keys", self.sort_keys), kwargs.get("indent")
+        )
+        return orjson.dumps(obj, default=_default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(
+            obj, default=_default, option=self._options(self.sort_keys, pretty)
+        )
+        if pretty:
+            body += b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,369 @@
+# app/utils/metrics.py
+"""
+Minimal Prometheus-style metrics registry.
+
+Each worker process keeps its own values in memory and periodically writes a
+snapshot to METRICS_DIR/<pid>.json. /metrics merges the snapshots of every
+worker, so the numbers are correct under gunicorn with several workers:
+counters and histograms are summed across all snapshots, gauges only across
+live workers. When a worker exits, gunicorn's child_exit hook folds its
+counters into METRICS_DIR/exited.json and deletes its snapshot, so counters
+never go backwards and a reused pid starts from zero.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FLUSH_INTERVAL = 1.0
+# totals of workers that have exited (see MetricsRegistry.retire)
+EXITED_FILE = "exited.json"
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._function = None
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[_label_key(self.labelnames, labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function):
+        """Compute the (unlabelled) value when a snapshot is taken"""
+        self._function = function
+
+    def snapshot(self):
+        if self._function is not None:
+            try:
+                self.set(self._function())
+            except Exception:
+                pass
+        return super().snapshot()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(registry, name, documentation, labelnames)
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {
+                    "buckets": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["buckets"][i] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._directory = None
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return Counter(self, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return Gauge(self, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return Histogram(self, name, documentation, labelnames, buckets)
+
+    # --- per-worker snapshots ---
+    def configure(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+
+    @property
+    def directory(self):
+        if self._directory is None:
+            self.configure(os.path.join(tempfile.gettempdir(), "ncc_metrics"))
+        return self._directory
+
+    def flush(self):
+        """Write this worker's values to <dir>/<pid>.json (atomic rename)"""
+        data = {name: m.snapshot() for name, m in self._metrics.items()}
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(data, fh)
+        os.replace(tmp_path, path)
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush < FLUSH_INTERVAL:
+            return
+        if self._flush_lock.acquire(blocking=False):
+            try:
+                self.flush()
+            except OSError:
+                pass
+            finally:
+                self._flush_lock.release()
+
+    # --- aggregation ---
+    @staticmethod
+    def _pid_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _merge(self, merged, data, alive):
+        for name, samples in data.items():
+            metric = self._metrics.get(name)
+            if metric is None or (metric.kind == "gauge" and not alive):
+                continue
+            target = merged.setdefault(name, {})
+            for key, value in samples:
+                key = tuple(key)
+                if metric.kind == "histogram":
+                    entry = target.setdefault(
+                        key,
+                        {"buckets": [0] * len(metric.buckets), "sum": 0.0, "count": 0},
+                    )
+                    entry["buckets"] = [
+                        a + b for a, b in zip(entry["buckets"], value["buckets"])
+                    ]
+                    entry["sum"] += value["sum"]
+                    entry["count"] += value["count"]
+                else:
+                    target[key] = target.get(key, 0) + value
+
+    def collect(self):
+        """Merge every worker snapshot into {name: {label_key: value}}"""
+        self.flush()
+        merged = {name: {} for name in self._metrics}
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as fh:
+                    data = json.load(fh)
+                alive = filename != EXITED_FILE and self._pid_alive(int(filename[:-5]))
+            except (ValueError, OSError):
+                continue
+            self._merge(merged, data, alive)
+        return merged
+
+    def retire(self, pid):
+        """
+        Fold an exited worker's counters and histograms into EXITED_FILE and
+        delete its snapshot, so a new worker reusing the pid starts from zero
+        and the directory does not grow. Called from gunicorn's child_exit in
+        the master, which runs it for one worker at a time.
+        """
+        path = os.path.join(self.directory, f"{pid}.json")
+        exited_path = os.path.join(self.directory, EXITED_FILE)
+        try:
+            with open(path) as fh:
+                data = json.load(fh)
+        except (ValueError, OSError):
+            data = {}
+        merged = {}
+        try:
+            with open(exited_path) as fh:
+                self._merge(merged, json.load(fh), alive=False)
+        except (ValueError, OSError):
+            pass
+        self._merge(merged, data, alive=False)
+
+        tmp_path = f"{exited_path}.tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(
+                {name: [[list(key), value] for key, value in samples.items()]
+                 for name, samples in merged.items()},
+                fh,
+            )
+        os.replace(tmp_path, exited_path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def render(self):
+        """Prometheus text exposition format (0.0.4)"""
+        merged = self.collect()
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key, value in sorted(merged[name].items()):
+                labels = list(zip(metric.labelnames, key))
+                if metric.kind == "histogram":
+                    for bound, count in zip(metric.buckets, value["buckets"]):
+                        lines.append(
+                            f"{name}_bucket{_format_labels(labels + [('le', bound)])} {count}"
+                        )
+                    lines.append(
+                        f"{name}_bucket{_format_labels(labels + [('le', '+Inf')])} {value['count']}"
+                    )
+                    lines.append(f"{name}_sum{_format_labels(labels)} {value['sum']}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        lines.extend(_render_cache_ratios(merged.get("cache_requests_total", {})))
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in labels
+    )
+    return "{" + body + "}"
+
+
+def _render_cache_ratios(cache_samples):
+    totals = {}
+    for (cache, result), count in cache_samples.items():
+        hits, total = totals.get(cache, (0, 0))
+        totals[cache] = (hits + (count if result == "hit" else 0), total + count)
+    lines = [
+        "# HELP cache_hit_ratio Share of cache lookups served from cache",
+        "# TYPE cache_hit_ratio gauge",
+    ]
+    for cache, (hits, total) in sorted(totals.items()):
+        if total:
+            lines.append(f'cache_hit_ratio{{cache="{cache}"}} {hits / total:.4f}')
+    return lines
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds",
+    "Request latency by blueprint and endpoint",
+    ("blueprint", "endpoint", "method", "status"),
+)
+DB_POOL_CHECKOUT_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the SQLAlchemy pool",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+DB_POOL_CHECKED_OUT = registry.gauge(
+    "db_pool_checked_out_connections", "Connections currently checked out of the pool"
+)
+SOCKETIO_CLIENTS = registry.gauge(
+    "socketio_connected_clients", "Connected socket.io clients"
+)
+SOCKETIO_EMITS = registry.counter(
+    "socketio_emits_total", "socket.io events emitted by the server", ("event",)
+)
+EMAIL_QUEUE_DEPTH = registry.gauge(
+    "email_queue_depth", "Emails waiting to be sent or being sent"
+)
+DB_POOL_TIMEOUTS = registry.counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after pool_timeout"
+)
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total", "Cache lookups by cache and result", ("cache", "result")
+)
+OUTBOX_DELIVERIES = registry.counter(
+    "outbox_deliveries_total",
+    "Outbox events delivered, retried, expired or given up on",
+    ("channel", "result"),
+)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection,
+    counts checkout timeouts and warns about slow waits.
+    """
+
+    # set from DB_POOL_SLOW_WAIT_SECONDS in create_app
+    slow_wait_seconds = None
+    _depth = threading.local()
+
+    def _do_get(self):
+        # QueuePool._do_get may call itself again; only time the outermost call
+        depth = getattr(self._depth, "value", 0)
+        self._depth.value = depth + 1
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if depth == 0:
+                DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            self._depth.value = depth
+            if depth == 0:
+                self._record_wait(time.perf_counter() - started)
+
+    def _record_wait(self, waited):
+        DB_POOL_CHECKOUT_WAIT.observe(waited)
+        if self.slow_wait_seconds is not None and waited >= self.slow_wait_seconds:
+            logging.getLogger(__name__).warning(
+                f"Waited {waited:.3f}s for a DB connection "
+                f"(pool size={self.size()}, checked out={self.checkedout()}, "
+                f"overflow={self.overflow()})"
+            )
@@ -0,0 +1,84 @@
+# app/utils/missions.py
+from datetime import datetime
+
+from sqlalchemy import func, or_, update
+
+from app.extensions import db
+from app.models import Mission, MissionParticipant, User
+
+
+def mission_progress(user_id=None, event_id=None, joined_only=False):
+    """
+    Return [(Mission, MissionParticipant | None)] in one LEFT JOIN.
+
+    - user_id: whose progress to attach (None = anonymous, participant is always None)
+    - event_id: restrict to one event's missions
+    - joined_only: only missions the user has joined
+    """
+    if user_id is None:
+        query = db.session.query(Mission, db.null())
+    else:
+        query = db.session.query(Mission, MissionParticipant).outerjoin(
+            MissionParticipant,
+            (MissionParticipant.mission_id == Mission.id)
+            & (MissionParticipant.user_id == user_id),
+        )
+        if joined_only:
+            query = query.filter(MissionParticipant.id.isnot(None))
+
+    if event_id is not None:
+        query = query.filter(Mission.event_id == event_id)
+
+    return query.order_by(Mission.created_at.asc(), Mission.id.asc()).all()
+
+
+def participant_status(participant):
+    if participant is None:
+        return "not_joined"
+    return participant.status or "joined"
+
+
+def record_join(mission_id):
+    """Bump the participant counter in the same transaction as the new participant row"""
+    db.session.execute(
+        update(Mission)
+        .where(Mission.id == mission_id)
+        .values(participant_count=Mission.participant_count + 1)
+    )
+
+
+def claim_completion(user_id, mission_id):
+    """
+    Mark the participant completed in one conditional UPDATE; False if it is
+    not joined or already completed (e.g. by a concurrent request)
+    """
+    result = db.session.execute(
+        update(MissionParticipant)
+        .where(
+            MissionParticipant.user_id == user_id,
+            MissionParticipant.mission_id == mission_id,
+            or_(
+                MissionParticipant.status.is_(None),
+                MissionParticipant.status != "completed",
+            ),
+        )
+        .values(status="completed", completed_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def record_completion(mission_id, user_id, points):
+    """Bump the completion counter and reward the user, after a successful claim"""
+    db.session.execute(
+        update(Mission)
+        .where(Mission.id == mission_id)
+        .values(completed_count=Mission.completed_count + 1)
+    )
+    if points:
+        db.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(points=func.coalesce(User.points, 0) + points)
+            .execution_options(synchronize_session=False)
+        )
@@ -0,0 +1,313 @@
+# app/utils/outbox.py
+"""
+Transactional outbox.
+
+Handlers call publish() / send_email_later() before their commit instead of
+emitting or mailing inline. The outbox row commits (or rolls back) with the
+change itself, so there are no phantom events for failed writes and no lost
+events when the process dies right after a commit. Sending never blocks the
+response.
+
+Delivery is at-least-once: a dispatcher claims a batch of due rows (each
+claim is a lease of OUTBOX_LEASE_SECONDS), delivers them and marks them
+sent; a dispatcher that dies mid-batch leaves its rows to be claimed again
+when the lease runs out. Every event carries its dedupe_key (event_id in
+socket.io payloads, Idempotency-Key on webhooks) so consumers can drop
+redeliveries, and publishing the same dedupe_key twice is a no-op.
+
+Dispatchers (OUTBOX_DISPATCH):
+- "thread": each web process wakes a background task after every commit
+  that wrote to the outbox and sweeps for retries every
+  OUTBOX_POLL_SECONDS. Needs nothing else; the default.
+- "worker": web processes only write; `flask outbox-worker` delivers.
+  socket.io events then go through SOCKETIO_MESSAGE_QUEUE.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import requests
+from flask import current_app
+from sqlalchemy import event, select, update
+
+from app.extensions import db, socketio
+from app.models import OutboxEvent
+from app.utils.email import send_email
+from app.utils.metrics import OUTBOX_DELIVERIES
+from app.utils.replica import RoutingSession
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "outbox_pending"
+_wakeup = threading.Event()
+_dispatcher_lock = threading.Lock()
+_dispatcher_started = False
+
+
+def _already_published(dedupe_key):
+    # autoflush makes rows added earlier in this transaction visible too
+    return db.session.query(
+        OutboxEvent.query.filter_by(dedupe_key=dedupe_key).exists()
+    ).scalar()
+
+
+def _enqueue(channel, event_name, payload, target, dedupe_key, expires_at=None):
+    db.session.add(
+        OutboxEvent(
+            channel=channel,
+            event=event_name,
+            target=target,
+            payload=payload,
+            dedupe_key=dedupe_key,
+            expires_at=expires_at,
+        )
+    )
+    db.session.info[_PENDING_KEY] = current_app._get_current_object()
+
+
+def publish(event_name, payload, to=None, dedupe_key=None):
+    """
+    socket.io event (to: room, None broadcasts) plus a webhook per
+    OUTBOX_WEBHOOK_URLS when OUTBOX_WEBHOOK_EVENTS lists the event.
+    Delivered after the caller's commit.
+    """
+    if dedupe_key is None:
+        dedupe_key = uuid.uuid4().hex
+    elif _already_published(dedupe_key):
+        return
+    _enqueue("socketio", event_name, payload, to, dedupe_key)
+
+    config = current_app.config
+    hooked = {e.strip() for e in config.get("OUTBOX_WEBHOOK_EVENTS", "").split(",") if e.strip()}
+    if "*" in hooked or event_name in hooked:
+        for url in (u.strip() for u in config.get("OUTBOX_WEBHOOK_URLS", "").split(",")):
+            if url:
+                key = f"{dedupe_key}:{hashlib.blake2b(url.encode(), digest_size=6).hexdigest()}"
+                _enqueue("webhook", event_name, payload, url, key)
+
+
+def send_email_later(subject, to_email, body, dedupe_key=None, expires_at=None):
+    """
+    Email sent by the dispatcher after the caller's commit. Retries stop at
+    expires_at (UTC), so a code is never mailed after it stopped working.
+    """
+    if dedupe_key is None:
+        dedupe_key = uuid.uuid4().hex
+    elif _already_published(dedupe_key):
+        return
+    _enqueue(
+        "email", "email", {"subject": subject, "body": body}, to_email, dedupe_key, expires_at
+    )
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _wake_dispatcher(session):
+    app = session.info.pop(_PENDING_KEY, None)
+    if app is not None and app.config.get("OUTBOX_DISPATCH", "thread") == "thread":
+        _ensure_dispatcher(app)
+        _wakeup.set()
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_pending(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+# ---------------------------
+# DELIVERY
+# ---------------------------
+def _deliver_socketio(rows):
+    for row in rows:
+        socketio.emit(row.event, {**row.payload, "event_id": row.dedupe_key}, to=row.target)
+    return {row.id: None for row in rows}
+
+
+def _deliver_email(rows):
+    results = {}
+    for row in rows:
+        sent = send_email(row.payload["subject"], row.target, row.payload["body"])
+        results[row.id] = None if sent else "send_email returned False"
+    return results
+
+
+def _deliver_webhook(rows):
+    config = current_app.config
+    secret = config.get("OUTBOX_WEBHOOK_SECRET")
+    timeout = config.get("OUTBOX_WEBHOOK_TIMEOUT", 5)
+    results = {}
+    for row in rows:
+        body = json.dumps(
+            {
+                "id": row.dedupe_key,
+                "event": row.event,
+                "created_at": row.created_at.isoformat(),
+                "data": row.payload,
+            },
+            default=str,
+        ).encode()
+        headers = {"Content-Type": "application/json", "Idempotency-Key": row.dedupe_key}
+        if secret:
+            headers["X-Signature-SHA256"] = hmac.new(
+                secret.encode(), body, hashlib.sha256
+            ).hexdigest()
+        try:
+            response = requests.post(row.target, data=body, headers=headers, timeout=timeout)
+            results[row.id] = None if response.ok else f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            results[row.id] = str(e)
+    return results
+
+
+DELIVERERS = {
+    "socketio": _deliver_socketio,
+    "email": _deliver_email,
+    "webhook": _deliver_webhook,
+}
+
+
+def _claim(batch_size):
+    """Lease up to batch_size due rows to this dispatcher; returns them in id order"""
+    config = current_app.config
+    now = datetime.utcnow()
+    token = uuid.uuid4().hex
+    due = (
+        select(OutboxEvent.id)
+        .where(OutboxEvent.status == "pending", OutboxEvent.available_at <= now)
+        .order_by(OutboxEvent.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    db.session.execute(
+        update(OutboxEvent)
+        # re-checked after any row lock wait: a row another dispatcher just
+        # leased is no longer due
+        .where(OutboxEvent.id.in_(due.scalar_subquery()), OutboxEvent.available_at <= now)
+        .values(
+            claim=token,
+            attempts=OutboxEvent.attempts + 1,
+            available_at=now + timedelta(seconds=config.get("OUTBOX_LEASE_SECONDS", 60)),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return OutboxEvent.query.filter_by(claim=token).order_by(OutboxEvent.id).all()
+
+
+def dispatch_batch(batch_size=None):
+    """Deliver one batch of due events; returns how many were claimed"""
+    config = current_app.config
+    rows = _claim(batch_size or config.get("OUTBOX_BATCH_SIZE", 100))
+    if not rows:
+        return 0
+
+    results = {}
+    by_channel = {}
+    expired = set()
+    for row in rows:
+        if row.expires_at is not None and row.expires_at <= datetime.utcnow():
+            expired.add(row.id)
+        else:
+            by_channel.setdefault(row.channel, []).append(row)
+    for channel, channel_rows in by_channel.items():
+        deliver = DELIVERERS.get(channel)
+        try:
+            if deliver is None:
+                raise ValueError(f"unknown outbox channel {channel!r}")
+            results.update(deliver(channel_rows))
+        except Exception as e:
+            logger.exception("Outbox delivery failed for %s", channel)
+            results.update({row.id: str(e) for row in channel_rows})
+
+    now = datetime.utcnow()
+    max_attempts = config.get("OUTBOX_MAX_ATTEMPTS", 8)
+    base_delay = config.get("OUTBOX_RETRY_BASE_SECONDS", 5)
+    for row in rows:
+        error = results.get(row.id)
+        row.claim = None
+        if row.id in expired:
+            row.status = "failed"
+            row.last_error = "expired before delivery"
+            OUTBOX_DELIVERIES.inc(channel=row.channel, result="expired")
+        elif error is None:
+            row.status = "sent"
+            row.sent_at = now
+            row.last_error = None
+            OUTBOX_DELIVERIES.inc(channel=row.channel, result="sent")
+        elif row.attempts >= max_attempts:
+            row.status = "failed"
+            row.last_error = error
+            OUTBOX_DELIVERIES.inc(channel=row.channel, result="failed")
+            logger.error("Outbox event %s (%s) gave up: %s", row.id, row.event, error)
+        else:
+            row.available_at = now + timedelta(
+                seconds=min(base_delay * 2 ** (row.attempts - 1), 3600)
+            )
+            row.last_error = error
+            OUTBOX_DELIVERIES.inc(channel=row.channel, result="retry")
+    db.session.commit()
+    return len(rows)
+
+
+def drain(batch_size=None):
+    """Deliver batches until nothing is due; returns the number of events handled"""
+    handled = 0
+    while True:
+        claimed = dispatch_batch(batch_size)
+        if not claimed:
+            return handled
+        handled += claimed
+
+
+def prune_sent(hours):
+    """Delete sent events older than hours (their dedupe keys stop being checked)"""
+    cutoff = datetime.utcnow() - timedelta(hours=hours)
+    deleted = OutboxEvent.query.filter(
+        OutboxEvent.status == "sent", OutboxEvent.sent_at < cutoff
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+# ---------------------------
+# DISPATCHERS
+# ---------------------------
+def run_dispatcher(app, wakeup=None, stop=None):
+    """
+    Dispatch loop: drain, then sleep until woken or OUTBOX_POLL_SECONDS
+    pass. Sent events are pruned once an hour.
+    """
+    poll = app.config.get("OUTBOX_POLL_SECONDS", 5)
+    retention = app.config.get("OUTBOX_RETENTION_HOURS", 72)
+    last_prune = 0.0
+    while stop is None or not stop.is_set():
+        with app.app_context():
+            try:
+                drain()
+                if time.monotonic() - last_prune > 3600:
+                    prune_sent(retention)
+                    last_prune = time.monotonic()
+            except Exception:
+                logger.exception("Outbox dispatcher error")
+                db.session.rollback()
+            finally:
+                db.session.remove()
+        if wakeup is not None:
+            wakeup.wait(poll)
+            wakeup.clear()
+        else:
+            time.sleep(poll)
+
+
+def _ensure_dispatcher(app):
+    global _dispatcher_started
+    if _dispatcher_started:
+        return
+    with _dispatcher_lock:
+        if not _dispatcher_started:
+            socketio.start_background_task(run_dispatcher, app, _wakeup)
+            _dispatcher_started = True
@@ -0,0 +1,255 @@
+# app/utils/post_cards.py
+"""
+Cached post cards for the feeds.
+
+A card is the viewer-independent part of a feed item: post fields, counts,
+author, era and zone. Cards are cached per worker under (post_id,
+Post.card_version); anything that changes a card (reaction, comment,
+hot_thread flag) bumps card_version with bump_card_version(), so stale
+cards are never looked up again. A page costs one id/version query plus
+the aggregate for the posts that missed.
+
+time_ago and the viewer's flags (user_agreed, bookmarked, reshared, ...)
+from app/utils/viewer_state.py are laid over the card on every response.
+
+List endpoints accept fields= (sparse fieldsets) and preview_chars=
+(truncated content), see feed_options(). When neither content nor media
+is asked for, cards are built without loading those columns.
+"""
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from flask import abort, current_app
+from sqlalchemy import case, distinct, func, update
+from sqlalchemy.orm import defer
+
+from app.extensions import db
+from app.models import Comment, Era, Like, Post, User, Zone
+from app.utils.cache import TTLCache
+from app.utils.viewer_state import EMPTY_STATE, get_viewer_state
+
+# the potentially large columns; skipped when the client does not ask for them
+HEAVY_FIELDS = ("content", "media")
+CARD_FIELDS = (
+    "id", "title", "content", "media", "created_at", "pinned", "hot_thread",
+    "likes_count", "agree_count", "disagree_count", "comments_count",
+    "author", "era", "zone",
+)
+VIEWER_FIELDS = ("user_agreed", "user_disagreed", "bookmarked", "reshared", "user_reshared")
+FEED_FIELDS = frozenset(CARD_FIELDS + VIEWER_FIELDS + ("time_ago", "bookmarked_at"))
+
+_cards = None
+
+
+def _card_cache():
+    global _cards
+    if _cards is None:
+        config = current_app.config
+        _cards = TTLCache(
+            "post_cards",
+            maxsize=config.get("POST_CARD_CACHE_SIZE", 10000),
+            ttl=config.get("POST_CARD_TTL", 300),
+        )
+    return _cards
+
+
+def time_ago(dt):
+    now = datetime.utcnow()
+    diff = relativedelta(now, dt)
+    if diff.years > 0:
+        return f"{diff.years}y"
+    if diff.months > 0:
+        return f"{diff.months}mo"
+    if diff.days > 0:
+        return f"{diff.days}d"
+    if diff.hours > 0:
+        return f"{diff.hours}h"
+    if diff.minutes > 0:
+        return f"{diff.minutes}m"
+    return "just now"
+
+
+def bump_card_version(*post_ids):
+    """Invalidate cached cards for post_ids (runs in the caller's transaction)"""
+    if post_ids:
+        db.session.execute(
+            update(Post)
+            .where(Post.id.in_(post_ids))
+            .values(card_version=Post.card_version + 1)
+        )
+
+
+def _build_cards(post_ids, light=False):
+    query = (
+        db.session.query(
+            Post,
+            User,  # Post author
+            Zone,
+            Era,
+            func.count(distinct(Like.id)).label("likes_count"),
+            func.count(
+                distinct(case((Like.reaction_type == "agree", Like.id), else_=None))
+            ).label("agree_count"),
+            func.count(
+                distinct(case((Like.reaction_type == "disagree", Like.id), else_=None))
+            ).label("disagree_count"),
+            func.count(distinct(Comment.id)).label("comments_count"),
+        )
+        .join(User, Post.user_id == User.id)
+        .join(Zone, Post.zone_id == Zone.id)
+        .join(Era, Zone.era_id == Era.id)
+        .outerjoin(Like, (Like.post_id == Post.id) & (Like.type == "post"))
+        .outerjoin(Comment, Comment.post_id == Post.id)
+        .filter(Post.id.in_(post_ids))
+        .group_by(Post.id, User.id, Zone.id, Era.id)
+    )
+    if light:
+        query = query.options(*(defer(getattr(Post, name)) for name in HEAVY_FIELDS))
+
+    cards = {}
+    for (
+        post,
+        user,
+        zone,
+        era,
+        likes_count,
+        agree_count,
+        disagree_count,
+        comments_count,
+    ) in query.all():
+        card = {
+            "id": post.id,
+            "title": post.title,
+            "created_at": post.created_at.isoformat(),
+            "pinned": post.pinned,
+            "hot_thread": post.hot_thread,
+            "likes_count": likes_count or 0,
+            "agree_count": agree_count or 0,
+            "disagree_count": disagree_count or 0,
+            "comments_count": comments_count or 0,
+            "author": {
+                "id": user.id,
+                "firstname": user.firstname,
+                "lastname": user.lastname,
+                "username": user.username,
+                "avatar": user.avatar or "",
+            },
+            "era": {
+                "id": era.id,
+                "name": era.name,
+                "year_range": era.year_range or "",
+            },
+            "zone": {"id": zone.id, "name": zone.name},
+        }
+        if not light:
+            card["content"] = post.content
+            card["media"] = post.media.split("|") if post.media else []
+        cards[post.id] = (post.card_version, card, post.created_at)
+    return cards
+
+
+def get_post_cards(post_ids, light=False):
+    """
+    {post_id: (card, created_at)} for the posts that still exist.
+    light=True may return cards without content/media (and never loads them).
+    """
+    if not post_ids:
+        return {}
+
+    versions = dict(
+        db.session.query(Post.id, Post.card_version).filter(Post.id.in_(post_ids))
+    )
+    cache = _card_cache()
+    # a full card also serves a light request
+    variants = (False, True) if light else (False,)
+    keys = [
+        (post_id, version, variant)
+        for post_id, version in versions.items()
+        for variant in variants
+    ]
+    found = {}
+    for (post_id, _, _), value in cache.get_many(keys).items():
+        found.setdefault(post_id, value)
+
+    missing = [post_id for post_id in versions if post_id not in found]
+    if missing:
+        for post_id, (version, card, created_at) in _build_cards(missing, light).items():
+            cache.set((post_id, version, light), (card, created_at))
+            found[post_id] = (card, created_at)
+    return found
+
+
+def feed_options(args):
+    """
+    render_post_cards() keyword arguments from the fields= / preview_chars=
+    query parameters; aborts with 400 on bad values.
+    """
+    fields = None
+    if args.get("fields"):
+        fields = {name.strip() for name in args["fields"].split(",") if name.strip()}
+        unknown = fields - FEED_FIELDS
+        if unknown:
+            abort(400, f"Unknown fields: {', '.join(sorted(unknown))}")
+        fields.add("id")
+
+    preview_chars = args.get("preview_chars", type=int)
+    if "preview_chars" in args and (preview_chars is None or preview_chars < 1):
+        abort(400, "preview_chars must be a positive integer")
+
+    return {"fields": fields, "preview_chars": preview_chars}
+
+
+def _preview(text, limit):
+    if len(text) <= limit:
+        return text, False
+    return text[:limit].rstrip() + "…", True
+
+
+def render_post_cards(
+    post_ids, viewer=None, reshared_key="user_reshared", fields=None, preview_chars=None
+):
+    """
+    Feed items for post_ids, in that order, with the viewer's overlay.
+    Deleted posts are skipped. reshared_key is the name the endpoint has
+    always used for the viewer's reshare flag ("reshared" / "user_reshared"),
+    or None for endpoints that never returned it.
+
+    fields limits the keys of each item (None: all of them); preview_chars
+    cuts content to that many characters and adds content_truncated.
+    """
+    light = fields is not None and not fields.intersection(HEAVY_FIELDS)
+    cards = get_post_cards(post_ids, light=light)
+    if not cards:
+        return []
+
+    states = {}
+    if viewer is not None and (fields is None or fields.intersection(VIEWER_FIELDS)):
+        states = get_viewer_state(viewer.id, list(cards))
+
+    items = []
+    for post_id in post_ids:
+        if post_id not in cards:
+            continue
+        card, created_at = cards[post_id]
+        state = states.get(post_id, EMPTY_STATE)
+        item = {
+            **card,
+            "time_ago": time_ago(created_at),
+            "user_agreed": state["reaction"] == "agree",
+            "user_disagreed": state["reaction"] == "disagree",
+            "bookmarked": state["bookmarked"],
+        }
+        if reshared_key:
+            item[reshared_key] = state["reshared"]
+        if preview_chars and "content" in item:
+            item["content"], item["content_truncated"] = _preview(
+                item["content"], preview_chars
+            )
+        if fields is not None:
+            item = {
+                name: value
+                for name, value in item.items()
+                if name in fields or (name == "content_truncated" and "content" in fields)
+            }
+        items.append(item)
+    return items
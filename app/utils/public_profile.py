@@ -0,0 +1,153 @@
+# app/utils/public_profile.py
+from collections import defaultdict
+
+from flask import current_app
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models import Era, Post, User, UserBadge, user_era_membership
+from app.utils.badge_catalog import get_badge_catalog
+from app.utils.cache import TTLCache
+
+# user_id -> public profile dict, and lower(username) -> user_id
+_profiles = None
+_usernames = None
+
+
+def _caches():
+    global _profiles, _usernames
+    if _profiles is None:
+        ttl = current_app.config.get("PUBLIC_PROFILE_TTL", 60)
+        _profiles = TTLCache("public_profile", maxsize=5000, ttl=ttl)
+        _usernames = TTLCache("public_profile_username", maxsize=5000, ttl=ttl)
+    return _profiles, _usernames
+
+
+def find_user_by_identifier(identifier):
+    """
+    Resolve a numeric id or a username (case-insensitive, via ix_users_username_lower).
+    An exact-case match wins if two usernames differ only by case.
+    """
+    if identifier.isdigit():
+        return User.query.get(int(identifier))
+
+    candidates = User.query.filter(
+        func.lower(User.username) == identifier.lower()
+    ).all()
+    for user in candidates:
+        if user.username == identifier:
+            return user
+    return candidates[0] if candidates else None
+
+
+def username_taken(username, exclude_user_id=None):
+    """True if another user has this username in any letter case"""
+    query = User.query.filter(func.lower(User.username) == username.lower())
+    if exclude_user_id is not None:
+        query = query.filter(User.id != exclude_user_id)
+    return db.session.query(query.exists()).scalar()
+
+
+def build_public_profiles(user_ids):
+    """
+    Build public profile dicts for several users in a constant number of queries.
+    Returns {user_id: profile}; unknown ids are left out.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return {}
+
+    users = User.query.filter(User.id.in_(user_ids)).all()
+    if not users:
+        return {}
+    found_ids = [u.id for u in users]
+
+    post_counts = dict(
+        db.session.query(Post.user_id, func.count(Post.id))
+        .filter(Post.user_id.in_(found_ids))
+        .group_by(Post.user_id)
+        .all()
+    )
+
+    eras = defaultdict(list)
+    for user_id, era_id, era_name in (
+        db.session.query(user_era_membership.c.user_id, Era.id, Era.name)
+        .join(Era, Era.id == user_era_membership.c.era_id)
+        .filter(user_era_membership.c.user_id.in_(found_ids))
+        .order_by(user_era_membership.c.joined_at.asc())
+        .all()
+    ):
+        eras[user_id].append({"id": era_id, "name": era_name})
+
+    badge_ids = defaultdict(list)
+    for user_id, badge_id in (
+        db.session.query(UserBadge.user_id, UserBadge.badge_id)
+        .filter(UserBadge.user_id.in_(found_ids))
+        .order_by(UserBadge.id.asc())
+        .all()
+    ):
+        badge_ids[user_id].append(badge_id)
+    catalog = get_badge_catalog() if badge_ids else {}
+
+    return {
+        u.id: {
+            "id": u.id,
+            "username": u.username,
+            "fullname": u.fullname,
+            "avatar": u.avatar or "",
+            "home_era": u.home_era,
+            "role": u.role,
+            "points": u.points or 0,
+            "is_verified": bool(u.is_verified),
+            "created_at": u.created_at.isoformat() if u.created_at else None,
+            "post_count": post_counts.get(u.id, 0),
+            "eras": eras.get(u.id, []),
+            "badges": [catalog[b] for b in badge_ids.get(u.id, []) if b in catalog],
+        }
+        for u in users
+    }
+
+
+def get_public_profiles(user_ids):
+    """Cached variant of build_public_profiles"""
+    profiles, _ = _caches()
+    found = profiles.get_many(user_ids)
+    missing = [uid for uid in user_ids if uid not in found]
+    if missing:
+        for user_id, profile in build_public_profiles(missing).items():
+            profiles.set(user_id, profile)
+            found[user_id] = profile
+    return found
+
+
+def get_public_profile(identifier):
+    """Public profile by id or username, served from the TTL cache when possible"""
+    profiles, usernames = _caches()
+
+    if identifier.isdigit():
+        user_id = int(identifier)
+    else:
+        user_id = usernames.get(identifier.lower())
+        if user_id is None:
+            user = find_user_by_identifier(identifier)
+            if not user:
+                return None
+            user_id = user.id
+            usernames.set(identifier.lower(), user_id)
+
+    profile = profiles.get(user_id)
+    if profile is None:
+        profile = build_public_profiles([user_id]).get(user_id)
+        if profile is None:
+            return None
+        profiles.set(user_id, profile)
+    return profile
+
+
+def invalidate_public_profile(user, *old_usernames):
+    """Drop cached entries for a user (pass the previous username on renames)"""
+    profiles, usernames = _caches()
+    profiles.delete(user.id)
+    usernames.delete(
+        *{name.lower() for name in (user.username, *old_usernames) if name}
+    )
@@ -0,0 +1,102 @@
+# app/utils/ranking.py
+"""
+"Hot" ranking for posts.
+
+recompute_hot_scores() aggregates reactions, comments and reshares for
+posts inside HOT_WINDOW_DAYS, stores a time-decayed score in Post.hot_score
+and flags the best ones as hot_thread. Feeds then sort by the indexed
+column instead of aggregating at request time. Run it periodically
+(`flask community rank-hot`).
+"""
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, update
+
+from app.extensions import db
+from app.models import Comment, Like, Post
+from app.utils.post_cards import bump_card_version
+
+# engagement weights: a comment or reshare says more than a tap on a reaction
+REACTION_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+RESHARE_WEIGHT = 3.0
+
+
+def hot_score(reactions, comments, reshares, age_hours, gravity):
+    engagement = (
+        reactions * REACTION_WEIGHT
+        + comments * COMMENT_WEIGHT
+        + reshares * RESHARE_WEIGHT
+    )
+    return engagement / (max(age_hours, 0) + 2) ** gravity
+
+
+def recompute_hot_scores(now=None):
+    """Recompute hot_score / hot_thread for every post; returns (scored, hot) counts"""
+    now = now or datetime.utcnow()
+    config = current_app.config
+    gravity = config.get("HOT_GRAVITY", 1.5)
+    since = now - timedelta(days=config.get("HOT_WINDOW_DAYS", 7))
+
+    posts = (
+        db.session.query(Post.id, Post.created_at, Post.reshare_count, Post.hot_thread)
+        .filter(Post.created_at >= since)
+        .all()
+    )
+    post_ids = [p.id for p in posts]
+
+    reactions, comments = {}, {}
+    if post_ids:
+        reactions = dict(
+            db.session.query(Like.post_id, func.count(Like.id))
+            .filter(Like.type == "post", Like.post_id.in_(post_ids))
+            .group_by(Like.post_id)
+            .all()
+        )
+        comments = dict(
+            db.session.query(Comment.post_id, func.count(Comment.id))
+            .filter(Comment.post_id.in_(post_ids))
+            .group_by(Comment.post_id)
+            .all()
+        )
+
+    scores = {
+        p.id: hot_score(
+            reactions.get(p.id, 0),
+            comments.get(p.id, 0),
+            p.reshare_count or 0,
+            (now - p.created_at).total_seconds() / 3600,
+            gravity,
+        )
+        for p in posts
+    }
+
+    min_score = config.get("HOT_THREAD_MIN_SCORE", 0.5)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    hot_ids = {
+        pid for pid in ranked[: config.get("HOT_THREAD_COUNT", 20)]
+        if scores[pid] >= min_score
+    }
+
+    # Posts that aged out of the window drop to 0
+    stale = Post.query.filter(
+        Post.created_at < since, (Post.hot_score != 0) | (Post.hot_thread.is_(True))
+    )
+    stale.update(
+        {"hot_score": 0.0, "hot_thread": False, "card_version": Post.card_version + 1},
+        synchronize_session=False,
+    )
+
+    if scores:
+        db.session.execute(
+            update(Post),
+            [
+                {"id": pid, "hot_score": score, "hot_thread": pid in hot_ids}
+                for pid, score in scores.items()
+            ],
+        )
+    # hot_thread is shown on post cards
+    bump_card_version(*(p.id for p in posts if bool(p.hot_thread) != (p.id in hot_ids)))
+    db.session.commit()
+    return len(scores), len(hot_ids)
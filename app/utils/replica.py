@@ -0,0 +1,194 @@
+# app/utils/replica.py
+"""
+Read-replica routing.
+
+Replicas come from DATABASE_REPLICA_URLS and are registered as
+SQLALCHEMY_BINDS "replica_0", "replica_1", ... Handlers decorated with
+@read_replica send their default-bind reads to one replica per request.
+Everything else (flushes, UPDATE/INSERT/DELETE statements, undecorated
+handlers) stays on the primary.
+
+Read-your-writes: a user who wrote through the primary is pinned to it for
+DATABASE_REPLICA_STICKY_SECONDS so they do not read their own change from a
+lagging replica. The next request may land on another worker, so the marker
+travels with the client: a signed cookie (browsers) and the same value in
+the X-Primary-Sticky response header (API clients echo it back). With
+DATABASE_REPLICA_STICKY_REDIS_URL set it is also kept in Redis, which covers
+clients that do neither.
+"""
+import logging
+import random
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.utils.cache import TTLCache
+
+REPLICA_BIND_PREFIX = "replica_"
+STICKY_COOKIE = "ncc_primary"
+STICKY_HEADER = "X-Primary-Sticky"
+
+logger = logging.getLogger(__name__)
+
+_sticky = None
+_sticky_redis_client = None
+
+
+def _sticky_users():
+    global _sticky
+    if _sticky is None:
+        _sticky = TTLCache(
+            "replica_sticky",
+            maxsize=10000,
+            ttl=current_app.config.get("DATABASE_REPLICA_STICKY_SECONDS", 5),
+        )
+    return _sticky
+
+
+class RoutingSession(Session):
+    """Session that reads from g.db_replica while the request has not written"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        primary = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+        if bind is not None or self._flushing or isinstance(clause, UpdateBase):
+            return primary
+        if not has_request_context() or g.get("db_wrote"):
+            return primary
+
+        replica_key = g.get("db_replica")
+        if replica_key is None or primary is not self._db.engine:
+            return primary
+        return self._db.engines[replica_key]
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _remember_write(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+def _sticky_seconds():
+    return current_app.config.get("DATABASE_REPLICA_STICKY_SECONDS", 5)
+
+
+def _sticky_serializer():
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"], salt="replica-sticky")
+
+
+def _sticky_redis():
+    global _sticky_redis_client
+    url = current_app.config.get("DATABASE_REPLICA_STICKY_REDIS_URL")
+    if url and _sticky_redis_client is None:
+        import redis  # optional dependency, only needed with the Redis URL set
+
+        _sticky_redis_client = redis.Redis.from_url(url)
+    return _sticky_redis_client if url else None
+
+
+def mark_primary_sticky(user_id):
+    """
+    Pin a user's reads to the primary for the sticky window. Returns the
+    signed marker to hand back to the client.
+    """
+    _sticky_users().set(user_id, True)
+    client = _sticky_redis()
+    if client is not None:
+        try:
+            client.set(f"replica_sticky:{user_id}", 1, ex=_sticky_seconds())
+        except Exception as e:
+            logger.warning(f"Could not store replica stickiness in Redis: {e}")
+    return _sticky_serializer().dumps(user_id)
+
+
+def is_primary_sticky(user_id):
+    """True while user_id wrote within the sticky window (any worker)"""
+    if _sticky_users().get(user_id):
+        return True
+
+    marker = request.headers.get(STICKY_HEADER) or request.cookies.get(STICKY_COOKIE)
+    if marker:
+        try:
+            if _sticky_serializer().loads(marker, max_age=_sticky_seconds()) == user_id:
+                return True
+        except BadSignature:  # also covers expired markers
+            pass
+
+    client = _sticky_redis()
+    if client is not None:
+        try:
+            return bool(client.exists(f"replica_sticky:{user_id}"))
+        except Exception as e:
+            logger.warning(f"Could not read replica stickiness from Redis: {e}")
+            return True  # when unsure, read from the primary
+    return False
+
+
+def _choose_replica():
+    replicas = [
+        key
+        for key in current_app.config.get("SQLALCHEMY_BINDS") or {}
+        if key.startswith(REPLICA_BIND_PREFIX)
+    ]
+    if not replicas:
+        return None
+
+    user = g.get("current_user")
+    if user is not None and is_primary_sticky(user.id):
+        return None
+    return random.choice(replicas)
+
+
+def read_replica(f):
+    """
+    Serve a read-only handler from a replica. Put it below @token_required
+    so the caller is known and recent writers stay on the primary.
+    If the replica is unreachable the handler is retried on the primary.
+    """
+
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        g.db_replica = _choose_replica()
+        if g.db_replica is None:
+            return f(*args, **kwargs)
+
+        try:
+            return f(*args, **kwargs)
+        except OperationalError as e:
+            current_app.logger.warning(
+                f"Replica {g.db_replica} failed, retrying on primary: {e}"
+            )
+            from app.extensions import db
+
+            db.session.rollback()
+            g.db_replica = None
+            return f(*args, **kwargs)
+        finally:
+            g.pop("db_replica", None)
+
+    return decorated
+
+
+def init_replica_routing(app):
+    """After a request that wrote to the primary, make its user sticky"""
+
+    @app.after_request
+    def pin_writers_to_primary(response):
+        user = g.get("current_user")
+        if g.pop("db_wrote", False) and user is not None:
+            marker = mark_primary_sticky(user.id)
+            response.set_cookie(
+                STICKY_COOKIE,
+                marker,
+                max_age=_sticky_seconds(),
+                httponly=True,
+                secure=request.is_secure,
+                samesite="Lax",
+            )
+            response.headers[STICKY_HEADER] = marker
+        return response
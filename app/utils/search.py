@@ -0,0 +1,207 @@
+# app/utils/search.py
+"""
+Full-text search over posts and comments.
+
+Every post and comment has a row in search_documents (see SearchDocument).
+Postgres matches it with websearch_to_tsquery against the GIN tsvector
+index; SQLite (local/dev) matches it through the FTS5 mirror table.
+"""
+import re
+
+from sqlalchemy import func, insert, select
+
+from app.extensions import db
+from app.models import (
+    Comment,
+    Post,
+    SearchDocument,
+    Zone,
+    search_document_tsvector,
+)
+
+SNIPPET_CHARS = 160
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+# ---------------------------
+# INDEX MAINTENANCE
+# ---------------------------
+def _upsert(doc_type, doc_id, **fields):
+    doc = SearchDocument.query.filter_by(doc_type=doc_type, doc_id=doc_id).first()
+    if doc is None:
+        doc = SearchDocument(doc_type=doc_type, doc_id=doc_id)
+        db.session.add(doc)
+    for name, value in fields.items():
+        setattr(doc, name, value)
+    return doc
+
+
+def index_post(post, era_id=None):
+    """Add or refresh a post's search row (call before the commit that saves the post)"""
+    if era_id is None and post.zone is not None:
+        era_id = post.zone.era_id
+    return _upsert(
+        "post",
+        post.id,
+        post_id=post.id,
+        era_id=era_id,
+        zone_id=post.zone_id,
+        user_id=post.user_id,
+        title=post.title,
+        body=post.content,
+        created_at=post.created_at,
+    )
+
+
+def index_comment(comment, post):
+    """Add or refresh a comment's search row; it inherits the post's era/zone"""
+    return _upsert(
+        "comment",
+        comment.id,
+        post_id=post.id,
+        era_id=post.zone.era_id if post.zone is not None else None,
+        zone_id=post.zone_id,
+        user_id=comment.user_id,
+        title=None,
+        body=comment.content,
+        created_at=comment.created_at,
+    )
+
+
+def remove_post(post_id):
+    """Drop the search rows of a post and all of its comments"""
+    SearchDocument.query.filter_by(post_id=post_id).delete(synchronize_session=False)
+
+
+def rebuild_index(batch_size=500, echo=print):
+    """Reindex every post and comment, batch_size rows per insert/commit"""
+    SearchDocument.query.delete(synchronize_session=False)
+    db.session.commit()
+
+    sources = (
+        (
+            "post",
+            db.session.query(
+                Post.id.label("doc_id"),
+                Post.id.label("post_id"),
+                Zone.era_id,
+                Post.zone_id,
+                Post.user_id,
+                Post.title,
+                Post.content.label("body"),
+                Post.created_at,
+            )
+            .outerjoin(Zone, Zone.id == Post.zone_id),
+            Post.id,
+        ),
+        (
+            "comment",
+            db.session.query(
+                Comment.id.label("doc_id"),
+                Comment.post_id,
+                Zone.era_id,
+                Post.zone_id,
+                Comment.user_id,
+                db.null().label("title"),
+                Comment.content.label("body"),
+                Comment.created_at,
+            )
+            .join(Post, Post.id == Comment.post_id)
+            .outerjoin(Zone, Zone.id == Post.zone_id),
+            Comment.id,
+        ),
+    )
+
+    for doc_type, query, key in sources:
+        last_id, total = 0, 0
+        while True:
+            rows = query.filter(key > last_id).order_by(key).limit(batch_size).all()
+            if not rows:
+                break
+            db.session.execute(
+                insert(SearchDocument),
+                [dict(row._mapping, doc_type=doc_type) for row in rows],
+            )
+            db.session.commit()
+            last_id = rows[-1].doc_id
+            total += len(rows)
+        echo(f"Indexed {total} {doc_type}s")
+
+
+# ---------------------------
+# QUERYING
+# ---------------------------
+def _fts5_query(terms):
+    # Quote every term so user input cannot inject FTS5 syntax; the last term
+    # is a prefix match so results show up while the user is still typing.
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _snippet(text, terms):
+    if not text:
+        return ""
+    lowered = text.lower()
+    hits = [lowered.find(t.lower()) for t in terms]
+    hits = [i for i in hits if i >= 0]
+    start = max(min(hits) - SNIPPET_CHARS // 4, 0) if hits else 0
+    snippet = text[start : start + SNIPPET_CHARS]
+    return ("…" if start else "") + snippet + ("…" if start + SNIPPET_CHARS < len(text) else "")
+
+
+def search_documents(query, era_id=None, zone_id=None, doc_type=None, page=1, per_page=20):
+    """
+    Ranked, paginated search.
+    Returns (results, total) where results are dicts for the requested page.
+    """
+    terms = _TERM.findall(query or "")
+    if not terms:
+        return [], 0
+
+    if db.session.get_bind().dialect.name == "postgresql":
+        tsquery = func.websearch_to_tsquery(db.literal("english", db.String), query)
+        match = search_document_tsvector.op("@@")(tsquery)
+        rank = func.ts_rank(search_document_tsvector, tsquery)
+        order = (rank.desc(), SearchDocument.created_at.desc())
+        base = select(SearchDocument, rank.label("rank")).where(match)
+    else:
+        fts = db.table("search_documents_fts", db.column("rowid"))
+        fts_name = db.literal_column("search_documents_fts")
+        # bm25 is "lower is better"; titles weigh twice as much as bodies
+        rank = func.bm25(fts_name, 2.0, 1.0)
+        order = (rank.asc(), SearchDocument.created_at.desc())
+        base = (
+            select(SearchDocument, rank.label("rank"))
+            .join(fts, fts.c.rowid == SearchDocument.id)
+            .where(fts_name.op("MATCH")(_fts5_query(terms)))
+        )
+
+    if era_id is not None:
+        base = base.where(SearchDocument.era_id == era_id)
+    if zone_id is not None:
+        base = base.where(SearchDocument.zone_id == zone_id)
+    if doc_type:
+        base = base.where(SearchDocument.doc_type == doc_type)
+
+    total = db.session.scalar(select(func.count()).select_from(base.subquery()))
+    rows = db.session.execute(
+        base.order_by(*order).limit(per_page).offset((page - 1) * per_page)
+    ).all()
+
+    results = [
+        {
+            "type": doc.doc_type,
+            "id": doc.doc_id,
+            "post_id": doc.post_id,
+            "era_id": doc.era_id,
+            "zone_id": doc.zone_id,
+            "user_id": doc.user_id,
+            "title": doc.title,
+            "snippet": _snippet(doc.body, terms),
+            "created_at": doc.created_at.isoformat() if doc.created_at else None,
+            "rank": round(abs(float(score)), 6),
+        }
+        for doc, score in rows
+    ]
+    return results, total
@@ -0,0 +1,15 @@
+# app/utils/swagger.py
+from flasgger import Swagger
+
+
+class CachedSwagger(Swagger):
+    """
+    Flasgger already builds the spec lazily on the first /apispec_1.json hit,
+    but rebuilds it on every hit when app.debug is on. Routes only change on a
+    restart, so keep the first build for the life of the process.
+    """
+
+    def get_apispecs(self, endpoint="apispec_1"):
+        if endpoint in self.apispecs:
+            return self.apispecs[endpoint]
+        return super().get_apispecs(endpoint)
@@ -0,0 +1,237 @@
+# app/utils/timeline.py
+"""
+Home timelines for /community/posts/my-communities.
+
+Each user's timeline is a capped list of post ids, newest first.
+
+- Fan-out-on-write: create_post pushes the new id into the timelines of
+  the era's members (only timelines that already exist; the others are
+  built on their next read).
+- Fan-out-on-read: eras with more than TIMELINE_FANOUT_MAX_MEMBERS
+  members are not pushed to. Their recent post ids are merged in when a
+  member reads the timeline.
+
+Backends: Redis sorted sets when TIMELINE_REDIS_URL is set (shared by every
+worker), otherwise an in-process store whose entries expire after
+TIMELINE_LOCAL_TTL so writes handled by other workers show up.
+"""
+import threading
+
+from flask import current_app
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models import Post, Zone, user_era_membership
+from app.utils.cache import TTLCache
+
+
+class LocalTimelineStore:
+    """Per-process store: {user_id: [post_id, ...]} newest first"""
+
+    def __init__(self, max_len, ttl):
+        self.max_len = max_len
+        self._timelines = TTLCache("timeline", maxsize=50000, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        return self._timelines.get(user_id)
+
+    def set(self, user_id, post_ids):
+        self._timelines.set(user_id, list(post_ids[: self.max_len]))
+
+    def push(self, user_ids, post_id):
+        with self._lock:
+            for user_id, ids in self._timelines.get_many(user_ids).items():
+                if post_id not in ids:
+                    # ids only grow, so the new post goes first
+                    self._timelines.set(user_id, [post_id] + ids[: self.max_len - 1])
+
+    def remove(self, user_ids, post_id):
+        with self._lock:
+            for user_id, ids in self._timelines.get_many(user_ids).items():
+                if post_id in ids:
+                    self._timelines.set(user_id, [i for i in ids if i != post_id])
+
+    def delete(self, user_id):
+        self._timelines.delete(user_id)
+
+
+class RedisTimelineStore:
+    """Shared store: one sorted set per user, scored by post id"""
+
+    def __init__(self, url, max_len, ttl=86400):
+        import redis  # optional dependency, only needed with TIMELINE_REDIS_URL
+
+        self.redis = redis.Redis.from_url(url)
+        self.max_len = max_len
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(user_id):
+        return f"timeline:{user_id}"
+
+    def get(self, user_id):
+        key = self._key(user_id)
+        pipe = self.redis.pipeline()
+        pipe.exists(key)
+        pipe.zrevrange(key, 0, -1)
+        exists, ids = pipe.execute()
+        return [int(i) for i in ids if int(i) > 0] if exists else None
+
+    def set(self, user_id, post_ids):
+        key = self._key(user_id)
+        pipe = self.redis.pipeline()
+        pipe.delete(key)
+        # placeholder member keeps empty timelines cached
+        pipe.zadd(key, {0: 0, **{pid: pid for pid in post_ids[: self.max_len]}})
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def push(self, user_ids, post_id):
+        keys = [self._key(uid) for uid in user_ids]
+        pipe = self.redis.pipeline()
+        for key in keys:
+            pipe.exists(key)
+        existing = [key for key, found in zip(keys, pipe.execute()) if found]
+
+        pipe = self.redis.pipeline()
+        for key in existing:
+            pipe.zadd(key, {post_id: post_id})
+            # keep the placeholder (rank 0) plus the newest max_len ids
+            pipe.zremrangebyrank(key, 1, -(self.max_len + 1))
+        pipe.execute()
+
+    def remove(self, user_ids, post_id):
+        pipe = self.redis.pipeline()
+        for user_id in user_ids:
+            pipe.zrem(self._key(user_id), post_id)
+        pipe.execute()
+
+    def delete(self, user_id):
+        self.redis.delete(self._key(user_id))
+
+
+_store = None
+_store_lock = threading.Lock()
+_large_eras = None
+
+
+def get_timeline_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = current_app.config
+                max_len = config.get("TIMELINE_MAX_LEN", 500)
+                if config.get("TIMELINE_REDIS_URL"):
+                    _store = RedisTimelineStore(config["TIMELINE_REDIS_URL"], max_len)
+                else:
+                    _store = LocalTimelineStore(
+                        max_len, config.get("TIMELINE_LOCAL_TTL", 30)
+                    )
+    return _store
+
+
+def large_era_ids():
+    """Eras too big to fan out on write (member counts refreshed every minute)"""
+    global _large_eras
+    if _large_eras is None:
+        _large_eras = TTLCache("timeline_large_eras", maxsize=1, ttl=60)
+    found = _large_eras.get("ids")
+    if found is None:
+        threshold = current_app.config.get("TIMELINE_FANOUT_MAX_MEMBERS", 5000)
+        found = frozenset(
+            era_id
+            for (era_id,) in db.session.query(user_era_membership.c.era_id)
+            .group_by(user_era_membership.c.era_id)
+            .having(func.count() > threshold)
+        )
+        _large_eras.set("ids", found)
+    return found
+
+
+def _user_era_ids(user_id):
+    return [
+        era_id
+        for (era_id,) in db.session.query(user_era_membership.c.era_id).filter(
+            user_era_membership.c.user_id == user_id
+        )
+    ]
+
+
+def _recent_post_ids(era_ids, limit):
+    if not era_ids:
+        return []
+    return [
+        post_id
+        for (post_id,) in db.session.query(Post.id)
+        .join(Zone, Post.zone_id == Zone.id)
+        .filter(Zone.era_id.in_(era_ids))
+        .order_by(Post.created_at.desc(), Post.id.desc())
+        .limit(limit)
+    ]
+
+
+def _member_ids(era_id):
+    return [
+        user_id
+        for (user_id,) in db.session.query(user_era_membership.c.user_id).filter(
+            user_era_membership.c.era_id == era_id
+        )
+    ]
+
+
+def fan_out_post(post, era_id):
+    """Push a new post into its era members' timelines (skipped for large eras)"""
+    if era_id in large_era_ids():
+        return
+    member_ids = _member_ids(era_id)
+    if member_ids:
+        get_timeline_store().push(member_ids, post.id)
+
+
+def remove_from_timelines(post_id, era_id):
+    """
+    Take a deleted post out of its era members' timelines. Large eras are
+    included: their posts may have been fanned out before the era grew.
+    """
+    member_ids = _member_ids(era_id)
+    if member_ids:
+        get_timeline_store().remove(member_ids, post_id)
+
+
+def invalidate_timeline(user_id):
+    """Drop a user's timeline (e.g. after joining or leaving an era)"""
+    get_timeline_store().delete(user_id)
+
+
+def home_timeline(user_id, page=1, per_page=20):
+    """
+    Post ids for one page of the user's home timeline plus the timeline length.
+    Returns ([], 0) when the user has not joined any era.
+    """
+    store = get_timeline_store()
+    max_len = current_app.config.get("TIMELINE_MAX_LEN", 500)
+
+    era_ids = None
+    post_ids = store.get(user_id)
+    if post_ids is None:
+        # Cold timeline: build it once from the database (fan-out-on-read)
+        era_ids = _user_era_ids(user_id)
+        small = [e for e in era_ids if e not in large_era_ids()]
+        post_ids = _recent_post_ids(small, max_len)
+        store.set(user_id, post_ids)
+
+    large = large_era_ids()
+    if large:
+        if era_ids is None:
+            era_ids = _user_era_ids(user_id)
+        joined_large = [e for e in era_ids if e in large]
+        if joined_large:
+            recent = _recent_post_ids(joined_large, max_len)
+            # ids grow with time, so sorting by id keeps the timeline newest first
+            post_ids = sorted(set(post_ids) | set(recent), reverse=True)[:max_len]
+
+    page, per_page = max(page, 1), max(per_page, 1)
+    start = (page - 1) * per_page
+    return post_ids[start : start + per_page], len(post_ids)
@@ -0,0 +1,173 @@
+# app/utils/user_search.py
+"""
+Username / fullname prefix search for @mentions and member search.
+
+The most active users (by points) are kept in an in-memory prefix trie per
+process. Every trie node stores the best few matches for its prefix, so a
+lookup is a walk of len(prefix) dict hits. When the trie has fewer matches
+than asked for, and for era-scoped searches, the database is queried;
+ix_users_username_prefix / ix_users_fullname_prefix serve its LIKE 'abc%'.
+"""
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import func, or_
+
+from app.extensions import db
+from app.models import User, user_era_membership
+
+# matches kept per trie node; also the largest page the trie can answer
+NODE_TOP_K = 20
+
+
+def _user_entry(user):
+    return {
+        "id": user.id,
+        "username": user.username,
+        "fullname": user.fullname,
+        "avatar": user.avatar or "",
+        "points": user.points or 0,
+    }
+
+
+def _search_keys(entry):
+    """Lower-cased strings a user can be found by: username and each name word"""
+    keys = {(entry["username"] or "").lower()}
+    keys.update((entry["fullname"] or "").lower().split())
+    keys.discard("")
+    return keys
+
+
+def _rank(entry):
+    return (-entry["points"], entry["username"] or "")
+
+
+class UserTrie:
+    def __init__(self):
+        self.users = {}  # user_id -> entry
+        self.root = {"children": {}, "top": []}
+        self._lock = threading.Lock()
+
+    def _nodes(self, key, create=False):
+        node = self.root
+        yield node
+        for char in key:
+            child = node["children"].get(char)
+            if child is None:
+                if not create:
+                    return
+                child = node["children"][char] = {"children": {}, "top": []}
+            node = child
+            yield node
+
+    def add(self, entry):
+        with self._lock:
+            self._remove(entry["id"])
+            self.users[entry["id"]] = entry
+            for key in _search_keys(entry):
+                for node in self._nodes(key, create=True):
+                    if entry["id"] in node["top"]:
+                        continue
+                    top = node["top"] + [entry["id"]]
+                    top.sort(key=lambda uid: _rank(self.users[uid]))
+                    # readers may be iterating the old list: swap, don't mutate
+                    node["top"] = top[:NODE_TOP_K]
+
+    def remove(self, user_id):
+        with self._lock:
+            self._remove(user_id)
+
+    def _remove(self, user_id):
+        entry = self.users.pop(user_id, None)
+        if entry is None:
+            return
+        for key in _search_keys(entry):
+            for node in self._nodes(key):
+                if user_id in node["top"]:
+                    node["top"] = [uid for uid in node["top"] if uid != user_id]
+
+    def search(self, prefix):
+        """Up to NODE_TOP_K best matches for prefix among the users in the trie"""
+        node = self.root
+        for char in prefix:
+            node = node["children"].get(char)
+            if node is None:
+                return []
+        users = self.users
+        return [users[uid] for uid in node["top"] if uid in users]
+
+
+_trie = None
+_loaded_at = 0.0
+_load_lock = threading.Lock()
+
+
+def get_user_trie():
+    """The process-wide trie, (re)loaded from the top active users every USER_SEARCH_TRIE_TTL"""
+    global _trie, _loaded_at
+    ttl = current_app.config.get("USER_SEARCH_TRIE_TTL", 600)
+    if _trie is not None and time.monotonic() - _loaded_at < ttl:
+        return _trie
+
+    with _load_lock:
+        if _trie is None or time.monotonic() - _loaded_at >= ttl:
+            size = current_app.config.get("USER_SEARCH_TRIE_SIZE", 5000)
+            trie = UserTrie()
+            for user in (
+                db.session.query(User.id, User.username, User.fullname, User.avatar, User.points)
+                .order_by(User.points.desc(), User.id.asc())
+                .limit(size)
+            ):
+                trie.add(_user_entry(user))
+            _trie, _loaded_at = trie, time.monotonic()
+    return _trie
+
+
+def index_user(user):
+    """Add or refresh a user in this process's trie (signup / profile update)"""
+    if _trie is not None:
+        _trie.add(_user_entry(user))
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_database(prefix, limit, era_id=None):
+    pattern = _escape_like(prefix) + "%"
+    query = db.session.query(
+        User.id, User.username, User.fullname, User.avatar, User.points
+    ).filter(
+        or_(
+            func.lower(User.username).like(pattern, escape="\\"),
+            func.lower(User.fullname).like(pattern, escape="\\"),
+        )
+    )
+    if era_id is not None:
+        query = query.join(
+            user_era_membership, user_era_membership.c.user_id == User.id
+        ).filter(user_era_membership.c.era_id == era_id)
+    rows = query.order_by(User.points.desc(), User.username.asc()).limit(limit).all()
+    return [_user_entry(row) for row in rows]
+
+
+def search_users(prefix, limit=10, era_id=None):
+    """Users whose username or a fullname word starts with prefix, most active first"""
+    prefix = (prefix or "").strip().lstrip("@").lower()
+    if not prefix:
+        return []
+    limit = min(limit, NODE_TOP_K)
+
+    if era_id is not None:
+        return _search_database(prefix, limit, era_id=era_id)
+
+    matches = get_user_trie().search(prefix)
+    if len(matches) >= limit:
+        return matches[:limit]
+
+    # Users outside the trie may match too; merge them in from the database
+    merged = {entry["id"]: entry for entry in matches}
+    for entry in _search_database(prefix, limit):
+        merged.setdefault(entry["id"], entry)
+    return sorted(merged.values(), key=_rank)[:limit]
@@ -0,0 +1,74 @@
+# app/utils/viewer_state.py
+"""
+What the viewer has done to each post: reaction, bookmark, reshare.
+
+All three are read in one UNION ALL round trip and cached per
+(user_id, post_id) for VIEWER_STATE_TTL seconds. The handlers that change
+them call invalidate_viewer_state() so users see their own clicks at once;
+other workers catch up within the TTL.
+"""
+from flask import current_app
+from sqlalchemy import literal, null, select, union_all
+
+from app.extensions import db
+from app.models import Bookmark, Like, Reshare
+from app.utils.cache import TTLCache
+
+EMPTY_STATE = {"reaction": None, "bookmarked": False, "reshared": False}
+
+_states = None
+
+
+def _state_cache():
+    global _states
+    if _states is None:
+        _states = TTLCache(
+            "viewer_state",
+            maxsize=50000,
+            ttl=current_app.config.get("VIEWER_STATE_TTL", 10),
+        )
+    return _states
+
+
+def _load(user_id, post_ids):
+    query = union_all(
+        select(Like.post_id, literal("reaction").label("kind"), Like.reaction_type.label("value"))
+        .where(Like.user_id == user_id, Like.type == "post", Like.post_id.in_(post_ids)),
+        select(Bookmark.post_id, literal("bookmark"), null())
+        .where(Bookmark.user_id == user_id, Bookmark.post_id.in_(post_ids)),
+        select(Reshare.post_id, literal("reshare"), null())
+        .where(Reshare.user_id == user_id, Reshare.post_id.in_(post_ids)),
+    )
+    states = {post_id: dict(EMPTY_STATE) for post_id in post_ids}
+    for post_id, kind, value in db.session.execute(query):
+        state = states[post_id]
+        if kind == "reaction":
+            state["reaction"] = value
+        elif kind == "bookmark":
+            state["bookmarked"] = True
+        else:
+            state["reshared"] = True
+    return states
+
+
+def get_viewer_state(user_id, post_ids):
+    """{post_id: {"reaction", "bookmarked", "reshared"}} for every id in post_ids"""
+    post_ids = list(dict.fromkeys(post_ids))
+    if not post_ids:
+        return {}
+
+    cache = _state_cache()
+    cached = cache.get_many([(user_id, post_id) for post_id in post_ids])
+    states = {post_id: state for (_, post_id), state in cached.items()}
+
+    missing = [post_id for post_id in post_ids if post_id not in states]
+    if missing:
+        for post_id, state in _load(user_id, missing).items():
+            cache.set((user_id, post_id), state)
+            states[post_id] = state
+    return states
+
+
+def invalidate_viewer_state(user_id, post_id):
+    """Forget a user's cached state for a post (call after they react/bookmark/reshare)"""
+    _state_cache().delete((user_id, post_id))
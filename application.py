@@ -11,6 +11,7 @@ import os
 from app import create_app
 
 app = create_app()
+application = app  # Procfile / gunicorn entry point
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))  # ✅ must match nginx upstream
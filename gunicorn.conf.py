@@ -0,0 +1,67 @@
+# gunicorn.conf.py - picked up automatically by `gunicorn` run from the repo root
+import os
+import sys
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+# One worker unless socket.io can span processes: long-polling sessions need
+# SOCKETIO_MESSAGE_QUEUE plus sticky routing at the load balancer. Several
+# workers also split the per-process caches (timelines, viewer state, public
+# profiles, badge catalog) - scale with threads / green threads first.
+workers = int(os.getenv("WEB_CONCURRENCY", 1))
+if workers > 1 and not os.getenv("SOCKETIO_MESSAGE_QUEUE"):
+    print(
+        f"WEB_CONCURRENCY={workers} ignored: set SOCKETIO_MESSAGE_QUEUE (and sticky "
+        "sessions) to run more than one worker",
+        file=sys.stderr,
+    )
+    workers = 1
+threads = int(os.getenv("GUNICORN_THREADS", 1))
+# green threads per eventlet/gevent worker; Config sizes the DB pool from it
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+
+# Import the app once in the master and fork it into the workers, so module
+# imports and create_app() happen once and the memory is shared copy-on-write.
+# eventlet/gevent must monkey-patch before the app is imported, so they load
+# the app in each worker instead.
+preload_app = os.getenv(
+    "GUNICORN_PRELOAD", str(worker_class not in ("eventlet", "gevent"))
+).lower() in ("true", "1", "t")
+
+# Production mode: no db.create_all() at boot (see Config.AUTO_CREATE_TABLES)
+os.environ.setdefault("APP_ENV", "production")
+
+
+def post_fork(server, worker):
+    """Drop DB connections inherited from the master; each worker opens its own."""
+    if not preload_app:
+        return
+    from app.extensions import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    """Write this worker's final metrics before it goes away."""
+    from app.utils.metrics import registry
+
+    try:
+        registry.flush()
+    except OSError:
+        pass
+
+
+def child_exit(server, worker):
+    """Fold the exited worker's metrics into the totals and drop its snapshot."""
+    from app.utils.metrics import registry
+
+    if os.getenv("METRICS_DIR"):
+        registry.configure(os.environ["METRICS_DIR"])
+    try:
+        registry.retire(worker.pid)
+    except OSError as e:
+        server.log.warning("Could not retire metrics of worker %s: %s", worker.pid, e)
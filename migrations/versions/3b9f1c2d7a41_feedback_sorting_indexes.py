@@ -0,0 +1,61 @@
+"""Feedback category, sorting indexes and one vote per user
+
+Revision ID: 3b9f1c2d7a41
+Revises: 72e248caceb0
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9f1c2d7a41'
+down_revision = '72e248caceb0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('feedback', sa.Column('category', sa.String(length=50), nullable=True))
+    op.execute("UPDATE feedback SET category = 'general' WHERE category IS NULL")
+    op.execute("UPDATE feedback SET upvotes = 0 WHERE upvotes IS NULL")
+    op.execute("UPDATE feedback SET downvotes = 0 WHERE downvotes IS NULL")
+
+    op.create_index('ix_feedback_parent_created', 'feedback', ['feedback_id', 'created_at'])
+    op.create_index(
+        'ix_feedback_parent_score',
+        'feedback',
+        ['feedback_id', sa.text('(upvotes - downvotes)'), 'created_at'],
+    )
+    op.create_index(
+        'ix_feedback_parent_controversy',
+        'feedback',
+        [
+            'feedback_id',
+            sa.text('(CASE WHEN upvotes < downvotes THEN upvotes ELSE downvotes END)'),
+            sa.text('(upvotes + downvotes)'),
+        ],
+    )
+
+    # keep the most recent vote per (user, feedback) before enforcing uniqueness
+    op.execute(
+        """
+        DELETE FROM feedback_votes
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM feedback_votes GROUP BY user_id, feedback_id
+        )
+        """
+    )
+    with op.batch_alter_table('feedback_votes', schema=None) as batch_op:
+        batch_op.create_unique_constraint('unique_user_feedback_vote', ['user_id', 'feedback_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('feedback_votes', schema=None) as batch_op:
+        batch_op.drop_constraint('unique_user_feedback_vote', type_='unique')
+
+    op.drop_index('ix_feedback_parent_controversy', table_name='feedback')
+    op.drop_index('ix_feedback_parent_score', table_name='feedback')
+    op.drop_index('ix_feedback_parent_created', table_name='feedback')
+    op.drop_column('feedback', 'category')
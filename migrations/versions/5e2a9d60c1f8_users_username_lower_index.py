@@ -0,0 +1,24 @@
+"""Case-insensitive username index
+
+Revision ID: 5e2a9d60c1f8
+Revises: 8c41e07b5d93
+Create Date: 2026-10-19 10:41:55.903112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2a9d60c1f8'
+down_revision = '8c41e07b5d93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_username_lower', 'users', [sa.text('lower(username)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_username_lower', table_name='users')
@@ -0,0 +1,31 @@
+"""Post hot_score for the hot feed
+
+Revision ID: 7f1e4b2c9d60
+Revises: c3d8b6e0a5f2
+Create Date: 2026-10-19 14:52:03.664118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f1e4b2c9d60'
+down_revision = 'c3d8b6e0a5f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('hot_score', sa.Float(), server_default='0', nullable=False))
+        batch_op.create_index('ix_posts_created_at', ['created_at'], unique=False)
+        batch_op.create_index('ix_posts_hot_score', ['hot_score', 'created_at'], unique=False)
+    # scores are filled by: flask community rank-hot
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_index('ix_posts_hot_score')
+        batch_op.drop_index('ix_posts_created_at')
+        batch_op.drop_column('hot_score')
@@ -0,0 +1,63 @@
+"""Link missions to events and keep participant counters
+
+Revision ID: 8c41e07b5d93
+Revises: 3b9f1c2d7a41
+Create Date: 2026-10-19 10:02:17.554019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41e07b5d93'
+down_revision = '3b9f1c2d7a41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('missions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('event_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('participant_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('completed_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_missions_event_id'), ['event_id'], unique=False)
+        batch_op.create_foreign_key('fk_missions_event_id_events', 'events', ['event_id'], ['id'])
+
+    # keep the earliest participation per (user, mission) before enforcing uniqueness
+    op.execute(
+        """
+        DELETE FROM mission_participants
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM mission_participants GROUP BY user_id, mission_id
+        )
+        """
+    )
+    with op.batch_alter_table('mission_participants', schema=None) as batch_op:
+        batch_op.create_unique_constraint('unique_user_mission', ['user_id', 'mission_id'])
+
+    op.execute(
+        """
+        UPDATE missions SET
+            participant_count = (
+                SELECT COUNT(*) FROM mission_participants mp
+                WHERE mp.mission_id = missions.id
+            ),
+            completed_count = (
+                SELECT COUNT(*) FROM mission_participants mp
+                WHERE mp.mission_id = missions.id AND mp.status = 'completed'
+            )
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('mission_participants', schema=None) as batch_op:
+        batch_op.drop_constraint('unique_user_mission', type_='unique')
+
+    with op.batch_alter_table('missions', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_missions_event_id_events', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_missions_event_id'))
+        batch_op.drop_column('completed_count')
+        batch_op.drop_column('participant_count')
+        batch_op.drop_column('event_id')
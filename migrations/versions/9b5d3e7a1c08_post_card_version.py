@@ -0,0 +1,26 @@
+"""Post card_version for the post-card cache
+
+Revision ID: 9b5d3e7a1c08
+Revises: 7f1e4b2c9d60
+Create Date: 2026-10-19 15:40:27.218804
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b5d3e7a1c08'
+down_revision = '7f1e4b2c9d60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('card_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('card_version')
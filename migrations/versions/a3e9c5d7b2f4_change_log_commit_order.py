@@ -0,0 +1,31 @@
+"""Change log commit order (txid, database clock)
+
+Revision ID: a3e9c5d7b2f4
+Revises: f4a7d9e2b6c1
+Create Date: 2026-10-19 22:41:05.382114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3e9c5d7b2f4'
+down_revision = 'f4a7d9e2b6c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # recreate: SQLite cannot ADD COLUMN with a non-constant default
+    with op.batch_alter_table('change_log', recreate='always') as batch_op:
+        batch_op.add_column(sa.Column('txid', sa.BigInteger(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('logged_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+        batch_op.create_index('ix_change_log_txid_id', ['txid', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('change_log', recreate='always') as batch_op:
+        batch_op.drop_index('ix_change_log_txid_id')
+        batch_op.drop_column('logged_at')
+        batch_op.drop_column('txid')
@@ -0,0 +1,75 @@
+"""Full-text search documents
+
+Revision ID: a4c7e2f91b36
+Revises: 5e2a9d60c1f8
+Create Date: 2026-10-19 14:20:12.517804
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c7e2f91b36'
+down_revision = '5e2a9d60c1f8'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_FTS5 = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_documents_fts USING fts5("
+    "title, body, content='search_documents', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(rowid, title, body) "
+    "VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_documents_fts(rowid, title, body) "
+    "VALUES (new.id, new.title, new.body); END",
+)
+
+
+def upgrade():
+    op.create_table('search_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('doc_type', sa.String(length=20), nullable=False),
+    sa.Column('doc_id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('era_id', sa.Integer(), nullable=True),
+    sa.Column('zone_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('doc_type', 'doc_id', name='unique_search_document')
+    )
+    op.create_index('ix_search_documents_post_id', 'search_documents', ['post_id'], unique=False)
+    op.create_index('ix_search_documents_era_zone', 'search_documents', ['era_id', 'zone_id'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_search_documents_tsv ON search_documents USING gin "
+            "(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(body, '')))"
+        )
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS5:
+            op.execute(statement)
+    # existing rows are loaded with: flask search rebuild
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_search_documents_tsv', table_name='search_documents')
+    elif dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS search_documents_fts")
+    op.drop_index('ix_search_documents_era_zone', table_name='search_documents')
+    op.drop_index('ix_search_documents_post_id', table_name='search_documents')
+    op.drop_table('search_documents')
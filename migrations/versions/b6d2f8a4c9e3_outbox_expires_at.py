@@ -0,0 +1,26 @@
+"""Outbox event expiry
+
+Revision ID: b6d2f8a4c9e3
+Revises: a3e9c5d7b2f4
+Create Date: 2026-10-19 23:05:48.617203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d2f8a4c9e3'
+down_revision = 'a3e9c5d7b2f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('outbox_events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('outbox_events', schema=None) as batch_op:
+        batch_op.drop_column('expires_at')
@@ -0,0 +1,31 @@
+"""Prefix indexes for user search / mentions
+
+Revision ID: c3d8b6e0a5f2
+Revises: a4c7e2f91b36
+Create Date: 2026-10-19 14:34:40.281930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d8b6e0a5f2'
+down_revision = 'a4c7e2f91b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Postgres only: SQLite serves LIKE 'abc%' from ix_users_username_lower
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE INDEX ix_users_username_prefix ON users (lower(username) text_pattern_ops)")
+    op.execute("CREATE INDEX ix_users_fullname_prefix ON users (lower(fullname) text_pattern_ops)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_users_fullname_prefix', table_name='users')
+    op.drop_index('ix_users_username_prefix', table_name='users')
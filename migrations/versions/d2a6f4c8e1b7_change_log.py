@@ -0,0 +1,41 @@
+"""Change log for delta sync
+
+Revision ID: d2a6f4c8e1b7
+Revises: 9b5d3e7a1c08
+Create Date: 2026-10-19 16:31:45.902113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a6f4c8e1b7'
+down_revision = '9b5d3e7a1c08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('change_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('op', sa.String(length=10), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('era_id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('data', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_change_log_era_id', 'change_log', ['era_id', 'id'], unique=False)
+    op.create_index('ix_change_log_user_id', 'change_log', ['user_id', 'id'], unique=False)
+    op.create_index('ix_change_log_created_at', 'change_log', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_change_log_created_at', table_name='change_log')
+    op.drop_index('ix_change_log_user_id', table_name='change_log')
+    op.drop_index('ix_change_log_era_id', table_name='change_log')
+    op.drop_table('change_log')
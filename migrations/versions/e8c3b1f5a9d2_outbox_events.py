@@ -0,0 +1,44 @@
+"""Transactional outbox for socket.io events, emails and webhooks
+
+Revision ID: e8c3b1f5a9d2
+Revises: d2a6f4c8e1b7
+Create Date: 2026-10-19 18:04:12.550391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c3b1f5a9d2'
+down_revision = 'd2a6f4c8e1b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outbox_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('channel', sa.String(length=20), nullable=False),
+    sa.Column('event', sa.String(length=100), nullable=False),
+    sa.Column('target', sa.String(length=500), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('dedupe_key', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('claim', sa.String(length=32), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('dedupe_key')
+    )
+    op.create_index('ix_outbox_events_status_available', 'outbox_events', ['status', 'available_at'], unique=False)
+    op.create_index('ix_outbox_events_claim', 'outbox_events', ['claim'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_outbox_events_claim', table_name='outbox_events')
+    op.drop_index('ix_outbox_events_status_available', table_name='outbox_events')
+    op.drop_table('outbox_events')
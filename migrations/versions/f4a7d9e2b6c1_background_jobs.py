@@ -0,0 +1,44 @@
+"""Background job queue
+
+Revision ID: f4a7d9e2b6c1
+Revises: e8c3b1f5a9d2
+Create Date: 2026-10-19 20:12:37.114820
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a7d9e2b6c1'
+down_revision = 'e8c3b1f5a9d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('queue', sa.String(length=50), nullable=False),
+    sa.Column('args', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_at', sa.DateTime(), nullable=False),
+    sa.Column('claim', sa.String(length=32), nullable=True),
+    sa.Column('unique_key', sa.String(length=200), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('unique_key')
+    )
+    op.create_index('ix_jobs_queue_status_run_at', 'jobs', ['queue', 'status', 'run_at'], unique=False)
+    op.create_index('ix_jobs_claim', 'jobs', ['claim'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_jobs_claim', table_name='jobs')
+    op.drop_index('ix_jobs_queue_status_run_at', table_name='jobs')
+    op.drop_table('jobs')